@@ -0,0 +1,94 @@
+"""Compare the linear scan and the prebuilt lookup of indexfile.get_chart_info.
+
+metrics calls get_chart_info once per GitHub release. This resolves every release of
+a synthetic index against:
+* scan: the historical implementation, walking all entries and versions per call.
+* lookup: indexfile.index.build_chart_lookup, built once, then one dict access per
+  call.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_chart_lookup.py --entries 1500 --versions-per-entry 8
+"""
+
+import argparse
+import time
+
+from indexfile import index
+
+
+def make_index(num_entries, versions_per_entry):
+    entries = {}
+    for i in range(num_entries):
+        name = f"chart-{i:05d}"
+        entries[name] = [
+            {
+                "annotations": {
+                    "charts.openshift.io/provider": f"Provider {i}",
+                    "charts.openshift.io/providerType": "partner",
+                },
+                "name": name,
+                "version": f"1.{v}.0",
+            }
+            for v in range(versions_per_entry)
+        ]
+    return {"apiVersion": "v1", "entries": entries}
+
+
+def scan_chart_info(index_dct, tar_name):
+    """The historical implementation of get_chart_info"""
+    for entry, charts in index_dct["entries"].items():
+        if tar_name.startswith(entry):
+            for chart in charts:
+                index_tar_name = f"{entry}-{chart['version']}"
+                if tar_name == index_tar_name:
+                    providerType = chart["annotations"][
+                        "charts.openshift.io/providerType"
+                    ]
+                    provider = chart["annotations"]["charts.openshift.io/provider"]
+                    return providerType, provider, chart["name"], chart["version"]
+    return "", "", "", ""
+
+
+def lookup_chart_info(chart_lookup, tar_name):
+    match = chart_lookup.get(tar_name)
+    if match:
+        _, chart = match
+        providerType = chart["annotations"]["charts.openshift.io/providerType"]
+        provider = chart["annotations"]["charts.openshift.io/provider"]
+        return providerType, provider, chart["name"], chart["version"]
+    return "", "", "", ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1500)
+    parser.add_argument("--versions-per-entry", type=int, default=8)
+    args = parser.parse_args()
+
+    index_dct = make_index(args.entries, args.versions_per_entry)
+    releases = [
+        f"{entry}-{chart['version']}"
+        for entry, charts in index_dct["entries"].items()
+        for chart in charts
+    ]
+    releases.append("unknown-chart-1.0.0")
+    print(f"index: {len(releases) - 1} versions, {len(releases)} lookups")
+
+    start = time.perf_counter()
+    scanned = [scan_chart_info(index_dct, release) for release in releases]
+    scan_elapsed = time.perf_counter() - start
+    print(f"      scan: {scan_elapsed:8.3f} s")
+
+    start = time.perf_counter()
+    chart_lookup = index.build_chart_lookup(index_dct)
+    build_elapsed = time.perf_counter() - start
+    looked_up = [lookup_chart_info(chart_lookup, release) for release in releases]
+    lookup_elapsed = time.perf_counter() - start
+    print(f"    lookup: {lookup_elapsed:8.3f} s (build: {build_elapsed:.3f} s)")
+
+    print(f"identical results: {scanned == looked_up}")
+
+
+if __name__ == "__main__":
+    main()
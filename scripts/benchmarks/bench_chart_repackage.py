@@ -0,0 +1,153 @@
+"""Compare the subprocess and streaming rewrites of a chart's annotations.
+
+A synthetic chart package with many CRD templates and embedded sub-charts gets an
+annotation added to its Chart.yaml with:
+* subprocess: the historical implementation of update_chart_annotation, extracting
+  the package with "tar zxvf", rewriting Chart.yaml, then packaging the directory
+  with "helm package". If helm is not installed, "tar czf" is used instead, which
+  is a lower bound of the cost of "helm package".
+* streaming: chartartifact.repackage.update_chart_yaml.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_chart_repackage.py --crds 2000 --subcharts 20
+"""
+
+import argparse
+import io
+import os
+import random
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+
+import yaml
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import Dumper, SafeLoader
+
+from chartartifact import repackage
+
+CHART = "awesome"
+ANNOTATIONS = {"charts.openshift.io/provider": "Acme Corp"}
+
+
+def make_crd(rng, i):
+    properties = {
+        f"field{j}": {"type": "string", "description": f"{rng.random()}" * 4}
+        for j in range(40)
+    }
+    return yaml.dump(
+        {
+            "apiVersion": "apiextensions.k8s.io/v1",
+            "kind": "CustomResourceDefinition",
+            "metadata": {"name": f"resource{i}.acme.com"},
+            "spec": {"versions": [{"name": "v1", "schema": properties}]},
+        },
+        Dumper=Dumper,
+    ).encode("utf-8")
+
+
+def make_package(path, num_crds, num_subcharts):
+    rng = random.Random(0)
+    files = {
+        f"{CHART}/Chart.yaml": b"apiVersion: v2\nname: awesome\nversion: 1.0.0\n",
+        f"{CHART}/values.yaml": b"replicas: 1\n",
+    }
+    for i in range(num_crds):
+        files[f"{CHART}/crds/crd-{i}.yaml"] = make_crd(rng, i)
+    for i in range(num_subcharts):
+        files[f"{CHART}/charts/sub{i}/Chart.yaml"] = (
+            f"apiVersion: v2\nname: sub{i}\nversion: 0.1.0\n".encode()
+        )
+        files[f"{CHART}/charts/sub{i}/templates/data.bin"] = rng.randbytes(512 * 1024)
+    with tarfile.open(path, mode="w:gz") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+
+def subprocess_update(path, workdir):
+    """The historical implementation of update_chart_annotation"""
+    dr = tempfile.mkdtemp(prefix="annotations-", dir=workdir)
+    subprocess.run(["tar", "zxvf", path, "-C", dr], capture_output=True, check=True)
+
+    with open(os.path.join(dr, CHART, "Chart.yaml")) as fd:
+        data = yaml.load(fd, Loader=SafeLoader)
+    data.setdefault("annotations", {}).update(ANNOTATIONS)
+    with open(os.path.join(dr, CHART, "Chart.yaml"), "w") as fd:
+        fd.write(yaml.dump(data, Dumper=Dumper))
+
+    if shutil.which("helm"):
+        subprocess.run(
+            ["helm", "package", os.path.join(dr, CHART), "-d", dr],
+            capture_output=True,
+            check=True,
+        )
+        shutil.move(os.path.join(dr, f"{CHART}-1.0.0.tgz"), path)
+    else:
+        subprocess.run(
+            ["tar", "czf", path, "-C", dr, CHART], capture_output=True, check=True
+        )
+    shutil.rmtree(dr)
+
+
+def streaming_update(path, workdir):
+    def update(data):
+        data.setdefault("annotations", {}).update(ANNOTATIONS)
+        return data
+
+    repackage.update_chart_yaml(path, path, CHART, update)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crds", type=int, default=2000)
+    parser.add_argument("--subcharts", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "source.tgz")
+        make_package(src_path, args.crds, args.subcharts)
+        size_mb = os.path.getsize(src_path) / 1024 / 1024
+        print(
+            f"package: {args.crds} CRDs, {args.subcharts} sub-charts, {size_mb:.1f} MiB"
+        )
+        if not shutil.which("helm"):
+            print("helm not found, using tar czf to repackage")
+
+        charts = {}
+        for label, func in (
+            ("subprocess", subprocess_update),
+            ("streaming", streaming_update),
+        ):
+            path = os.path.join(tmp, f"{label}.tgz")
+            shutil.copy(src_path, path)
+            start = time.perf_counter()
+            func(path, tmp)
+            print(f"{label:>11}: {time.perf_counter() - start:8.3f} s")
+            with tarfile.open(path, mode="r:gz") as tar:
+                charts[label] = {
+                    m.name: tar.extractfile(m).read() for m in tar if m.isfile()
+                }
+
+        print(f"identical content: {charts['subprocess'] == charts['streaming']}")
+
+        outputs = []
+        for i in range(2):
+            path = os.path.join(tmp, f"repeat-{i}.tgz")
+            shutil.copy(src_path, path)
+            streaming_update(path, tmp)
+            with open(path, "rb") as fd:
+                outputs.append(fd.read())
+        print(f"byte-identical streaming output: {outputs[0] == outputs[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Compare the full and incremental updates of the Helm repository index.
+
+A synthetic index is generated, then one chart entry is updated:
+* full: load the whole index, update the entry, dump the whole index (the historical
+  behavior of update-index).
+* incremental: stream the index and patch the entry in place (see
+  updateindex.incremental).
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_index_update.py --versions 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Dumper, Loader
+
+from updateindex import incremental
+
+NOW = "2024-06-01T10:00:00.000000+00:00"
+
+
+def make_chart_version(name, version):
+    return {
+        "annotations": {
+            "charts.openshift.io/digest": "sha256:" + "0" * 64,
+            "charts.openshift.io/lastCertifiedTimestamp": "2024-01-01T00:00:00.000000+00:00",
+            "charts.openshift.io/provider": "Acme Corp",
+            "charts.openshift.io/providerType": "partner",
+            "charts.openshift.io/submissionTimestamp": "2024-01-01T00:00:00.000000+00:00",
+            "charts.openshift.io/supportedOpenShiftVersions": ">=4.10",
+            "charts.openshift.io/testedOpenShiftVersion": "4.14",
+        },
+        "apiVersion": "v2",
+        "appVersion": version,
+        "description": f"A Helm chart for {name}, deployed on OpenShift",
+        "digest": "0" * 64,
+        "kubeVersion": ">=1.23.0",
+        "name": name,
+        "type": "application",
+        "urls": [
+            f"https://github.com/openshift-helm-charts/charts/releases/download/acme-{name}-{version}/{name}-{version}.tgz"
+        ],
+        "version": version,
+    }
+
+
+def make_index(num_versions, versions_per_chart):
+    entries = {}
+    for i in range(num_versions // versions_per_chart):
+        name = f"chart-{i:06d}"
+        entries[name] = [
+            make_chart_version(name, f"1.{v}.0") for v in range(versions_per_chart)
+        ]
+    return {"apiVersion": "v1", "entries": entries, "generated": NOW}
+
+
+def update_entry(current_versions):
+    name = "chart-000100"
+    versions = [v for v in current_versions if v["version"] != "2.0.0"]
+    versions.append(make_chart_version(name, "2.0.0"))
+    return versions
+
+
+def full_update(src_path, dst_path):
+    with open(src_path) as fd:
+        data = yaml.load(fd, Loader=Loader)
+    data["generated"] = NOW
+    data["entries"]["chart-000100"] = update_entry(data["entries"]["chart-000100"])
+    out = yaml.dump(data, Dumper=Dumper)
+    with open(dst_path, "w") as fd:
+        fd.write(out)
+
+
+def incremental_update(src_path, dst_path):
+    with open(src_path, "rb") as src, open(dst_path, "wb") as out:
+        incremental.patch_index(
+            incremental.iter_lines(src), out, "chart-000100", update_entry, NOW
+        )
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--versions", type=int, default=50000)
+    parser.add_argument("--versions-per-chart", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "index.yaml")
+        with open(src_path, "w") as fd:
+            yaml.dump(
+                make_index(args.versions, args.versions_per_chart), fd, Dumper=Dumper
+            )
+        size_mb = os.path.getsize(src_path) / 1024 / 1024
+        print(f"index: {args.versions} versions, {size_mb:.1f} MiB")
+
+        full_path = os.path.join(tmp, "full.yaml")
+        incremental_path = os.path.join(tmp, "incremental.yaml")
+        for label, func, dst in (
+            ("full", full_update, full_path),
+            ("incremental", incremental_update, incremental_path),
+        ):
+            elapsed, peak = measure(func, src_path, dst)
+            print(
+                f"{label:>12}: {elapsed:8.3f} s, peak memory {peak / 1024 / 1024:8.1f} MiB"
+            )
+
+        with open(full_path, "rb") as a, open(incremental_path, "rb") as b:
+            print(f"identical output: {a.read() == b.read()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare the grouped scan and the single-pass selection of indexfile latest charts.
+
+A synthetic list of charts, as returned by indexfile.index.get_charts_info, is
+reduced to the latest version of each chart with:
+* grouped: the historical implementation of get_latest_charts, which requires the
+  versions of a chart to be contiguous and coerces every version it compares.
+* select: indexfile.index.select_latest_charts, a single pass keeping the max
+  version per chart, with each version string parsed once.
+
+The historical implementation compares a Version to "" when the first chart has
+several versions, so the first chart of the synthetic list has a single version.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_latest_charts.py --charts 100000
+"""
+
+import argparse
+import random
+import time
+
+import semantic_version
+
+from indexfile import index
+
+
+def make_chart_list(num_charts, versions_per_chart):
+    chart_list = [{"name": "chart-first", "version": "1.0.0", "provider": "Acme"}]
+    for i in range((num_charts - 1) // versions_per_chart):
+        name = f"chart-{i:06d}"
+        versions = [f"{v // 10}.{v % 10}.{v % 3}" for v in range(versions_per_chart)]
+        random.Random(i).shuffle(versions)
+        chart_list.extend(
+            {"name": name, "version": version, "provider": f"Provider {i}"}
+            for version in versions
+        )
+    return chart_list
+
+
+def grouped_latest_charts(chart_list):
+    """The historical implementation of get_latest_charts"""
+    chart_in_process = {"name": ""}
+    chart_latest_version = ""
+    latest_charts = []
+
+    for position, chart in enumerate(chart_list):
+        chart_name = chart["name"]
+        if chart_name == chart_in_process["name"]:
+            new_version = semantic_version.Version.coerce(chart["version"])
+            if new_version > chart_latest_version:
+                chart_latest_version = new_version
+                chart_in_process = chart
+        else:
+            if chart_in_process["name"] != "":
+                latest_charts.append(chart_in_process)
+
+                chart_in_process = chart
+                chart_version = chart["version"]
+                if chart_version.startswith("v"):
+                    chart_version = chart_version[1:]
+                chart_latest_version = semantic_version.Version.coerce(chart_version)
+            else:
+                chart_in_process = chart
+
+        if position + 1 == len(chart_list):
+            latest_charts.append(chart_in_process)
+
+    return latest_charts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--charts", type=int, default=100000)
+    parser.add_argument("--versions-per-chart", type=int, default=20)
+    args = parser.parse_args()
+
+    chart_list = make_chart_list(args.charts, args.versions_per_chart)
+    print(f"index: {len(chart_list)} chart versions")
+
+    start = time.perf_counter()
+    grouped = grouped_latest_charts(chart_list)
+    print(f"   grouped: {time.perf_counter() - start:8.3f} s")
+
+    start = time.perf_counter()
+    selected = index.select_latest_charts(chart_list)
+    print(f"    select: {time.perf_counter() - start:8.3f} s")
+
+    print(f"identical results: {grouped == selected}")
+
+    random.Random(0).shuffle(chart_list)
+    shuffled = index.select_latest_charts(chart_list)
+    print(
+        "identical results on shuffled input: "
+        f"{sorted(map(id, grouped)) == sorted(map(id, shuffled))}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Compare the ways of loading the OWNERS files of generate-chart-locks.
+
+A synthetic tree of charts, each with an OWNERS file, is created in a temporary git
+repository and loaded with:
+* sequential: the historical loop of generate-chart-locks, loading one file at a
+  time with the pure Python YAML loader and compiling the path regex every time.
+* pool: owners.ownerstree.load_owners_files with an empty cache, on a process pool
+  with the C YAML loader.
+* cached: the same with the cache of the previous run, after a fresh checkout (all
+  files have new mtimes but the same content).
+* since: generate-chart-locks --since HEAD, after modifying a few OWNERS files.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_owners_tree.py --charts 20000 --changed 10
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from owners import owners_file, ownerstree
+from packagemapping import generatelocks
+
+OWNERS_TEMPLATE = """\
+chart:
+  name: {chart}
+  shortDescription: Chart number {i} of the synthetic tree
+publicPgpKey: |
+  -----BEGIN PGP PUBLIC KEY BLOCK-----
+{key}
+  -----END PGP PUBLIC KEY BLOCK-----
+providerDelivery: false
+users:
+- githubUsername: user-{i}-a
+- githubUsername: user-{i}-b
+vendor:
+  label: {organization}
+  name: Organization {i}
+"""
+KEY = "\n".join(f"  {'QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo' * 2}" for _ in range(20))
+
+
+def make_tree(num_charts):
+    for i in range(num_charts):
+        organization = f"org-{i // 10:05d}"
+        chart = f"chart-{i:05d}"
+        directory = os.path.join("charts", "partners", organization, chart)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "OWNERS"), "w") as fd:
+            fd.write(
+                OWNERS_TEMPLATE.format(
+                    i=i, chart=chart, organization=organization, key=KEY
+                )
+            )
+
+
+def git(*args):
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def sequential_load(filenames):
+    """The historical loop of generatelocks.main"""
+    packages = {}
+    for filename in filenames:
+        pattern = re.compile(
+            r"charts/(partners|redhat|community)/([\w-]+)/([\w-]+)/OWNERS"
+        )
+        category, organization, chart = pattern.match(filename).groups()
+        with open(filename) as fd:
+            owners_content = yaml.load(fd, Loader=yaml.SafeLoader)
+        if owners_file.get_chart(owners_content) != chart:
+            raise ValueError(filename)
+        packages[chart] = f"{category}/{organization}/{chart}"
+    return packages
+
+
+def run_generate_locks(*args):
+    # The log functions are bound to the original sys.stderr
+    generatelocks.logInfo = lambda msg: None
+    sys.argv = ["generate-chart-locks", *args]
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+        rc = generatelocks.main()
+    if rc:
+        raise RuntimeError(f"generate-chart-locks failed: {rc}")
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--charts", type=int, default=20000)
+    parser.add_argument("--changed", type=int, default=10)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        os.chdir(tmp)
+        os.environ["OWNERS_CACHE_FILE"] = os.path.join(tmp, "owners-cache.json")
+        make_tree(args.charts)
+        git("init", "-q")
+        git("config", "gc.auto", "0")
+        git("add", "charts")
+        git("-c", "user.name=b", "-c", "user.email=b@b", "commit", "-qm", "tree")
+        filenames = ownerstree.find_owners_files()
+        print(f"tree: {len(filenames)} OWNERS files")
+
+        start = time.perf_counter()
+        sequential_load(filenames)
+        print(f"sequential: {time.perf_counter() - start:8.3f} s")
+
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            ownerstree.load_owners_files(filenames)
+        print(f"      pool: {time.perf_counter() - start:8.3f} s")
+
+        for filename in filenames:
+            os.utime(filename)
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            ownerstree.load_owners_files(filenames)
+        print(f"    cached: {time.perf_counter() - start:8.3f} s")
+
+        lock_file = os.path.join(tmp, "chart-locks.json")
+        with open(lock_file, "w") as fd:
+            fd.write(run_generate_locks())
+        for filename in filenames[: args.changed]:
+            with open(filename, "a") as fd:
+                fd.write("# changed\n")
+        start = time.perf_counter()
+        run_generate_locks("--since", "HEAD", "--lock-file", lock_file)
+        print(f"     since: {time.perf_counter() - start:8.3f} s")
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare the buffered and streaming digests of a chart package.
+
+A synthetic chart package is served by a local HTTP server, then hashed with:
+* buffered: the historical implementation of set_package_digest, a HEAD request
+  then a GET request loading the whole package in memory.
+* streaming: chartartifact.digest.digest_url, hashing the package chunk by chunk.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_package_digest.py --size-mb 500
+"""
+
+import argparse
+import functools
+import hashlib
+import http.server
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from chartartifact import digest
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def make_package(path, size_mb):
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as fd:
+        for _ in range(size_mb):
+            fd.write(block)
+
+
+def buffered_digest(url):
+    """The historical implementation of set_package_digest"""
+    head = requests.head(url, allow_redirects=True)
+    if head.status_code == 200:
+        response = requests.get(url, allow_redirects=True)
+        return hashlib.sha256(response.content).hexdigest()
+    return ""
+
+
+def streaming_digest(url):
+    return digest.digest_url(url).digest
+
+
+def measure(func, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(url)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_package(os.path.join(tmp, "chart-1.0.0.tgz"), args.size_mb)
+        handler = functools.partial(QuietHandler, directory=tmp)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/chart-1.0.0.tgz"
+        print(f"package: {args.size_mb} MiB")
+
+        results = []
+        for label, func in (
+            ("buffered", buffered_digest),
+            ("streaming", streaming_digest),
+        ):
+            result, elapsed, peak = measure(func, url)
+            results.append(result)
+            print(
+                f"{label:>10}: {elapsed:8.3f} s, peak memory {peak / 1024 / 1024:8.1f} MiB"
+            )
+        server.shutdown()
+
+    print(f"identical digests: {results[0] == results[1]}")
+
+
+if __name__ == "__main__":
+    main()
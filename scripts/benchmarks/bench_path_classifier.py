@@ -0,0 +1,93 @@
+"""Compare the per-pattern and the single-pass classification of PR file paths.
+
+A synthetic PR adding a chart from source, with a large src/ tree, a report and a
+tarball, is classified with:
+* patterns: the historical implementation of precheck.submission.get_file_type,
+  which matches each path against up to five regexes, built on every call.
+* classifier: reporegex.classifier, a single precompiled regex per path.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_path_classifier.py --files 100000
+"""
+
+import argparse
+import re
+import time
+
+from reporegex import classifier, matchers
+
+
+def make_pr_files(num_files):
+    version_dir = "charts/partners/acme/awesome/1.42.0"
+    files = [
+        "charts/partners/acme/awesome/OWNERS",
+        f"{version_dir}/report.yaml",
+        f"{version_dir}/awesome-1.42.0.tgz",
+        f"{version_dir}/src/Chart.yaml",
+    ]
+    for i in range(num_files - len(files)):
+        files.append(
+            f"{version_dir}/src/templates/component-{i // 100:04d}/resource-{i % 100:02d}.yaml"
+        )
+    return files
+
+
+def patterns_get_file_type(file_path):
+    """The historical implementation of precheck.submission.get_file_type"""
+    base = matchers.submission_path_matcher()
+    pattern = re.compile(base + r"/.*")
+    reportpattern = re.compile(base + r"/report.yaml")
+    tarballpattern = re.compile(base + r"/(.*\.tgz)")
+    owners_pattern = re.compile(
+        matchers.submission_path_matcher(include_version_matcher=False) + r"/OWNERS"
+    )
+    src_pattern = re.compile(matchers.submission_path_matcher() + r"/src/")
+
+    match = pattern.match(file_path)
+    if match:
+        report_match = reportpattern.match(file_path)
+        if report_match:
+            return "report", report_match
+
+        src_match = src_pattern.match(file_path)
+        if src_match:
+            return "source", src_match
+
+        tar_match = tarballpattern.match(file_path)
+        if tar_match:
+            return "tarball", tar_match
+    else:
+        owners_match = owners_pattern.match(file_path)
+        if owners_match:
+            return "owners", owners_match
+
+    return "unknwown", None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    args = parser.parse_args()
+
+    files = make_pr_files(args.files)
+    print(f"PR: {len(files)} files")
+
+    start = time.perf_counter()
+    legacy = [patterns_get_file_type(file_path)[0] for file_path in files]
+    print(f"  patterns: {time.perf_counter() - start:8.3f} s")
+
+    path_classifier = classifier.get_classifier()
+    start = time.perf_counter()
+    records = path_classifier.classify_all(files)
+    print(f"classifier: {time.perf_counter() - start:8.3f} s")
+
+    kinds = [
+        "unknwown" if record.kind in ("chart", "unknown") else record.kind
+        for record in records
+    ]
+    print(f"identical results: {legacy == kinds}")
+
+
+if __name__ == "__main__":
+    main()
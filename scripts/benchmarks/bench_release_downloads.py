@@ -0,0 +1,111 @@
+"""Compare the historical and single-pass aggregations of the release downloads.
+
+send_release_metrics turns the release assets returned by parse_response into the
+downloads of every asset, ranked, and the top 5 charts. This aggregates synthetic
+release assets with:
+* nested: the historical implementation, re-sorting the assets of every chart to
+  find its most downloaded one, then sorting all the charts.
+* single-pass: metrics.aggregate_release_downloads, keeping the max per chart and
+  selecting the top charts with heapq.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_release_downloads.py --assets 50000
+"""
+
+import argparse
+import random
+import time
+from collections import OrderedDict
+
+from metrics import metrics
+
+
+def make_downloads(num_assets, versions_per_chart):
+    rng = random.Random(0)
+    downloads = []
+    for i in range(num_assets):
+        chart = f"chart-{i // versions_per_chart:05d}"
+        version = f"1.{i % versions_per_chart}.0"
+        downloads.append(
+            {
+                "name": f"{chart}-{version}",
+                "asset": {f"{chart}-{version}.tgz": rng.randrange(100000)},
+            }
+        )
+    return downloads
+
+
+def get_chart_info(tar_name):
+    chart, _, version = tar_name.rpartition("-")
+    # Spread the charts over providers
+    return "partner", f"provider-{int(chart[6:]) % 200}", chart, version
+
+
+def nested_release_downloads(downloads):
+    """The historical aggregation of send_release_metrics"""
+    metrics = {}
+    chart_downloads = []
+    chart_downloads_latest = []
+    for release in downloads:
+        _, provider, chart, _ = get_chart_info(release.get("name"))
+        if len(provider) > 0:
+            if provider not in metrics:
+                metrics[provider] = {}
+            if chart not in metrics[provider]:
+                metrics[provider][chart] = {}
+
+            for key in release.get("asset"):
+                metrics[provider][chart][key] = release.get("asset")[key]
+
+    for provider in metrics:
+        for chart in metrics[provider]:
+            ordered_download_perChart = OrderedDict(
+                sorted(
+                    metrics[provider][chart].items(), key=lambda i: i[1], reverse=True
+                )
+            )
+            for key, value in ordered_download_perChart.items():
+                chart_downloads_latest.append(
+                    {"downloads": value, "name": key, "provider": provider}
+                )
+                break
+            for key, value in metrics[provider][chart].items():
+                chart_downloads.append(
+                    {"downloads": value, "name": key, "provider": provider}
+                )
+    chart_downloads.sort(key=lambda k: k["downloads"], reverse=True)
+    chart_downloads_latest.sort(key=lambda k: k["downloads"], reverse=True)
+    return chart_downloads, chart_downloads_latest[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--versions-per-chart", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    downloads = make_downloads(args.assets, args.versions_per_chart)
+    print(f"releases: {len(downloads)} assets")
+
+    for label, func in (
+        ("nested", nested_release_downloads),
+        (
+            "single-pass",
+            lambda d: metrics.aggregate_release_downloads(d, get_chart_info),
+        ),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = func(downloads)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{label:>12}: {elapsed:8.3f} s")
+        if label == "nested":
+            expected = result
+
+    print(f"identical results: {expected == result}")
+
+
+if __name__ == "__main__":
+    main()
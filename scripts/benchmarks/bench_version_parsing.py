@@ -0,0 +1,148 @@
+"""Compare parsing versions on every use with the memoized parsers of tools.versions.
+
+A synthetic list of charts, as returned by indexfile.index.get_charts_info, where
+chart versions, kubeVersion and supportedOCP ranges repeat as they do in the real
+index, is processed twice:
+* latest: the latest version of each chart, as selected by get_latest_charts.
+* supported: the charts supporting a given OCP version, from their supportedOCP
+  range or, failing that, their kubeVersion, as checked by the functional tests.
+
+Each step is run with the versions parsed on every use (semantic_version.Version
+and NpmSpec), as the code did before tools.versions, then with tools.versions,
+with cold and warm caches.
+
+Usage (from the scripts directory):
+
+    PYTHONPATH=src python benchmarks/bench_version_parsing.py --charts 100000
+"""
+
+import argparse
+import random
+import time
+
+import semantic_version
+
+from tools import versions
+
+SUPPORTED_OCP = [">=4.7", ">=4.10", "4.8 - 4.12", ">=4.12", "N/A", ""]
+KUBE_VERSIONS = [">=1.20.0", ">= 1.23.0-0", ">=1.19.0, <1.26.0", "~1.25.0", ""]
+KUBE_OCP_RANGES = {
+    ">=1.20.0": ">=4.7",
+    ">= 1.23.0-0": ">=4.10",
+    ">=1.19.0, <1.26.0": "4.6 - 4.12",
+    "~1.25.0": "4.12",
+}
+
+
+def make_chart_list(num_charts, versions_per_chart):
+    rng = random.Random(0)
+    chart_list = []
+    for i in range(num_charts // versions_per_chart):
+        for v in range(versions_per_chart):
+            chart_list.append(
+                {
+                    "name": f"chart-{i:06d}",
+                    "version": f"{'v' if v % 4 == 0 else ''}{v // 10}.{v % 10}.{v % 3}",
+                    "supportedOCP": rng.choice(SUPPORTED_OCP),
+                    "kubeVersion": rng.choice(KUBE_VERSIONS),
+                }
+            )
+    rng.shuffle(chart_list)
+    return chart_list
+
+
+def latest_uncached(chart_list):
+    latest = {}
+    for chart in chart_list:
+        try:
+            version = semantic_version.Version.coerce(
+                chart["version"].removeprefix("v")
+            )
+        except ValueError:
+            continue
+        current = latest.get(chart["name"])
+        if current is None or version > current[0]:
+            latest[chart["name"]] = (version, chart)
+    return [chart for _, chart in latest.values()]
+
+
+def latest_cached(chart_list):
+    latest = {}
+    for chart in chart_list:
+        version = versions.parse_chart_version(chart["version"])
+        if version is None:
+            continue
+        current = latest.get(chart["name"])
+        if current is None or version > current[0]:
+            latest[chart["name"]] = (version, chart)
+    return [chart for _, chart in latest.values()]
+
+
+def supported_uncached(chart_list, ocp_version):
+    ocp = semantic_version.Version.coerce(ocp_version)
+    supported = []
+    for chart in chart_list:
+        if chart["supportedOCP"] not in ("", "N/A"):
+            ocp_range = chart["supportedOCP"]
+        elif chart["kubeVersion"]:
+            # The translation used to be a table lookup done by hand
+            ocp_range = KUBE_OCP_RANGES[chart["kubeVersion"]]
+        else:
+            continue
+        if ocp in semantic_version.NpmSpec(ocp_range):
+            supported.append(chart)
+    return supported
+
+
+def supported_cached(chart_list, ocp_version):
+    supported = []
+    for chart in chart_list:
+        if chart["supportedOCP"] not in ("", "N/A"):
+            ocp_range = chart["supportedOCP"]
+        elif chart["kubeVersion"]:
+            ocp_range = versions.get_ocp_range(chart["kubeVersion"])
+        else:
+            continue
+        if versions.version_in_range(ocp_version, ocp_range):
+            supported.append(chart)
+    return supported
+
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f"{label:>24}: {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--charts", type=int, default=100000)
+    parser.add_argument("--versions-per-chart", type=int, default=20)
+    parser.add_argument("--ocp-version", default="4.12")
+    args = parser.parse_args()
+
+    chart_list = make_chart_list(args.charts, args.versions_per_chart)
+    print(f"index: {len(chart_list)} chart versions")
+
+    latest = timed("latest uncached", latest_uncached, chart_list)
+    versions.cache_clear()
+    timed("latest cached (cold)", latest_cached, chart_list)
+    cached = timed("latest cached (warm)", latest_cached, chart_list)
+    print(f"identical results: {latest == cached}")
+
+    supported = timed(
+        "supported uncached", supported_uncached, chart_list, args.ocp_version
+    )
+    versions.cache_clear()
+    timed("supported cached (cold)", supported_cached, chart_list, args.ocp_version)
+    cached = timed(
+        "supported cached (warm)", supported_cached, chart_list, args.ocp_version
+    )
+    print(f"identical results: {supported == cached}")
+    for name, info in versions.cache_info().items():
+        print(f"{name:>24}: {info.hits} hits, {info.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import io
+import tarfile
+
+import pytest
+
+
+@pytest.fixture
+def make_package():
+    """Factory of chart packages, from a mapping of file names to their content.
+
+    The factory returns the content of the package and, if a path is given, writes
+    the package to it. Files have a fixed mtime, so that packages of the same files
+    have the same content.
+    """
+
+    def make(files, path=None):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+            for name, content in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mtime = 1700000000
+                tar.addfile(info, io.BytesIO(content))
+        if path is not None:
+            with open(path, "wb") as fd:
+                fd.write(buf.getvalue())
+        return buf.getvalue()
+
+    return make
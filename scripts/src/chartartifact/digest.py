@@ -0,0 +1,94 @@
+"""Compute the SHA256 digest of chart packages without holding them in memory.
+
+The package is hashed chunk by chunk as it is downloaded (or read), so memory use
+does not depend on the size of the package.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class PackageTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class PackageDigest:
+    """SHA256 digest of a chart package
+
+    Attributes:
+        digest (str): hex encoded SHA256 digest
+        size (int): size of the package, in bytes
+        elapsed (float): time taken to download and hash the package, in seconds
+    """
+
+    digest: str
+    size: int
+    elapsed: float
+
+
+def _hash_chunks(chunks, max_size, start):
+    sha256 = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise PackageTooLargeError(
+                f"package is larger than the maximum size of {max_size} bytes"
+            )
+        sha256.update(chunk)
+    return PackageDigest(sha256.hexdigest(), size, time.perf_counter() - start)
+
+
+def digest_url(url, max_size=None, chunk_size=CHUNK_SIZE, session=None):
+    """Download a chart package and compute its SHA256 digest
+
+    Args:
+        url (str): URL of the chart package
+        max_size (int): if set, maximum size of the package, in bytes
+        chunk_size (int): size of the chunks read from the response
+        session (requests.Session): session to use for the download
+
+    Returns:
+        PackageDigest: the digest of the package, or None if the package could not
+                       be downloaded.
+
+    Raises:
+        PackageTooLargeError: if the package is larger than max_size
+    """
+    start = time.perf_counter()
+    with (session or requests).get(url, allow_redirects=True, stream=True) as r:
+        print(f"[DEBUG]: response code get request: {r.status_code}")
+        if r.status_code != 200:
+            return None
+
+        content_length = r.headers.get("Content-Length")
+        if max_size is not None and content_length and int(content_length) > max_size:
+            raise PackageTooLargeError(
+                f"package size of {content_length} bytes is larger than the maximum size of {max_size} bytes"
+            )
+        return _hash_chunks(r.iter_content(chunk_size=chunk_size), max_size, start)
+
+
+def digest_file(path, max_size=None, chunk_size=CHUNK_SIZE):
+    """Compute the SHA256 digest of a local chart package
+
+    Args:
+        path (str): path to the chart package
+        max_size (int): if set, maximum size of the package, in bytes
+        chunk_size (int): size of the chunks read from the file
+
+    Returns:
+        PackageDigest: the digest of the package
+
+    Raises:
+        PackageTooLargeError: if the package is larger than max_size
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as fd:
+        return _hash_chunks(iter(lambda: fd.read(chunk_size), b""), max_size, start)
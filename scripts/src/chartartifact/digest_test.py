@@ -0,0 +1,45 @@
+import hashlib
+
+import pytest
+import responses
+
+from chartartifact import digest
+
+chart_url = (
+    "https://github.com/acme/charts/releases/download/awesome-1.0.0/awesome-1.0.0.tgz"
+)
+chart_content = b"chart package" * 100000
+
+
+@responses.activate
+def test_digest_url():
+    responses.get(chart_url, body=chart_content)
+
+    package_digest = digest.digest_url(chart_url, chunk_size=4096)
+
+    assert package_digest.digest == hashlib.sha256(chart_content).hexdigest()
+    assert package_digest.size == len(chart_content)
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_digest_url_not_found():
+    responses.get(chart_url, status=404)
+    assert digest.digest_url(chart_url) is None
+
+
+@responses.activate
+def test_digest_url_max_size():
+    responses.get(chart_url, body=chart_content)
+    with pytest.raises(digest.PackageTooLargeError):
+        digest.digest_url(chart_url, max_size=1000)
+
+
+def test_digest_file(tmp_path):
+    path = tmp_path / "awesome-1.0.0.tgz"
+    path.write_bytes(chart_content)
+
+    package_digest = digest.digest_file(str(path), chunk_size=4096)
+
+    assert package_digest.digest == hashlib.sha256(chart_content).hexdigest()
+    assert package_digest.size == len(chart_content)
@@ -0,0 +1,116 @@
+"""Read the metadata (Chart.yaml) of chart packages, in-process.
+
+The package is read as a gzip stream and only the top-level Chart.yaml member is
+parsed, nothing is extracted. Results are memoized by SHA256 digest of the package.
+
+As with "helm show chart", only the Chart.yaml fields known to Helm are kept, and
+empty fields are left out. The string fields are kept as written, e.g. "appVersion:
+1.10" is read as "1.10", not as the float 1.1.
+"""
+
+import tarfile
+import threading
+
+import yaml
+
+try:
+    from yaml import CBaseLoader as BaseLoader
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import BaseLoader, SafeLoader
+
+from chartartifact import digest
+
+# Fields of Chart.yaml, see https://helm.sh/docs/topics/charts/#the-chartyaml-file
+CHART_YAML_FIELDS = [
+    "apiVersion",
+    "name",
+    "version",
+    "kubeVersion",
+    "description",
+    "type",
+    "keywords",
+    "home",
+    "sources",
+    "dependencies",
+    "maintainers",
+    "icon",
+    "appVersion",
+    "deprecated",
+    "annotations",
+]
+# Fields of Chart.yaml that are strings, whatever YAML type their value resolves to
+CHART_YAML_STRING_FIELDS = [
+    "apiVersion",
+    "name",
+    "version",
+    "kubeVersion",
+    "appVersion",
+]
+
+_memo = {}
+_lock = threading.Lock()
+
+
+class ChartMetadataError(Exception):
+    pass
+
+
+def read_chart_yaml(fileobj):
+    """Read the top-level Chart.yaml from a chart package
+
+    Args:
+        fileobj (file): The chart package, opened in binary mode
+
+    Returns:
+        dict: The fields of Chart.yaml known to Helm
+
+    Raises:
+        ChartMetadataError: if the package has no top-level Chart.yaml
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for member in tar:
+            parts = member.name.removeprefix("./").split("/")
+            if member.isfile() and len(parts) == 2 and parts[1] == "Chart.yaml":
+                content = tar.extractfile(member).read()
+                data = yaml.load(content, Loader=SafeLoader) or {}
+                numeric_fields = [
+                    field
+                    for field in CHART_YAML_STRING_FIELDS
+                    if data.get(field) is not None and not isinstance(data[field], str)
+                ]
+                if numeric_fields:
+                    # Parse again without resolving the types of the values
+                    raw_data = yaml.load(content, Loader=BaseLoader)
+                    for field in numeric_fields:
+                        data[field] = raw_data[field]
+                return {
+                    field: data[field]
+                    for field in CHART_YAML_FIELDS
+                    if data.get(field) not in (None, "", [], {}, False)
+                }
+    raise ChartMetadataError("Chart.yaml not found in chart package")
+
+
+def get_chart_metadata(path, package_digest=None):
+    """Get the metadata of a chart package, reading it once per package content
+
+    Args:
+        path (str): Path to the chart package
+        package_digest (str): SHA256 digest of the package, computed if not provided
+
+    Returns:
+        dict: The fields of Chart.yaml known to Helm. The returned dict is shared
+              between callers and must not be modified.
+
+    Raises:
+        ChartMetadataError: if the package has no top-level Chart.yaml
+    """
+    if package_digest is None:
+        package_digest = digest.digest_file(path).digest
+
+    with _lock:
+        if package_digest not in _memo:
+            with open(path, "rb") as fd:
+                _memo[package_digest] = read_chart_yaml(fd)
+        return _memo[package_digest]
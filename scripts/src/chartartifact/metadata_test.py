@@ -0,0 +1,62 @@
+import pytest
+
+from chartartifact import metadata
+
+chart_yaml = b"""\
+apiVersion: v2
+name: awesome
+version: 1.0.0
+description: ""
+deprecated: false
+x-custom-field: dropped
+annotations:
+  charts.openshift.io/name: Awesome
+"""
+
+
+def test_get_chart_metadata(tmp_path, make_package):
+    path = str(tmp_path / "awesome-1.0.0.tgz")
+    make_package(
+        {
+            "awesome/charts/sub/Chart.yaml": b"name: sub\n",
+            "awesome/Chart.yaml": chart_yaml,
+        },
+        path,
+    )
+
+    assert metadata.get_chart_metadata(path) == {
+        "apiVersion": "v2",
+        "name": "awesome",
+        "version": "1.0.0",
+        "annotations": {"charts.openshift.io/name": "Awesome"},
+    }
+
+    # The same path with a different content is read again
+    make_package({"awesome/Chart.yaml": b"name: awesome\nversion: 2.0.0\n"}, path)
+    assert metadata.get_chart_metadata(path)["version"] == "2.0.0"
+
+
+def test_get_chart_metadata_not_found(tmp_path, make_package):
+    path = str(tmp_path / "awesome-1.0.0.tgz")
+    make_package({"awesome/values.yaml": b"replicas: 1\n"}, path)
+
+    with pytest.raises(metadata.ChartMetadataError):
+        metadata.get_chart_metadata(path)
+
+
+def test_get_chart_metadata_string_fields(tmp_path, make_package):
+    path = str(tmp_path / "awesome-1.10.tgz")
+    make_package(
+        {
+            "awesome/Chart.yaml": b"apiVersion: v2\nname: awesome\nversion: 1.10\n"
+            b"appVersion: 1.10\nkubeVersion: ~\n",
+        },
+        path,
+    )
+
+    assert metadata.get_chart_metadata(path) == {
+        "apiVersion": "v2",
+        "name": "awesome",
+        "version": "1.10",
+        "appVersion": "1.10",
+    }
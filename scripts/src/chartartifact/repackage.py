@@ -0,0 +1,72 @@
+"""Rewrite the Chart.yaml of a chart package without unpacking it.
+
+The members of the package are streamed from the source archive to the new one:
+every member is copied unchanged, except <chart>/Chart.yaml which is replaced. Only
+the gzip compression is redone, nothing is written to disk but the new archive.
+
+The output only depends on the input: the gzip header has no file name and no
+modification time, and the tar headers are copied from the source archive.
+"""
+
+import gzip
+import io
+import os
+import tarfile
+
+import yaml
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import Dumper, SafeLoader
+
+
+class ChartYamlNotFoundError(Exception):
+    pass
+
+
+def update_chart_yaml(src_path, dst_path, chart, update):
+    """Write a copy of a chart package with an updated Chart.yaml
+
+    Args:
+        src_path (str): Path to the chart package
+        dst_path (str): Path to the new chart package, may be the same as src_path
+        chart (str): Name of the chart, i.e. of the top directory of the package
+        update (callable): Called with the content of Chart.yaml as a dict, returns
+                           the content of the new Chart.yaml
+
+    Raises:
+        ChartYamlNotFoundError: if the package has no <chart>/Chart.yaml
+    """
+    chart_yaml_name = f"{chart}/Chart.yaml"
+    found = False
+    tmp_path = f"{dst_path}.tmp"
+    try:
+        with open(src_path, "rb") as src, tarfile.open(
+            fileobj=src, mode="r|gz"
+        ) as src_tar, open(tmp_path, "wb") as dst, gzip.GzipFile(
+            filename="", mode="wb", fileobj=dst, mtime=0, compresslevel=6
+        ) as gz, tarfile.open(
+            fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT
+        ) as dst_tar:
+            for member in src_tar:
+                if not member.isfile():
+                    dst_tar.addfile(member)
+                    continue
+
+                fileobj = src_tar.extractfile(member)
+                if member.name.removeprefix("./") == chart_yaml_name and not found:
+                    found = True
+                    data = yaml.load(fileobj, Loader=SafeLoader)
+                    content = yaml.dump(update(data), Dumper=Dumper).encode("utf-8")
+                    member.size = len(content)
+                    fileobj = io.BytesIO(content)
+                dst_tar.addfile(member, fileobj)
+
+        if not found:
+            raise ChartYamlNotFoundError(f"{chart_yaml_name} not found in {src_path}")
+        os.replace(tmp_path, dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,69 @@
+import tarfile
+
+import pytest
+import yaml
+
+from chartartifact import repackage
+
+chart_yaml = b"""\
+apiVersion: v2
+name: awesome
+version: 1.0.0
+annotations:
+  charts.openshift.io/name: Awesome
+"""
+files = {
+    "awesome/Chart.yaml": chart_yaml,
+    "awesome/values.yaml": b"replicas: 1\n",
+    "awesome/templates/deployment.yaml": b"kind: Deployment\n",
+    "awesome/charts/sub/Chart.yaml": b"name: sub\n",
+}
+
+
+def read_package(path):
+    with tarfile.open(path, mode="r:gz") as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar if m.isfile()}
+
+
+def add_provider(data):
+    data["annotations"]["charts.openshift.io/provider"] = "Acme"
+    return data
+
+
+def test_update_chart_yaml(tmp_path, make_package):
+    src_path = str(tmp_path / "awesome-1.0.0.tgz")
+    make_package(files, src_path)
+
+    repackage.update_chart_yaml(src_path, src_path, "awesome", add_provider)
+
+    content = read_package(src_path)
+    assert list(content) == list(files)
+    for name in files:
+        if name != "awesome/Chart.yaml":
+            assert content[name] == files[name]
+    assert yaml.safe_load(content["awesome/Chart.yaml"])["annotations"] == {
+        "charts.openshift.io/name": "Awesome",
+        "charts.openshift.io/provider": "Acme",
+    }
+
+
+def test_update_chart_yaml_is_deterministic(tmp_path, make_package):
+    src_path = str(tmp_path / "awesome-1.0.0.tgz")
+    make_package(files, src_path)
+
+    outputs = []
+    for i in range(2):
+        dst_path = str(tmp_path / f"out-{i}.tgz")
+        repackage.update_chart_yaml(src_path, dst_path, "awesome", add_provider)
+        with open(dst_path, "rb") as fd:
+            outputs.append(fd.read())
+    assert outputs[0] == outputs[1]
+
+
+def test_update_chart_yaml_not_found(tmp_path, make_package):
+    src_path = str(tmp_path / "awesome-1.0.0.tgz")
+    make_package({"other/Chart.yaml": chart_yaml}, src_path)
+
+    with pytest.raises(repackage.ChartYamlNotFoundError):
+        repackage.update_chart_yaml(src_path, src_path, "awesome", add_provider)
+    assert read_package(src_path) == {"other/Chart.yaml": chart_yaml}
@@ -1,14 +1,10 @@
 import argparse
-import hashlib
 import os
 import os.path
 import re
-import subprocess
 import sys
 
 import requests
-import semantic_version
-import semver
 import yaml
 from environs import Env
 
@@ -18,14 +14,22 @@ except ImportError:
     from yaml import Loader
 
 sys.path.append("../")
+from chartartifact import digest
+from chartprreview import checkgraph
+from owners import authz
 from pullrequest import prartifact
 from reporegex import matchers
 from report import report_info, verifier_report
-from signedchart import signedchart
-from tools import gitutils
+from signedchart import keyring, signedchart
+from tools import gitutils, messages, versions
 
 
 def write_error_log(directory, *msg):
+    if messages.collect_messages(msg):
+        # Written once all the checks have run, see main
+        for line in msg:
+            print(line)
+        return
     os.makedirs(directory, exist_ok=True)
     with open(os.path.join(directory, "errors"), "w") as fd:
         for line in msg:
@@ -85,14 +89,13 @@ def verify_user(directory, username, category, organization, chart):
         "[INFO] Verify user. %s, %s, %s, %s" % (username, category, organization, chart)
     )
     owners_path = os.path.join("charts", category, organization, chart, "OWNERS")
-    if not os.path.exists(owners_path):
+    owners = authz.get_chart_owners(category, organization, chart)
+    if owners is None:
         msg = f"[ERROR] {owners_path} file does not exist."
         write_error_log(directory, msg)
         sys.exit(1)
 
-    data = open(owners_path).read()
-    out = yaml.load(data, Loader=Loader)
-    if username not in [x["githubUsername"] for x in out["users"]]:
+    if username not in owners["users"]:
         msg = f"[ERROR] {username} is not allowed to submit the chart on behalf of {organization}"
         write_error_log(directory, msg)
         sys.exit(1)
@@ -118,10 +121,14 @@ def check_owners_file_against_directory_structure(
         "[INFO] Check owners file against directory structure. %s, %s, %s"
         % (category, organization, chart)
     )
-    data = open(os.path.join("charts", category, organization, chart, "OWNERS")).read()
-    out = yaml.load(data, Loader=Loader)
-    vendor_label = out["vendor"]["label"]
-    chart_name = out["chart"]["name"]
+    owners = authz.get_chart_owners(category, organization, chart)
+    if owners is None:
+        owners_path = os.path.join("charts", category, organization, chart, "OWNERS")
+        msg = f"[ERROR] {owners_path} file does not exist."
+        write_error_log(directory, msg)
+        sys.exit(1)
+    vendor_label = owners["vendor_label"]
+    chart_name = owners["chart"]
     error_exit = False
     msgs = []
     if organization != vendor_label:
@@ -160,17 +167,14 @@ def verify_signature(category, organization, chart, version):
         publickey = out.get("publicPgpKey")
         if not publickey:
             return
-        with open("public.key", "w") as fd:
-            fd.write(publickey)
-        out = subprocess.run(["gpg", "--import", "public.key"], capture_output=True)
-        print("[INFO]", out.stdout.decode("utf-8"))
-        print("[WARNING]", out.stderr.decode("utf-8"))
         report = os.path.join(
             "charts", category, organization, chart, version, "report.yaml"
         )
-        out = subprocess.run(["gpg", "--verify", sign, report], capture_output=True)
-        print("[INFO]", out.stdout.decode("utf-8"))
-        print("[WARNING]", out.stderr.decode("utf-8"))
+        result = keyring.get_keyring().verify(sign, report, publickey)
+        if result.valid:
+            print(f"[INFO] Signed report verified with key {result.fingerprint}")
+        else:
+            print(f"[WARNING] Signed report could not be verified: {result.message}")
     else:
         print(f"[INFO] Signed report not found: {sign}.")
 
@@ -438,7 +442,7 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
     if "charts.openshift.io/testedOpenShiftVersion" in annotations:
         full_version = annotations["charts.openshift.io/testedOpenShiftVersion"]
         try:
-            semantic_version.Version.coerce(full_version)
+            versions.coerce_version(full_version)
         except ValueError:
             msg = f"[ERROR] tested OpenShift version not conforming to SemVer spec: {full_version}"
             write_error_log(directory, msg)
@@ -446,7 +450,7 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
 
     if "charts.openshift.io/certifiedOpenShiftVersions" in annotations:
         full_version = annotations["charts.openshift.io/certifiedOpenShiftVersions"]
-        if not semver.VersionInfo.is_valid(full_version):
+        if not versions.is_valid_semver(full_version):
             msg = f"[ERROR] certified OpenShift version not conforming to SemVer spec: {full_version}"
             write_error_log(directory, msg)
             sys.exit(1)
@@ -455,10 +459,15 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
 def verify_package_digest(url, report):
     print("[INFO] check package digest.")
 
-    response = requests.get(url, allow_redirects=True)
-    if response.status_code == 200:
-        target_digest = hashlib.sha256(response.content).hexdigest()
+    target_digest = ""
+    package_digest = digest.digest_url(url)
+    if package_digest:
+        target_digest = package_digest.digest
+        print(
+            f"[INFO] calculated digest : {target_digest}, size: {package_digest.size}, time: {package_digest.elapsed:.2f}s"
+        )
 
+    pkg_digest = ""
     found, report_data = verifier_report.get_report_data(report)
     if found:
         pkg_digest = verifier_report.get_package_digest(report_data)
@@ -476,6 +485,41 @@ def verify_package_digest(url, report):
         )
 
 
+def check_submitted_report(directory, report_path, category, organization, chart):
+    """Check that the submitted report is valid, and that the PGP key in the OWNERS
+    file matches the key digest in the report of a signed chart.
+
+    Args:
+        directory (str): Local directory in which to write the error logs
+        report_path (str): Path to the submitted report.yaml
+        category (str): Type of profile (community, partners, or redhat)
+        organization (str): Name of the organization (ex: hashicorp)
+        chart (str): Name of the chart (ex: vault)
+    """
+    ocp_version_range = os.environ.get("OCP_VERSION_RANGE")
+    report_valid, message = verifier_report.validate(report_path, ocp_version_range)
+    if not report_valid:
+        msg = f"Submitted report is not valid: {message}"
+        print(f"[ERROR] {msg}")
+        write_error_log(directory, msg)
+        sys.exit(1)
+
+    print("[INFO] Submitted report passed validity check!")
+    owners_file = os.path.join("charts", category, organization, chart, "OWNERS")
+    pgp_key_in_owners = signedchart.get_pgp_key_from_owners(owners_file)
+    if pgp_key_in_owners:
+        if signedchart.check_report_for_signed_chart(report_path):
+            if not signedchart.check_pgp_public_key(pgp_key_in_owners, report_path):
+                msg = "PGP key in OWNERS file does not match with key digest in report."
+                print(f"[ERROR] {msg}")
+                write_error_log(directory, msg)
+                sys.exit(1)
+            else:
+                print(
+                    "[INFO] PGP key in OWNERS file matches with key digest in report."
+                )
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -507,10 +551,6 @@ def main():
     category, organization, chart, version = get_modified_charts(
         args.directory, args.api_url
     )
-    verify_user(args.directory, args.username, category, organization, chart)
-    check_owners_file_against_directory_structure(
-        args.directory, category, organization, chart
-    )
 
     report_generated = os.environ.get("REPORT_GENERATED")
     generated_report_path = os.environ.get("GENERATED_REPORT_PATH")
@@ -518,64 +558,111 @@ def main():
     env = Env()
     web_catalog_only = env.bool("WEB_CATALOG_ONLY", False)
 
+    # Nothing is downloaded and chart-verifier doesn't run for unauthorized users
+    checks = [
+        checkgraph.Check(
+            "verify-user",
+            verify_user,
+            (args.directory, args.username, category, organization, chart),
+        ),
+        checkgraph.Check(
+            "owners-file",
+            check_owners_file_against_directory_structure,
+            (args.directory, category, organization, chart),
+            depends_on=("verify-user",),
+        ),
+    ]
+
     submitted_report_path = os.path.join(
         "charts", category, organization, chart, version, "report.yaml"
     )
     if os.path.exists(submitted_report_path):
-        ocp_version_range = os.environ.get("OCP_VERSION_RANGE")
-        report_valid, message = verifier_report.validate(
-            submitted_report_path, ocp_version_range
-        )
-        if not report_valid:
-            msg = f"Submitted report is not valid: {message}"
-            print(f"[ERROR] {msg}")
-            write_error_log(args.directory, msg)
-            sys.exit(1)
-
-        print("[INFO] Submitted report passed validity check!")
-        owners_file = os.path.join("charts", category, organization, chart, "OWNERS")
-        pgp_key_in_owners = signedchart.get_pgp_key_from_owners(owners_file)
-        if pgp_key_in_owners:
-            if signedchart.check_report_for_signed_chart(submitted_report_path):
-                if not signedchart.check_pgp_public_key(
-                    pgp_key_in_owners, submitted_report_path
-                ):
-                    msg = "PGP key in OWNERS file does not match with key digest in report."
-                    print(f"[ERROR] {msg}")
-                    write_error_log(args.directory, msg)
-                    sys.exit(1)
-                else:
-                    print(
-                        "[INFO] PGP key in OWNERS file matches with key digest in report."
-                    )
-
         print("[INFO] Report exists: ", submitted_report_path)
-        verify_signature(category, organization, chart, version)
         report_path = submitted_report_path
         report_info_path = ""
+        report_checks = ("verify-user", "submitted-report")
+        checks.append(
+            checkgraph.Check(
+                "submitted-report",
+                check_submitted_report,
+                (args.directory, submitted_report_path, category, organization, chart),
+                depends_on=("verify-user",),
+            )
+        )
+        checks.append(
+            checkgraph.Check(
+                "signature",
+                verify_signature,
+                (category, organization, chart, version),
+                depends_on=report_checks,
+            )
+        )
         if report_generated and report_generated == "True":
-            match_checksum(
-                args.directory,
-                generated_report_info_path,
-                category,
-                organization,
-                chart,
-                version,
+            checks.append(
+                checkgraph.Check(
+                    "checksum",
+                    match_checksum,
+                    (
+                        args.directory,
+                        generated_report_info_path,
+                        category,
+                        organization,
+                        chart,
+                        version,
+                    ),
+                    depends_on=report_checks,
+                )
             )
         elif not web_catalog_only:
-            check_url(args.directory, report_path)
+            checks.append(
+                checkgraph.Check(
+                    "chart-url",
+                    check_url,
+                    (args.directory, report_path),
+                    depends_on=report_checks,
+                )
+            )
     else:
         print("[INFO] Report does not exist: ", submitted_report_path)
         report_path = generated_report_path
         report_info_path = generated_report_info_path
+        report_checks = ("verify-user",)
 
     print(f"[INFO]: report path: {report_path}")
     print(f"[INFO]: generated report path: {generated_report_path}")
     print(f"[INFO]: generated report info: {generated_report_info_path}")
 
-    match_name_and_version(
-        args.directory, category, organization, chart, version, generated_report_path
+    checks.append(
+        checkgraph.Check(
+            "name-and-version",
+            match_name_and_version,
+            (
+                args.directory,
+                category,
+                organization,
+                chart,
+                version,
+                generated_report_path,
+            ),
+            depends_on=report_checks,
+        )
     )
-    check_report_success(
-        args.directory, args.api_url, report_path, report_info_path, version
+    checks.append(
+        checkgraph.Check(
+            "report-success",
+            check_report_success,
+            (args.directory, args.api_url, report_path, report_info_path, version),
+            depends_on=report_checks,
+        )
     )
+
+    results = checkgraph.run_checks(checks)
+
+    error_messages = [msg for result in results for msg in result.messages]
+    if error_messages:
+        write_error_log(args.directory, *error_messages)
+
+    failed = [result.name for result in results if result.status != checkgraph.PASSED]
+    if failed:
+        print(f"[ERROR] checks not passed: {', '.join(failed)}")
+        sys.exit(1)
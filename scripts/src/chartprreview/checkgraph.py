@@ -0,0 +1,121 @@
+"""Run the checks of a chart submission concurrently.
+
+Each check is declared with the names of the checks it depends on. Checks whose
+dependencies passed are run on a thread pool, so that independent checks, which
+mostly wait on the network or on subprocesses, run at the same time. A check is
+skipped if one of its dependencies failed.
+
+A check fails by calling sys.exit with a non-zero code, as the chartprreview checks
+do, or by raising an exception. The error messages written by a check while it runs
+(see tools.messages) are kept with its result, so that the failures of all the
+checks can be reported at once.
+"""
+
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+sys.path.append("../")
+from tools import messages
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class Check:
+    name: str
+    func: callable
+    args: tuple = ()
+    depends_on: tuple = ()
+
+
+@dataclass
+class CheckResult:
+    name: str
+    status: str
+    messages: list = field(default_factory=list)
+
+
+def _run_check(check):
+    messages.start_collecting()
+    status = PASSED
+    try:
+        check.func(*check.args)
+    except SystemExit as err:
+        if err.code not in (0, None):
+            status = FAILED
+    except Exception as err:
+        print(f"[ERROR] check {check.name} raised an exception: {err}")
+        messages.collect_messages([f"[ERROR] {check.name}: {err}"])
+        status = FAILED
+    finally:
+        collected = messages.stop_collecting()
+    return CheckResult(check.name, status, collected)
+
+
+def run_checks(checks, max_workers=DEFAULT_MAX_WORKERS):
+    """Run checks, concurrently where their dependencies allow it
+
+    Args:
+        checks (list[Check]): The checks to run
+        max_workers (int): Maximum number of checks running at the same time
+
+    Returns:
+        list[CheckResult]: The results, in the order of the checks
+
+    Raises:
+        ValueError: if a check depends on an unknown check, or on itself through
+                    other checks
+    """
+    names = {check.name for check in checks}
+    for check in checks:
+        unknown = set(check.depends_on) - names
+        if unknown:
+            raise ValueError(
+                f"check {check.name} depends on unknown checks: {', '.join(sorted(unknown))}"
+            )
+
+    results = {}
+    pending = list(checks)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            progress = True
+            while progress:
+                progress = False
+                for check in list(pending):
+                    failed_deps = [
+                        dep
+                        for dep in check.depends_on
+                        if dep in results and results[dep].status != PASSED
+                    ]
+                    if failed_deps:
+                        print(
+                            f"[INFO] skip check {check.name}, it depends on: {', '.join(failed_deps)}"
+                        )
+                        results[check.name] = CheckResult(check.name, SKIPPED)
+                    elif all(dep in results for dep in check.depends_on):
+                        running[executor.submit(_run_check, check)] = check.name
+                    else:
+                        continue
+                    pending.remove(check)
+                    progress = True
+
+            if not running:
+                if pending:
+                    raise ValueError(
+                        f"circular dependency between checks: {', '.join(check.name for check in pending)}"
+                    )
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                print(f"[INFO] check {result.name}: {result.status}")
+                results[running.pop(future)] = result
+
+    return [results[check.name] for check in checks]
@@ -0,0 +1,99 @@
+import sys
+import threading
+
+import pytest
+
+from chartprreview import checkgraph
+from chartprreview.chartprreview import write_error_log
+
+
+def failing_check(directory, msg):
+    write_error_log(directory, msg)
+    sys.exit(1)
+
+
+def test_run_checks_collects_all_failures(tmp_path):
+    checks = [
+        checkgraph.Check("first", failing_check, (str(tmp_path), "first failed")),
+        checkgraph.Check("second", failing_check, (str(tmp_path), "second failed")),
+        checkgraph.Check("third", lambda: None),
+    ]
+
+    results = checkgraph.run_checks(checks)
+
+    assert [(r.name, r.status, r.messages) for r in results] == [
+        ("first", checkgraph.FAILED, ["first failed"]),
+        ("second", checkgraph.FAILED, ["second failed"]),
+        ("third", checkgraph.PASSED, []),
+    ]
+    # messages are only collected, the error log is written by the caller
+    assert not (tmp_path / "errors").exists()
+
+
+def test_run_checks_independent_checks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    checks = [
+        checkgraph.Check("first", barrier.wait),
+        checkgraph.Check("second", barrier.wait),
+    ]
+
+    results = checkgraph.run_checks(checks, max_workers=2)
+
+    assert [r.status for r in results] == [checkgraph.PASSED, checkgraph.PASSED]
+
+
+def test_run_checks_skips_dependents_of_failed_checks(tmp_path):
+    ran = []
+
+    def raising_check():
+        raise ValueError("boom")
+
+    checks = [
+        checkgraph.Check("dependent", ran.append, ("dependent",), ("failing",)),
+        checkgraph.Check("failing", raising_check),
+        checkgraph.Check("transitive", ran.append, ("transitive",), ("dependent",)),
+        checkgraph.Check("after-passed", ran.append, ("after-passed",), ("passing",)),
+        checkgraph.Check("passing", lambda: sys.exit(0)),
+    ]
+
+    results = {r.name: r for r in checkgraph.run_checks(checks)}
+
+    assert results["failing"].status == checkgraph.FAILED
+    assert results["failing"].messages == ["[ERROR] failing: boom"]
+    assert results["dependent"].status == checkgraph.SKIPPED
+    assert results["transitive"].status == checkgraph.SKIPPED
+    assert results["passing"].status == checkgraph.PASSED
+    assert results["after-passed"].status == checkgraph.PASSED
+    assert ran == ["after-passed"]
+
+
+def test_run_checks_invalid_dependencies():
+    with pytest.raises(ValueError, match="unknown"):
+        checkgraph.run_checks([checkgraph.Check("a", print, depends_on=("b",))])
+
+    with pytest.raises(ValueError, match="circular"):
+        checkgraph.run_checks(
+            [
+                checkgraph.Check("a", print, depends_on=("b",)),
+                checkgraph.Check("b", print, depends_on=("a",)),
+            ]
+        )
+
+
+def test_write_error_log_outside_checks(tmp_path):
+    write_error_log(str(tmp_path), "not collected")
+    assert (tmp_path / "errors").read_text() == "not collected\n"
+
+
+def test_report_info_errors_are_collected(tmp_path, monkeypatch):
+    from report import report_info
+
+    monkeypatch.setenv("WORKFLOW_WORKING_DIRECTORY", str(tmp_path))
+
+    def report_check():
+        report_info.write_error_log("[ERROR] from report_info")
+        sys.exit(1)
+
+    (result,) = checkgraph.run_checks([checkgraph.Check("report", report_check)])
+    assert result.messages == ["[ERROR] from report_info"]
+    assert not (tmp_path / "errors").exists()
@@ -21,13 +21,13 @@ update occurs in a later step.
 
 import argparse
 import base64
+import copy
 import json
 import os
 import re
 import shutil
 import subprocess
 import sys
-import tempfile
 import time
 import urllib.parse
 
@@ -35,12 +35,12 @@ import yaml
 from environs import Env
 
 try:
-    from yaml import CDumper as Dumper
     from yaml import CSafeLoader as SafeLoader
 except ImportError:
-    from yaml import Dumper, SafeLoader
+    from yaml import SafeLoader
 
 sys.path.append("../")
+from chartartifact import metadata, repackage
 from pullrequest import prartifact
 from reporegex import matchers
 from report import report_info
@@ -261,19 +261,12 @@ def create_index_from_chart(chart_file_name):
         dict: content of Chart.yaml, to be used as index entry.
     """
     print("[INFO] create index from chart. %s" % (chart_file_name))
-    out = subprocess.run(
-        [
-            "helm",
-            "show",
-            "chart",
-            os.path.join(".cr-release-packages", chart_file_name),
-        ],
-        capture_output=True,
+    crt = copy.deepcopy(
+        metadata.get_chart_metadata(
+            os.path.join(".cr-release-packages", chart_file_name)
+        )
     )
-    p = out.stdout.decode("utf-8")
-    print(p)
-    print(out.stderr.decode("utf-8"))
-    crt = yaml.load(p, Loader=SafeLoader)
+    print(yaml.dump(crt))
     return crt
 
 
@@ -335,8 +328,11 @@ def create_index_from_report(category, ocp_version_range, report_path):
 def update_chart_annotation(
     category, organization, chart_file_name, chart, ocp_version_range, report_path
 ):
-    """Untar the helm release that was placed under .cr-release-packages, update the
-    chart's annotations, and repackage the Helm release.
+    """Update the chart's annotations in the helm release that was placed under
+    .cr-release-packages.
+
+    The archive is rewritten in place: only its Chart.yaml is replaced, every other
+    file is copied as is (see chartartifact.repackage).
 
     In particular, following manipulations are performed on annotations:
     * Gets the dict of annotations from the report file.
@@ -359,8 +355,6 @@ def update_chart_annotation(
         "[INFO] Update chart annotation. %s, %s, %s, %s, %s"
         % (category, organization, chart_file_name, chart, ocp_version_range)
     )
-    dr = tempfile.mkdtemp(prefix="annotations-")
-
     annotations = indexannotations.getIndexAnnotations(ocp_version_range, report_path)
 
     print("category:", category)
@@ -380,47 +374,20 @@ def update_chart_annotation(
         vendor_name = out["vendor"]["name"]
         annotations["charts.openshift.io/provider"] = vendor_name
 
-    out = subprocess.run(
-        [
-            "tar",
-            "zxvf",
-            os.path.join(".cr-release-packages", f"{chart_file_name}"),
-            "-C",
-            dr,
-        ],
-        capture_output=True,
-    )
-    print(out.stdout.decode("utf-8"))
-    print(out.stderr.decode("utf-8"))
-
-    fd = open(os.path.join(dr, chart, "Chart.yaml"))
-    data = yaml.load(fd, Loader=SafeLoader)
-
-    if "annotations" not in data:
-        data["annotations"] = annotations
-    else:
-        # merge the existing annotations with our new ones, overwriting
-        # values for overlapping keys with our own.
-        # Overwriting is important because the chart may contain values that we
-        # must override, such as the providerType which changes in redhat-to-community cases.
-        # |= syntax requires py3.9
-        data["annotations"] |= annotations
-    out = yaml.dump(data, Dumper=Dumper)
-    with open(os.path.join(dr, chart, "Chart.yaml"), "w") as fd:
-        fd.write(out)
-
-    out = subprocess.run(
-        ["helm", "package", os.path.join(dr, chart)], capture_output=True
-    )
-    print(out.stdout.decode("utf-8"))
-    print(out.stderr.decode("utf-8"))
-
-    try:
-        os.remove(os.path.join(".cr-release-packages", chart_file_name))
-    except FileNotFoundError:
-        pass
-
-    shutil.move(chart_file_name, ".cr-release-packages")
+    def merge_annotations(data):
+        if "annotations" not in data:
+            data["annotations"] = annotations
+        else:
+            # merge the existing annotations with our new ones, overwriting
+            # values for overlapping keys with our own.
+            # Overwriting is important because the chart may contain values that we
+            # must override, such as the providerType which changes in redhat-to-community cases.
+            # |= syntax requires py3.9
+            data["annotations"] |= annotations
+        return data
+
+    chart_path = os.path.join(".cr-release-packages", chart_file_name)
+    repackage.update_chart_yaml(chart_path, chart_path, chart, merge_annotations)
 
 
 def main():
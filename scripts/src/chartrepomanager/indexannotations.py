@@ -1,9 +1,8 @@
 import sys
 
-import semantic_version
-
 sys.path.append("../")
 from report import report_info
+from tools import versions
 
 
 def getIndexAnnotations(ocp_version_range, report_path):
@@ -29,8 +28,10 @@ def getIndexAnnotations(ocp_version_range, report_path):
     for annotation in annotations:
         if annotation == "charts.openshift.io/certifiedOpenShiftVersions":
             full_version = annotations[annotation]
-            if full_version != "N/A" and semantic_version.validate(full_version):
-                ver = semantic_version.Version(full_version)
+            if full_version != "N/A" and versions.is_valid_semantic_version(
+                full_version
+            ):
+                ver = versions.parse_version(full_version)
                 set_annotations["charts.openshift.io/testedOpenShiftVersion"] = (
                     f"{ver.major}.{ver.minor}"
                 )
@@ -49,3 +50,18 @@ def getIndexAnnotations(ocp_version_range, report_path):
         )
 
     return set_annotations
+
+
+def getOCPVersions(kubeVersion):
+    """Get the range of OCP versions supporting a chart, from its kubeVersion.
+
+    Args:
+        kubeVersion (str): kubeVersion of the chart, e.g. ">=1.20.0"
+
+    Returns:
+        str: Range of supported OCP versions, e.g. ">=4.7"
+
+    Raises:
+        ValueError: if kubeVersion is not a valid range of Kubernetes versions
+    """
+    return versions.get_ocp_range(kubeVersion)
@@ -1,20 +1,16 @@
 import argparse
-import os
 import sys
 import time
 
-import requests
+sys.path.append("../")
+from tools import github_client
 
 
 def ensure_pull_request_not_merged(api_url):
     # api_url https://api.github.com/repos/<organization-name>/<repository-name>/pulls/1
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-    }
     merged = False
     for i in range(20):
-        r = requests.get(api_url, headers=headers)
+        r = github_client.get_client().get(api_url)
         response_content = r.json()
         if "message" in response_content:
             print(f'[ERROR] merge status: {response_content["message"]}')
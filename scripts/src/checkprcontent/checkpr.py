@@ -1,24 +1,17 @@
 import argparse
-import json
 import os
 import re
 import sys
 
-import requests
-import semver
-import yaml
 from reporegex import matchers
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
-
 sys.path.append("../")
 from owners import owners_file
+from precheck import releaselookup
 from pullrequest import prartifact
+from reporegex import classifier
 from report import verifier_report
-from tools import gitutils
+from tools import gitutils, versions
 
 ALLOW_CI_CHANGES = "allow/ci-changes"
 
@@ -27,7 +20,7 @@ def check_web_catalog_only(report_in_pr, num_files_in_pr, report_file_match):
     print(f"[INFO] report in PR {report_in_pr}")
     print(f"[INFO] num files in PR {num_files_in_pr}")
 
-    category, organization, chart, version = report_file_match.groups()
+    category, organization, chart, version = report_file_match.submission
 
     print(f"read owners file : {category}/{organization}/{chart}")
     found_owners, owner_data = owners_file.get_owner_data(category, organization, chart)
@@ -124,28 +117,28 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
             return
 
     files = prartifact.get_modified_files(api_url)
-    pattern, reportpattern, tarballpattern = get_file_match_compiled_patterns()
+    path_classifier = classifier.get_classifier()
     matches_found = 0
     report_found = False
     none_chart_files = {}
 
     for file_path in files:
-        match = pattern.match(file_path)
-        if not match:
+        record = path_classifier.classify(file_path)
+        if record.version is None:
             file_name = os.path.basename(file_path)
             none_chart_files[file_name] = file_path
         else:
             matches_found += 1
-            if reportpattern.match(file_path):
+            if record.kind == classifier.REPORT:
                 print(f"[INFO] Report found: {file_path}")
                 gitutils.add_output("report-exists", "true")
                 report_found = True
             else:
-                tar_match = tarballpattern.match(file_path)
-                if tar_match:
+                # Any path with .tgz under the version directory, even under src/
+                tar_name = record.tarball
+                if tar_name:
                     print(f"[INFO] tarball found: {file_path}")
-                    _, _, chart_name, chart_version, tar_name = tar_match.groups()
-                    expected_tar_name = f"{chart_name}-{chart_version}.tgz"
+                    expected_tar_name = f"{record.chart}-{record.version}.tgz"
                     if tar_name != expected_tar_name:
                         msg = f"[ERROR] the tgz file is named incorrectly. Expected: {expected_tar_name}. Got: {tar_name}"
                         print(msg)
@@ -153,8 +146,8 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
                         exit(1)
 
             if matches_found == 1:
-                pattern_match = match
-            elif pattern_match.groups() != match.groups():
+                first_record = record
+            elif first_record.submission != record.submission:
                 msg = "[ERROR] A PR must contain only one chart. Current PR includes files for multiple charts."
                 print(msg)
                 gitutils.add_output("pr-content-error-message", msg)
@@ -190,17 +183,17 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
 
         sys.exit(1)
 
-    check_web_catalog_only(report_found, matches_found, pattern_match)
+    check_web_catalog_only(report_found, matches_found, first_record)
 
     if matches_found > 0:
-        category, organization, chart, version = pattern_match.groups()
+        category, organization, chart, version = first_record.submission
         gitutils.add_output(
             "category", f"{'partner' if category == 'partners' else category}"
         )
         gitutils.add_output("organization", organization)
         gitutils.add_output("chart-name", chart)
 
-        if not semver.VersionInfo.is_valid(version):
+        if not versions.is_valid_semver(version):
             msg = (
                 f"[ERROR] Helm chart version is not a valid semantic version: {version}"
             )
@@ -221,59 +214,26 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
             gitutils.add_output("pr-content-error-message", msg)
             sys.exit(1)
 
-        # Check the index.yaml for the existence of this chart at this version.
-        print("Downloading index.yaml", category, organization, chart, version)
-        r = requests.get(
-            f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
-        )
-
-        if r.status_code == 200:
-            data = yaml.load(r.text, Loader=Loader)
-        else:
-            data = {"apiVersion": "v1", "entries": {}}
-
+        # Check that this chart version is neither in the index.yaml nor released.
+        print("Looking up release", category, organization, chart, version)
         entry_name = chart
-        d = data["entries"].get(entry_name, [])
         gitutils.add_output("chart-entry-name", entry_name)
-        for v in d:
-            if v["version"] == version:
-                msg = f"[ERROR] Helm chart release already exists in the index.yaml: {version}"
-                print(msg)
-                gitutils.add_output("pr-content-error-message", msg)
-                sys.exit(1)
-
         tag_name = f"{organization}-{chart}-{version}"
         gitutils.add_output("release_tag", tag_name)
-        tag_api = f"https://api.github.com/repos/{repository}/git/ref/tags/{tag_name}"
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-        }
-        print(f"[INFO] checking tag: {tag_api}")
-        r = requests.head(tag_api, headers=headers)
-        if r.status_code == 200:
-            msg = f"[ERROR] Helm chart release already exists in the GitHub Release/Tag: {tag_name}"
-            print(msg)
-            gitutils.add_output("pr-content-error-message", msg)
+        lookup = releaselookup.check_release(
+            repository,
+            entry_name,
+            version,
+            tag_name,
+            index_url=releaselookup.get_index_url(repository, branch),
+        )
+        if not lookup.available:
+            for msg in lookup.get_error_messages():
+                print(msg)
+            gitutils.add_output(
+                "pr-content-error-message", lookup.get_error_messages()[0]
+            )
             sys.exit(1)
-        try:
-            if prartifact.xRateLimit in r.headers:
-                print(
-                    f"[DEBUG] {prartifact.xRateLimit} : {r.headers[prartifact.xRateLimit]}"
-                )
-            if prartifact.xRateRemain in r.headers:
-                print(
-                    f"[DEBUG] {prartifact.xRateRemain}  : {r.headers[prartifact.xRateRemain]}"
-                )
-
-            response_content = r.json()
-            if "message" in response_content:
-                print(
-                    f'[ERROR] getting index file content: {response_content["message"]}'
-                )
-                sys.exit(1)
-        except json.decoder.JSONDecodeError:
-            pass
 
 
 def main():
@@ -0,0 +1,192 @@
+"""Shared access to Helm repository index files.
+
+Several steps of the workflows download and parse the same index.yaml. This module
+is the single place doing so:
+* Index files are stored in an on-disk cache, keyed by URL. The cache location can be
+  set with the INDEX_CACHE_DIR environment variable.
+* Cached copies are revalidated with a conditional GET (If-None-Match /
+  If-Modified-Since), so an unchanged index is not downloaded again.
+* Parsed indexes are memoized in-process, so an index is parsed at most once per
+  process regardless of the number of lookups. Failures are not memoized, the next
+  lookup tries again. Each URL has its own lock: fetching an index doesn't block
+  the lookups of other indexes.
+* The versions of each chart of an index can be looked up in constant time, see
+  load_version_index.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import requests
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "helm-index-cache")
+
+_memo = {}
+_version_memo = {}
+_url_locks = {}
+_lock = threading.Lock()
+
+
+def _get_url_lock(url):
+    with _lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+
+def get_cache_dir():
+    return os.environ.get("INDEX_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def _get_cache_paths(url):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    cache_dir = get_cache_dir()
+    return os.path.join(cache_dir, f"{key}.yaml"), os.path.join(
+        cache_dir, f"{key}.json"
+    )
+
+
+def _read_cache_info(info_path):
+    try:
+        with open(info_path) as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch_index_file(url, timeout=None):
+    """Retrieve the index file at the given URL, using the on-disk cache.
+
+    Args:
+        url (str): URL of the index file
+        timeout (float): if set, timeout of the connection and of each read, in
+                         seconds
+
+    Returns:
+        str: Path to an up-to-date local copy of the index file, or None if the index
+             file could not be retrieved. The returned file belongs to the cache and
+             must not be modified.
+    """
+    index_path, info_path = _get_cache_paths(url)
+    cache_info = _read_cache_info(info_path) if os.path.exists(index_path) else {}
+
+    headers = {}
+    if cache_info.get("etag"):
+        headers["If-None-Match"] = cache_info["etag"]
+    if cache_info.get("last_modified"):
+        headers["If-Modified-Since"] = cache_info["last_modified"]
+
+    print(f"[INFO] Downloading index: {url}")
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            print("[INFO] Index not modified, using cached copy")
+            return index_path
+
+        if r.status_code != 200:
+            print(f"[INFO] Index not available, status code: {r.status_code}")
+            return None
+
+        os.makedirs(get_cache_dir(), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=get_cache_dir(), suffix=".tmp")
+        with os.fdopen(fd, "wb") as out:
+            for chunk in r.iter_content(chunk_size=1024 * 1024):
+                out.write(chunk)
+        os.replace(tmp_path, index_path)
+
+        cache_info = {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+        }
+        with open(info_path, "w") as fd:
+            json.dump(cache_info, fd)
+
+    return index_path
+
+
+def load_index(url, timeout=None):
+    """Retrieve and parse the index file at the given URL.
+
+    The index is downloaded and parsed at most once per process, once it could be
+    retrieved.
+
+    Args:
+        url (str): URL of the index file
+        timeout (float): see fetch_index_file
+
+    Returns:
+        dict: Content of the index, or None if the index file could not be retrieved.
+              The returned dict is shared between callers and must not be modified.
+    """
+    with _get_url_lock(url):
+        if url in _memo:
+            return _memo[url]
+        index_path = fetch_index_file(url, timeout=timeout)
+        if not index_path:
+            return None
+        with open(index_path) as fd:
+            index = yaml.load(fd, Loader=SafeLoader)
+        with _lock:
+            _memo[url] = index
+        return index
+
+
+def build_version_index(index):
+    """Map the name of each chart of an index to the set of its versions
+
+    Args:
+        index (dict): Content of the index
+
+    Returns:
+        dict: set of versions, by chart name
+
+    Raises:
+        KeyError: if the index has no entries
+    """
+    return {
+        name: frozenset(entry["version"] for entry in entries or [])
+        for name, entries in index["entries"].items()
+    }
+
+
+def load_version_index(url, timeout=None):
+    """Retrieve the index file at the given URL and map its charts to their versions
+
+    The mapping is built at most once per process, once the index could be
+    retrieved.
+
+    Args:
+        url (str): URL of the index file
+        timeout (float): see fetch_index_file
+
+    Returns:
+        dict: set of versions, by chart name, see build_version_index. Empty if the
+              index file could not be retrieved.
+
+    Raises:
+        KeyError: if the index has no entries
+    """
+    with _lock:
+        if url in _version_memo:
+            return _version_memo[url]
+    index = load_index(url, timeout=timeout)
+    if not index:
+        return {}
+    with _get_url_lock(url):
+        if url not in _version_memo:
+            _version_memo[url] = build_version_index(index)
+        return _version_memo[url]
+
+
+def clear_memo():
+    """Forget about the indexes parsed so far in this process"""
+    with _lock:
+        _memo.clear()
+        _version_memo.clear()
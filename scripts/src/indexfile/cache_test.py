@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+import responses
+from responses import matchers
+
+from indexfile import cache
+
+index_url = "https://charts.example.com/index.yaml"
+index_content = """\
+apiVersion: v1
+entries:
+  awesome:
+  - name: awesome
+    version: 1.42.0
+generated: '2024-01-01T00:00:00.000000+00:00'
+"""
+
+
+@pytest.fixture(autouse=True)
+def index_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("INDEX_CACHE_DIR", str(tmp_path))
+    cache.clear_memo()
+    yield tmp_path
+    cache.clear_memo()
+
+
+@responses.activate
+def test_fetch_index_file_revalidates_cached_copy():
+    responses.get(index_url, body=index_content, headers={"ETag": '"abc"'})
+    index_path = cache.fetch_index_file(index_url)
+    with open(index_path) as fd:
+        assert fd.read() == index_content
+
+    responses.replace(
+        responses.GET,
+        index_url,
+        status=304,
+        match=[matchers.header_matcher({"If-None-Match": '"abc"'})],
+    )
+    assert cache.fetch_index_file(index_url) == index_path
+    with open(index_path) as fd:
+        assert fd.read() == index_content
+
+
+@responses.activate
+def test_fetch_index_file_not_found():
+    responses.get(index_url, status=404)
+    assert cache.fetch_index_file(index_url) is None
+    assert cache.load_index(index_url) is None
+
+
+@responses.activate
+def test_load_index_is_memoized():
+    responses.get(index_url, body=index_content)
+
+    data = cache.load_index(index_url)
+    assert data["entries"]["awesome"][0]["version"] == "1.42.0"
+    assert cache.load_index(index_url) is data
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_load_index_failure_is_not_memoized():
+    responses.get(index_url, status=503)
+    assert cache.load_index(index_url) is None
+    assert cache.load_version_index(index_url) == {}
+
+    responses.replace(responses.GET, index_url, body=index_content)
+    assert cache.load_index(index_url)["entries"]["awesome"][0]["version"] == "1.42.0"
+    assert cache.load_version_index(index_url) == {"awesome": {"1.42.0"}}
+
+
+def test_load_index_does_not_block_other_urls(monkeypatch):
+    other_url = "https://other.example.com/index.yaml"
+    fetching = threading.Event()
+    release = threading.Event()
+
+    def fetch_index_file(url, timeout=None):
+        if url == index_url:
+            fetching.set()
+            release.wait(5)
+        return None
+
+    monkeypatch.setattr(cache, "fetch_index_file", fetch_index_file)
+    slow = threading.Thread(target=cache.load_index, args=(index_url,))
+    slow.start()
+    try:
+        assert fetching.wait(5)
+        # Returns while the download of the other index is still in progress
+        assert cache.load_index(other_url) is None
+        assert slow.is_alive()
+    finally:
+        release.set()
+        slow.join()
@@ -1,57 +1,46 @@
-import json
+import functools
+import heapq
 import sys
 
-import requests
-import semantic_version
-import yaml
-
 sys.path.append("../")
+from indexfile import cache
+from tools import versions
 
 INDEX_FILE = "https://charts.openshift.io/index.yaml"
 
 
-def _make_http_request(url, body=None, params={}, headers={}, verbose=False):
-    response = requests.get(url, params=params, headers=headers, json=body)
-    if verbose:
-        print(json.dumps(headers, indent=4, sort_keys=True))
-        print(json.dumps(body, indent=4, sort_keys=True))
-        print(json.dumps(params, indent=4, sort_keys=True))
-        print(response.text)
-    return response.text
+def _load_index_yaml():
+    return cache.load_index(INDEX_FILE)
 
 
-def _load_index_yaml():
-    yaml_text = _make_http_request(INDEX_FILE)
-    dct = yaml.safe_load(yaml_text)
-    return dct
+def build_chart_lookup(index_dct):
+    """Build a mapping of release names to their index entry.
 
+    Release names are of the form "<entry>-<version>", e.g. "vault-0.17.0". If several
+    index entries share the same release name, the first one in the index wins.
 
-def get_chart_info(tar_name):
-    index_dct = _load_index_yaml()
+    Args:
+        index_dct (dict): Content of the Helm repo index
+
+    Returns:
+        dict: mapping of release names to their (entry name, chart) index entry
+    """
+    chart_lookup = {}
     for entry, charts in index_dct["entries"].items():
-        if tar_name.startswith(entry):
-            for chart in charts:
-                index_tar_name = f"{entry}-{chart['version']}"
-                if tar_name == index_tar_name:
-                    print(f"[INFO] match found: {tar_name}")
-                    providerType = chart["annotations"][
-                        "charts.openshift.io/providerType"
-                    ]
-                    provider = chart["annotations"]["charts.openshift.io/provider"]
-                    return providerType, provider, chart["name"], chart["version"]
-    print(f"[INFO] match not found: {tar_name}")
-    return "", "", "", ""
+        for chart in charts:
+            chart_lookup.setdefault(f"{entry}-{chart['version']}", (entry, chart))
+    return chart_lookup
 
 
-def get_charts_info():
+def build_charts_info(index_dct):
+    """Build the summary of all charts in the index, see get_charts_info"""
     chart_info_list = []
-
-    index_dct = _load_index_yaml()
     for entry, charts in index_dct["entries"].items():
         for chart in charts:
             chart_info = {}
             chart_info["name"] = chart["name"]
             chart_info["version"] = chart["version"]
+            chart_info["created"] = chart.get("created", "")
             chart_info["providerType"] = chart["annotations"][
                 "charts.openshift.io/providerType"
             ]
@@ -72,41 +61,96 @@ def get_charts_info():
     return chart_info_list
 
 
-def get_latest_charts():
-    chart_list = get_charts_info()
+@functools.cache
+def _get_chart_lookup():
+    return build_chart_lookup(_load_index_yaml())
 
-    print(f"{len(chart_list)} charts found in Index file")
 
-    chart_in_process = {"name": ""}
-    chart_latest_version = ""
-    latest_charts = []
+@functools.cache
+def _get_charts_info():
+    return build_charts_info(_load_index_yaml())
 
-    for index, chart in enumerate(chart_list):
-        chart_name = chart["name"]
-        # print(f'[INFO] look for latest chart : {chart_name} {chart["version"]}')
-        if chart_name == chart_in_process["name"]:
-            new_version = semantic_version.Version.coerce(chart["version"])
-            # print(f'   [INFO] compare chart versions : {new_version}({chart["version"]}) : {chart_latest_version}')
-            if new_version > chart_latest_version:
-                # print(f'   [INFO] a new latest chart version : {new_version}')
-                chart_latest_version = new_version
-                chart_in_process = chart
-        else:
-            if chart_in_process["name"] != "":
-                # print(f'   [INFO] chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-                latest_charts.append(chart_in_process)
-
-                # print(f'[INFO] new  chart found : {chart_name} {chart["version"]}')
-                chart_in_process = chart
-                chart_version = chart["version"]
-                if chart_version.startswith("v"):
-                    chart_version = chart_version[1:]
-                chart_latest_version = semantic_version.Version.coerce(chart_version)
-            else:
-                chart_in_process = chart
 
-        if index + 1 == len(chart_list):
-            # print(f'   [INFO] last chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-            latest_charts.append(chart_in_process)
+def get_chart_info(tar_name):
+    match = _get_chart_lookup().get(tar_name)
+    if match:
+        print(f"[INFO] match found: {tar_name}")
+        _, chart = match
+        providerType = chart["annotations"]["charts.openshift.io/providerType"]
+        provider = chart["annotations"]["charts.openshift.io/provider"]
+        return providerType, provider, chart["name"], chart["version"]
+    print(f"[INFO] match not found: {tar_name}")
+    return "", "", "", ""
 
+
+def get_charts_info():
+    return [dict(chart_info) for chart_info in _get_charts_info()]
+
+
+def _chart_version_key(chart_info):
+    """Sort key of a chart's version, charts with an invalid version come first.
+
+    Equal versions, such as "1.0" and "v1.0.0", are ordered by version string, then
+    by creation date, so that the order of the charts doesn't matter.
+    """
+    version = versions.parse_chart_version(chart_info["version"])
+    return (
+        version is not None,
+        version,
+        chart_info["version"],
+        chart_info.get("created", ""),
+    )
+
+
+def select_latest_charts(chart_list, top_n=1):
+    """Select the latest versions of each chart.
+
+    Charts are told apart by provider and name, as the entries of the index are: charts
+    of the same name published by different providers are selected separately. The
+    charts don't need to be grouped or ordered in any way. Charts with an invalid
+    version are only selected if no valid version exists. Among equal versions, the
+    selection is deterministic, see _chart_version_key.
+
+    Args:
+        chart_list (list[dict]): Charts, as returned by get_charts_info
+        top_n (int): Number of versions to select per chart
+
+    Returns:
+        list[dict]: The top_n latest versions of each chart, latest first. Charts are
+                    in order of first appearance in chart_list.
+    """
+    if top_n == 1:
+        latest_charts = {}
+        for chart in chart_list:
+            key = (chart["provider"], chart["name"])
+            latest_chart = latest_charts.get(key)
+            if latest_chart is None or _chart_version_key(chart) > _chart_version_key(
+                latest_chart
+            ):
+                latest_charts[key] = chart
+        return list(latest_charts.values())
+
+    charts_by_name = {}
+    for chart in chart_list:
+        charts_by_name.setdefault((chart["provider"], chart["name"]), []).append(chart)
+
+    latest_charts = []
+    for charts in charts_by_name.values():
+        latest_charts.extend(heapq.nlargest(top_n, charts, key=_chart_version_key))
     return latest_charts
+
+
+def get_latest_charts(top_n=1):
+    """Get the latest version of each chart in the index
+
+    Args:
+        top_n (int): Number of versions to return per chart
+
+    Returns:
+        list[dict]: The top_n latest versions of each chart, see select_latest_charts
+    """
+    chart_list = get_charts_info()
+
+    print(f"{len(chart_list)} charts found in Index file")
+
+    return select_latest_charts(chart_list, top_n)
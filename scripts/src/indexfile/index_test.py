@@ -0,0 +1,81 @@
+import random
+
+from indexfile import index
+
+
+def make_chart_info(name, version, created="", provider="acme"):
+    return {"name": name, "version": version, "created": created, "provider": provider}
+
+
+chart_list = [
+    make_chart_info("awesome", "1.2.0"),
+    make_chart_info("awesome", "v1.10.0"),
+    make_chart_info("awesome", "1.9.0"),
+    make_chart_info("awesome", "not-a-version"),
+    make_chart_info("great", "0.1.0"),
+    make_chart_info("great", "0.1"),
+    make_chart_info("single", "2.0.0-rc1"),
+    make_chart_info("twin", "1.0.0", "2024-01-01T00:00:00Z", "acme"),
+    make_chart_info("twin", "1.0.0", "2024-02-01T00:00:00Z", "other"),
+    make_chart_info("twin", "0.9.0", "2024-03-01T00:00:00Z", "other"),
+    make_chart_info("republished", "1.0.0", "2024-01-01T00:00:00Z"),
+    make_chart_info("republished", "1.0.0", "2024-02-01T00:00:00Z"),
+]
+
+
+def versions(charts):
+    return [(chart["name"], chart["version"]) for chart in charts]
+
+
+def test_select_latest_charts():
+    assert versions(index.select_latest_charts(chart_list)) == [
+        ("awesome", "v1.10.0"),
+        ("great", "0.1.0"),
+        ("single", "2.0.0-rc1"),
+        ("twin", "1.0.0"),
+        ("twin", "1.0.0"),
+        ("republished", "1.0.0"),
+    ]
+
+
+def test_select_latest_charts_per_provider():
+    latest = index.select_latest_charts(chart_list)
+    assert [chart["provider"] for chart in latest[3:5]] == ["acme", "other"]
+
+
+def test_select_latest_charts_is_order_independent():
+    expected = index.select_latest_charts(chart_list)
+    # Equal versions are tie-broken by version string, then creation date
+    assert expected[1]["version"] == "0.1.0"
+    assert expected[5]["created"] == "2024-02-01T00:00:00Z"
+
+    for seed in range(20):
+        shuffled = list(chart_list)
+        random.Random(seed).shuffle(shuffled)
+        for top_n in (1, 2):
+            latest = index.select_latest_charts(shuffled, top_n)
+            assert sorted(map(id, latest)) == sorted(
+                map(id, index.select_latest_charts(chart_list, top_n))
+            )
+
+
+def test_select_latest_charts_top_n():
+    assert versions(index.select_latest_charts(chart_list, top_n=3)) == [
+        ("awesome", "v1.10.0"),
+        ("awesome", "1.9.0"),
+        ("awesome", "1.2.0"),
+        ("great", "0.1.0"),
+        ("great", "0.1"),
+        ("single", "2.0.0-rc1"),
+        ("twin", "1.0.0"),
+        ("twin", "1.0.0"),
+        ("twin", "0.9.0"),
+        ("republished", "1.0.0"),
+        ("republished", "1.0.0"),
+    ]
+
+
+def test_select_latest_charts_invalid_versions_only():
+    charts = [make_chart_info("broken", "latest"), make_chart_info("broken", "next")]
+    assert versions(index.select_latest_charts(charts)) == [("broken", "next")]
+    assert versions(index.select_latest_charts(charts[::-1])) == [("broken", "next")]
@@ -1,23 +1,18 @@
 import argparse
-import itertools
+import heapq
 import os
-import re
 import sys
+from datetime import timezone
 
-import analytics
-import requests
 from github import Github
 
 sys.path.append("../")
-from collections import OrderedDict
-
 from indexfile import index
+from metrics import prscan, prstate, releases, sink
+from pullrequest import manifest
 from pullrequest import prepare_pr_comment as pr_comment
-from reporegex import matchers
+from reporegex import classifier
 
-file_pattern = re.compile(
-    matchers.submission_path_matcher(strict_categories=False) + r"/.*"
-)
 chart_downloads_event = "Chart Downloads v1.0"
 ignore_users = [
     "zonggen",
@@ -33,8 +28,6 @@ pr_submission = "PR Submission v1.0"
 pr_merged = "PR Merged v1.0"
 pr_outcome = "PR Outcome v1.0"
 charts = "charts"
-xRateLimit = "X-RateLimit-Limit"
-xRateRemain = "X-RateLimit-Remaining"
 
 
 def parse_response(response):
@@ -52,90 +45,77 @@ def parse_response(response):
 
 
 def get_release_metrics():
-    result = []
-    for i in itertools.count(start=1):
-        request_headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-        }
-        response = requests.get(
-            f"https://api.github.com/repos/openshift-helm-charts/charts/releases?per_page=100&page={i}",
-            headers=request_headers,
-        )
-
-        if not 200 <= response.status_code < 300:
-            print(
-                f"[ERROR] unexpected response getting release data : {response.status_code} : {response.reason}"
-            )
-            sys.exit(1)
-
-        response_json = response.json()
-        if xRateLimit in response.headers:
-            print(f"[DEBUG] {xRateLimit} : {response.headers[xRateLimit]}")
-        if xRateRemain in response.headers:
-            print(f"[DEBUG] {xRateRemain}  : {response.headers[xRateRemain]}")
+    try:
+        return parse_response(releases.iter_releases())
+    except releases.ReleaseHarvestError as err:
+        print(f"[ERROR] {err}")
+        sys.exit(1)
 
-        if "message" in response_json:
-            print(f'[ERROR] getting pr files: {response_json["message"]}')
-            sys.exit(1)
 
-        if len(response_json) == 0:
-            break
-        result.extend(response_json)
-    return parse_response(result)
+def aggregate_release_downloads(downloads, get_chart_info=None, top_n=5):
+    """Aggregate the downloads of the chart release assets.
 
+    Args:
+        downloads (iterable[dict]): release assets, as returned by parse_response
+        get_chart_info (callable): resolves a release name to the chart info, see
+                                   indexfile.index.get_chart_info (the default)
+        top_n (int): number of charts in the top downloads
 
-def send_release_metrics(write_key, downloads, prefix):
+    Returns:
+        tuple: (chart_downloads, top_charts). chart_downloads has the downloads of
+               every asset, most downloaded first. top_charts has the top_n charts,
+               by downloads of their most downloaded asset, most downloaded first.
+               Items are dicts with downloads, name (of the asset) and provider.
+    """
+    get_chart_info = get_chart_info or index.get_chart_info
     metrics = {}
-    chart_downloads = []
-    chart_downloads_latest = []
     for release in downloads:
-        _, provider, chart, _ = index.get_chart_info(release.get("name"))
+        _, provider, chart, _ = get_chart_info(release.get("name"))
         if len(provider) > 0:
-            if provider not in metrics:
-                metrics[provider] = {}
-            if chart not in metrics[provider]:
-                metrics[provider][chart] = {}
-
-            for key in release.get("asset"):
-                metrics[provider][chart][key] = release.get("asset")[key]
-
-    for provider in metrics:
-        for chart in metrics[provider]:
-            ordered_download_perChart = OrderedDict(
-                sorted(
-                    metrics[provider][chart].items(), key=lambda i: i[1], reverse=True
-                )
+            metrics.setdefault(provider, {}).setdefault(chart, {}).update(
+                release.get("asset")
             )
-            for key, value in ordered_download_perChart.items():
-                chart_downloads_latest.append(
-                    {"downloads": value, "name": key, "provider": provider}
-                )
-                break
-            for key, value in metrics[provider][chart].items():
+
+    chart_downloads = []
+    chart_downloads_latest = []
+    for provider, charts in metrics.items():
+        for assets in charts.values():
+            # max keeps the first of the most downloaded assets, as a stable sort would
+            name, value = max(assets.items(), key=lambda i: i[1])
+            chart_downloads_latest.append(
+                {"downloads": value, "name": name, "provider": provider}
+            )
+            for name, value in assets.items():
                 chart_downloads.append(
-                    {"downloads": value, "name": key, "provider": provider}
+                    {"downloads": value, "name": name, "provider": provider}
                 )
     chart_downloads.sort(key=lambda k: k["downloads"], reverse=True)
-    chart_downloads_latest.sort(key=lambda k: k["downloads"], reverse=True)
+    top_charts = heapq.nlargest(
+        top_n, chart_downloads_latest, key=lambda k: k["downloads"]
+    )
+    return chart_downloads, top_charts
+
+
+def send_release_metrics(write_key, downloads, prefix):
+    chart_downloads, top_charts = aggregate_release_downloads(downloads)
 
-    for x in range(len(chart_downloads)):
+    for rank, chart_download in enumerate(chart_downloads, start=1):
         send_download_metric(
             write_key,
-            chart_downloads[x]["provider"],
-            chart_downloads[x]["downloads"],
-            chart_downloads[x]["name"],
-            x + 1,
+            chart_download["provider"],
+            chart_download["downloads"],
+            chart_download["name"],
+            rank,
             prefix,
         )
 
-    for x in range(5):
+    for rank, chart_download in enumerate(top_charts, start=1):
         send_top_five_metric(
             write_key,
-            chart_downloads_latest[x]["provider"],
-            chart_downloads_latest[x]["downloads"],
-            chart_downloads_latest[x]["name"],
-            x + 1,
+            chart_download["provider"],
+            chart_download["downloads"],
+            chart_download["name"],
+            rank,
             prefix,
         )
 
@@ -154,49 +134,221 @@ def send_top_five_metric(write_key, partner, downloads, artifact_name, rank, pre
     send_metric(write_key, id, chart_downloads_event, properties)
 
 
-def send_pull_request_metrics(write_key, g):
+def format_timestamp(timestamp):
+    """Format a datetime the way the GitHub GraphQL API does, e.g. 2024-01-02T00:00:00Z"""
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def get_rest_pr_classifications(g, repo, updated_since=None, known_prs=None):
+    """Classify the pull requests of a repository, through the REST API.
+
+    This requires one additional request per pull request to get its files.
+
+    Args:
+        g (Github): authenticated PyGithub client
+        repo (Repository): the repository
+        updated_since (str): ISO 8601 timestamp, only classify the pull requests
+                             updated since then
+        known_prs (dict): classifications of a previous run, see metrics.prstate.
+                          They are reused for the pull requests not updated since.
+    """
+    known_prs = known_prs or {}
+    pull_requests = repo.get_pulls(state="all", sort="updated", direction="desc")
+    for pr in pull_requests:
+        updated_at = format_timestamp(pr.updated_at)
+        if updated_since and updated_at < updated_since:
+            break
+        if prstate.is_current(known_prs, pr.number, updated_at):
+            yield known_prs[pr.number]
+            continue
+
+        pr_content, type, provider, chart, _ = check_and_get_pr_content(pr, repo)
+        yield make_pr_classification(
+            pr.number,
+            updated_at,
+            pr_content,
+            type,
+            provider,
+            chart,
+            pr.closed_at is not None,
+            pr.merged_at is not None,
+        )
+
+        check_rate_limit(g, False)
+
+
+def get_scanned_pr_classifications(
+    pull_requests, repo_name, updated_since=None, known_prs=None
+):
+    """Classify pull requests collected in bulk, see metrics.prscan
+
+    Args:
+        pull_requests (iterable[dict]): the pull requests
+        repo_name (str): full name of the repository of the pull requests
+        updated_since (str): ISO 8601 timestamp, only classify the pull requests
+                             updated since then
+        known_prs (dict): classifications of a previous run, see metrics.prstate.
+                          They are reused for the pull requests not updated since.
+    """
+    known_prs = known_prs or {}
+    for pull_request in pull_requests:
+        if updated_since and pull_request["updated_at"] < updated_since:
+            continue
+        if prstate.is_current(
+            known_prs, pull_request["number"], pull_request["updated_at"]
+        ):
+            yield known_prs[pull_request["number"]]
+            continue
+
+        pr_content, type, provider, chart, _ = check_and_get_scanned_pr_content(
+            pull_request, repo_name
+        )
+        yield make_pr_classification(
+            pull_request["number"],
+            pull_request["updated_at"],
+            pr_content,
+            type,
+            provider,
+            chart,
+            pull_request["closed_at"] is not None,
+            pull_request["merged_at"] is not None,
+        )
+
+
+def make_pr_classification(
+    pr_number, updated_at, pr_content, type, provider, chart, closed, merged
+):
+    return {
+        "number": pr_number,
+        "updated_at": updated_at,
+        "content": pr_content,
+        "type": type,
+        "provider": provider,
+        "chart": chart,
+        "closed": closed,
+        "merged": merged,
+    }
+
+
+def summarize_pull_requests(pr_classifications):
+    """Compute the PR summary counters from classified pull requests.
+
+    Args:
+        pr_classifications (iterable[dict]): as returned by make_pr_classification
+
+    Returns:
+        dict: the properties of the PR Summary metric
+    """
     chart_submissions = 0
-    partners = []
-    partner_charts = []
+    partners = set()
+    partner_charts = set()
     charts_merged = 0
     charts_abandoned = 0
     charts_in_progress = 0
     abandoned = []
-    repo = g.get_repo("openshift-helm-charts/charts")
-    pull_requests = repo.get_pulls(state="all")
-    for pr in pull_requests:
-        pr_content, type, provider, chart, version = check_and_get_pr_content(pr, repo)
-        if pr_content != "not-chart":
+    for pr in pr_classifications:
+        if pr["content"] != "not-chart":
             chart_submissions += 1
-            if pr.closed_at and not pr.merged_at:
+            if pr["closed"] and not pr["merged"]:
                 charts_abandoned += 1
-                print(f"[INFO] Abandoned PR: {pr.number} ")
-                abandoned.append(pr.number)
-            elif pr.merged_at:
+                print(f"[INFO] Abandoned PR: {pr['number']} ")
+                abandoned.append(pr["number"])
+            elif pr["merged"]:
                 charts_merged += 1
-                if type == "partner":
-                    if provider not in partners:
-                        partners.append(provider)
-                    if chart not in partner_charts:
-                        partner_charts.append(chart)
+                if pr["type"] == "partner":
+                    partners.add(pr["provider"])
+                    partner_charts.add(pr["chart"])
             else:
                 charts_in_progress += 1
 
-        check_rate_limit(g, False)
-
     print(f"[INFO] abandoned PRS: {abandoned}")
+    return {
+        "submissions": chart_submissions,
+        "merged": charts_merged,
+        "abandoned": charts_abandoned,
+        "in_progress": charts_in_progress,
+        "partners": len(partners),
+        "partner_charts": len(partner_charts),
+    }
+
+
+def send_pull_request_metrics(
+    write_key,
+    g,
+    pr_scan="graphql",
+    pr_fixture=None,
+    record_pr_fixture=None,
+    pr_state=None,
+):
+    """Send the PR Summary metric.
+
+    Args:
+        write_key (str): segment write key
+        g (Github): authenticated PyGithub client
+        pr_scan (str): how to collect the pull requests, "graphql" to collect them
+                       in bulk (see metrics.prscan) or "rest" to list them one by one
+        pr_fixture (str): path to pull requests recorded with record_pr_fixture, to
+                          use instead of collecting them
+        record_pr_fixture (str): path where to record the pull requests collected
+                                 with the "graphql" mode
+        pr_state (str): path to the state file (see metrics.prstate). If set, only
+                        the pull requests updated since the previous run are
+                        collected and classified.
+    """
+    repo_name = "openshift-helm-charts/charts"
+    known_prs = prstate.load_state(pr_state) if pr_state else {}
+    updated_since = prstate.get_watermark(known_prs)
+    if updated_since:
+        print(f"[INFO] collecting PRs updated since {updated_since}")
+
+    if pr_fixture:
+        print(f"[INFO] loading pull requests from {pr_fixture}")
+        pr_classifications = get_scanned_pr_classifications(
+            prscan.load_fixture(pr_fixture), repo_name, updated_since, known_prs
+        )
+    elif pr_scan == "graphql":
+        pull_requests = prscan.iter_pull_requests(
+            repo_name, updated_since=updated_since
+        )
+        if record_pr_fixture:
+            pull_requests = prscan.record_fixture(pull_requests, record_pr_fixture)
+        pr_classifications = get_scanned_pr_classifications(
+            pull_requests, repo_name, updated_since, known_prs
+        )
+    else:
+        pr_classifications = get_rest_pr_classifications(
+            g, g.get_repo(repo_name), updated_since, known_prs
+        )
+
+    try:
+        if pr_state:
+            pr_classifications = prstate.update_state(known_prs, pr_classifications)
+        summary = summarize_pull_requests(pr_classifications)
+    except prscan.PullRequestScanError as err:
+        print(f"[ERROR] {err}")
+        sys.exit(1)
+
+    if pr_state:
+        prstate.save_state(pr_state, known_prs)
+
     send_summary_metric(
         write_key,
-        chart_submissions,
-        charts_merged,
-        charts_abandoned,
-        charts_in_progress,
-        len(partners),
-        len(partner_charts),
+        summary["submissions"],
+        summary["merged"],
+        summary["abandoned"],
+        summary["in_progress"],
+        summary["partners"],
+        summary["partner_charts"],
     )
 
 
 def get_pr_files(pr):
+    manifest_files = manifest.load_manifest(pr.head.sha, pr.url)
+    if manifest_files is not None:
+        return [file["filename"] for file in manifest_files]
+
     files = pr.get_files()
     pr_chart_submission_files = []
     for file in files:
@@ -321,16 +473,36 @@ def parse_message(message, pr_number):
 
 
 def get_pr_content(pr):
+    return classify_pr_files(pr.number, pr.user.login, get_pr_files(pr))
+
+
+def classify_pr_files(pr_number, login, pr_chart_submission_files, file_count=None):
+    """Classify the content of a pull request from its files.
+
+    Args:
+        pr_number (int): number of the pull request
+        login (str): login of the author of the pull request
+        pr_chart_submission_files (list[str]): paths of the files of the pull request
+        file_count (int): total number of files of the pull request, if
+                          pr_chart_submission_files is only the first of them
+
+    Returns:
+        tuple: pr_content, type, org, chart, version. pr_content is "not-chart" if
+               the pull request is not a chart submission.
+    """
     pr_content = "not-chart"
-    pr_chart_submission_files = get_pr_files(pr)
+    if file_count is None:
+        file_count = len(pr_chart_submission_files)
     if len(pr_chart_submission_files) > 0:
-        match = file_pattern.match(pr_chart_submission_files[0])
-        if match:
-            type, org, chart, version = match.groups()
+        record = classifier.classify(
+            pr_chart_submission_files[0], strict_categories=False
+        )
+        if record.version is not None:
+            type, org, chart, version = record.submission
             if type == "partners":
                 type = "partner"
             print(
-                f"[INFO] Found PR {pr.number}:{pr.user.login}: type: {type},org: {org},chart: {chart},version: {version}, #files: {len(pr_chart_submission_files)}, file match: {pr_chart_submission_files[0]}"
+                f"[INFO] Found PR {pr_number}:{login}: type: {type},org: {org},chart: {chart},version: {version}, #files: {file_count}, file match: {pr_chart_submission_files[0]}"
             )
             tgz_found = False
             report_found = False
@@ -341,7 +513,7 @@ def get_pr_content(pr):
                     report_found = True
                 elif filename.endswith(".tgz"):
                     tgz_found = True
-                elif filename == "Chart.yaml" and len(pr_chart_submission_files) > 2:
+                elif filename == "Chart.yaml" and file_count > 2:
                     src_found = True
 
             if report_found:
@@ -361,21 +533,43 @@ def get_pr_content(pr):
     return pr_content, "", "", "", ""
 
 
-def check_and_get_pr_content(pr, repo):
-    repo_name = repo.full_name
+def is_ignored_pr(repo_name, login, draft, base_ref):
     if (
-        (pr.user.login in ignore_users and pr.user.login not in repo_name)
-        or pr.draft
-        or pr.base.ref != "main"
+        (login in ignore_users and login not in repo_name)
+        or draft
+        or base_ref != "main"
     ):
         print(
-            f"[INFO] Ignore pr, user: {pr.user.login}, draft: {pr.draft}, target_branch: {pr.base.ref}"
+            f"[INFO] Ignore pr, user: {login}, draft: {draft}, target_branch: {base_ref}"
         )
+        return True
+    return False
+
+
+def check_and_get_pr_content(pr, repo):
+    if is_ignored_pr(repo.full_name, pr.user.login, pr.draft, pr.base.ref):
         return "not-chart", "", "", "", ""
 
     return get_pr_content(pr)
 
 
+def check_and_get_scanned_pr_content(pull_request, repo_name):
+    if is_ignored_pr(
+        repo_name,
+        pull_request["login"],
+        pull_request["draft"],
+        pull_request["base_ref"],
+    ):
+        return "not-chart", "", "", "", ""
+
+    return classify_pr_files(
+        pull_request["number"],
+        pull_request["login"],
+        pull_request["files"],
+        pull_request["file_count"],
+    )
+
+
 def process_pr(write_key, repo, message_file, pr_number, action, prefix, pr_directory):
     pr = repo.get_pull(int(pr_number))
     pr_content, type, provider, chart, version = check_and_get_pr_content(pr, repo)
@@ -534,19 +728,10 @@ def send_submission_metric(
     send_metric(write_key, id, pr_submission, properties)
 
 
-def on_error(error, items):
-    print("An error occurred creating metrics:", error)
-    print("error with items:", items)
-    sys.exit(1)
-
-
 def send_metric(write_key, id, event, properties):
-    analytics.write_key = write_key
-    analytics.on_error = on_error
-
     print(f"[INFO] Add track:  id: {id},  event:{event},  properties:{properties}")
 
-    analytics.track(id, event, properties)
+    sink.get_sink(write_key).track(id, event, properties)
 
 
 def check_rate_limit(g, force):
@@ -627,6 +812,13 @@ def main():
         required=False,
         help="The prefix of the id in segment",
     )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        type=str,
+        required=False,
+        help="NDJSON file where to write the metrics instead of sending them to segment",
+    )
     parser.add_argument(
         "-d",
         "--pr_dir",
@@ -635,6 +827,36 @@ def main():
         required=False,
         help="Directory of pull request code.",
     )
+    parser.add_argument(
+        "--pr-scan",
+        dest="pr_scan",
+        type=str,
+        choices=["graphql", "rest"],
+        default="graphql",
+        required=False,
+        help="How to collect pull requests for the summary, in bulk through the GraphQL API or one by one through the REST API",
+    )
+    parser.add_argument(
+        "--pr-fixture",
+        dest="pr_fixture",
+        type=str,
+        required=False,
+        help="JSON file of recorded pull requests to use instead of collecting them",
+    )
+    parser.add_argument(
+        "--record-pr-fixture",
+        dest="record_pr_fixture",
+        type=str,
+        required=False,
+        help="JSON file where to record the pull requests collected through the GraphQL API",
+    )
+    parser.add_argument(
+        "--pr-state",
+        dest="pr_state",
+        type=str,
+        required=False,
+        help="JSON lines file keeping PR classifications between runs, only PRs updated since the last run are then collected",
+    )
 
     args = parser.parse_args()
     print("Input arguments:")
@@ -645,12 +867,19 @@ def main():
     print(f"   --pr-action : {args.pr_action}")
     print(f"   --repository : {args.repository}")
     print(f"   --prefix : {args.prefix}")
+    print(f"   --dry-run : {args.dry_run}")
     print(f"   --pr_dir : {args.pr_dir}")
+    print(f"   --pr-scan : {args.pr_scan}")
+    print(f"   --pr-fixture : {args.pr_fixture}")
+    print(f"   --record-pr-fixture : {args.record_pr_fixture}")
+    print(f"   --pr-state : {args.pr_state}")
 
     if not args.write_key:
         print("Error: Segment write key not set")
         sys.exit(1)
 
+    sink.configure(args.write_key, args.dry_run)
+
     g = Github(os.environ.get("BOT_TOKEN"))
 
     if args.type == "pull_request":
@@ -668,9 +897,20 @@ def main():
         check_rate_limit(g, True)
         send_release_metrics(args.write_key, get_release_metrics(), args.prefix)
         check_rate_limit(g, True)
-        send_pull_request_metrics(args.write_key, g)
+        send_pull_request_metrics(
+            args.write_key,
+            g,
+            args.pr_scan,
+            args.pr_fixture,
+            args.record_pr_fixture,
+            args.pr_state,
+        )
         check_rate_limit(g, True)
 
+    if sink.close()["failed"]:
+        print("[ERROR] some metrics could not be sent")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
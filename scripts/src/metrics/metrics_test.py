@@ -0,0 +1,43 @@
+from metrics import metrics
+
+chart_info = {
+    "acme-awesome-1.0.0": ("partner", "acme", "awesome", "1.0.0"),
+    "acme-awesome-1.1.0": ("partner", "acme", "awesome", "1.1.0"),
+    "acme-great-0.1.0": ("partner", "acme", "great", "0.1.0"),
+}
+
+
+def get_chart_info(tar_name):
+    return chart_info.get(tar_name, ("", "", "", ""))
+
+
+def make_release(name, asset, downloads):
+    return {"name": name, "asset": {asset: downloads}}
+
+
+def test_aggregate_release_downloads():
+    downloads = [
+        make_release("acme-awesome-1.0.0", "awesome-1.0.0.tgz", 10),
+        make_release("acme-awesome-1.1.0", "awesome-1.1.0.tgz", 30),
+        make_release("acme-great-0.1.0", "great-0.1.0.tgz", 20),
+        make_release("unknown-1.0.0", "unknown-1.0.0.tgz", 100),
+    ]
+
+    chart_downloads, top_charts = metrics.aggregate_release_downloads(
+        iter(downloads), get_chart_info
+    )
+
+    assert [(d["name"], d["downloads"]) for d in chart_downloads] == [
+        ("awesome-1.1.0.tgz", 30),
+        ("great-0.1.0.tgz", 20),
+        ("awesome-1.0.0.tgz", 10),
+    ]
+    # Fewer charts than the size of the top
+    assert top_charts == [
+        {"downloads": 30, "name": "awesome-1.1.0.tgz", "provider": "acme"},
+        {"downloads": 20, "name": "great-0.1.0.tgz", "provider": "acme"},
+    ]
+
+
+def test_aggregate_release_downloads_empty():
+    assert metrics.aggregate_release_downloads([], get_chart_info) == ([], [])
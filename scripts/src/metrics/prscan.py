@@ -0,0 +1,174 @@
+"""Bulk collection of pull request data for the PR summary metrics.
+
+Listing the pull requests through the REST API requires an additional, paginated
+request per pull request to get its files. Here, the pull requests are collected
+through the GitHub GraphQL API instead: each query returns 100 pull requests along
+with the paths of their first files, so the number of requests only depends on the
+number of pull requests divided by 100.
+
+The collected pull requests can be recorded to a JSON file and loaded back, to run
+the metrics offline.
+
+Each pull request is represented by a dict with the following keys:
+* number (int)
+* login (str): login of the author of the pull request
+* draft (bool)
+* base_ref (str): name of the target branch
+* closed_at (str): ISO 8601 timestamp, None if the pull request is open
+* merged_at (str): ISO 8601 timestamp, None if the pull request is not merged
+* updated_at (str): ISO 8601 timestamp
+* files (list[str]): paths of the first files of the pull request
+* file_count (int): total number of files of the pull request
+"""
+
+import json
+import sys
+
+sys.path.append("../")
+from tools import github_client
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+PAGE_SIZE = 100
+# GraphQL connections return at most 100 nodes
+MAX_FILES = 100
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $pageSize: Int!, $maxFiles: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $pageSize, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        number
+        author {
+          login
+        }
+        isDraft
+        baseRefName
+        closedAt
+        mergedAt
+        updatedAt
+        files(first: $maxFiles) {
+          totalCount
+          nodes {
+            path
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+}
+"""
+
+
+class PullRequestScanError(Exception):
+    pass
+
+
+def _run_query(client, variables):
+    # A query doesn't write anything, it can be replayed
+    response = client.post(
+        GRAPHQL_URL,
+        idempotent=True,
+        json={"query": PULL_REQUESTS_QUERY, "variables": variables},
+    )
+    if not 200 <= response.status_code < 300:
+        raise PullRequestScanError(
+            f"unexpected response querying pull requests : {response.status_code} : {response.reason}"
+        )
+
+    response_json = response.json()
+    if response_json.get("errors"):
+        raise PullRequestScanError(
+            f'querying pull requests: {response_json["errors"][0].get("message")}'
+        )
+    return response_json["data"]
+
+
+def node_to_pull_request(node):
+    """Convert a pull request node of the GraphQL API to a pull request dict"""
+    files = node.get("files") or {}
+    # The author is null when the user's account has been deleted
+    author = node.get("author") or {"login": "ghost"}
+    return {
+        "number": node["number"],
+        "login": author["login"],
+        "draft": node["isDraft"],
+        "base_ref": node["baseRefName"],
+        "closed_at": node["closedAt"],
+        "merged_at": node["mergedAt"],
+        "updated_at": node["updatedAt"],
+        "files": [file["path"] for file in files.get("nodes") or []],
+        "file_count": files.get("totalCount", 0),
+    }
+
+
+def iter_pull_requests(repository, max_files=MAX_FILES, updated_since=None):
+    """Iterate over all the pull requests of a repository, most recently updated first.
+
+    Args:
+        repository (str): Full name of the repository, e.g. openshift-helm-charts/charts
+        max_files (int): Maximum number of file paths to collect per pull request
+        updated_since (str): ISO 8601 timestamp, stop at the first pull request
+                             updated before it
+
+    Yields:
+        dict: The pull requests, see the module docstring
+
+    Raises:
+        PullRequestScanError: if the GraphQL API returns an error
+    """
+    owner, name = repository.split("/", 1)
+    variables = {
+        "owner": owner,
+        "name": name,
+        "cursor": None,
+        "pageSize": PAGE_SIZE,
+        "maxFiles": max_files,
+    }
+    client = github_client.get_client()
+    while True:
+        data = _run_query(client, variables)
+        pull_requests = data["repository"]["pullRequests"]
+        rate_limit = data.get("rateLimit") or {}
+        print(
+            f"[INFO] got {len(pull_requests['nodes'])} pull requests, query cost: {rate_limit.get('cost')}, remaining: {rate_limit.get('remaining')}"
+        )
+        for node in pull_requests["nodes"]:
+            if updated_since and node["updatedAt"] < updated_since:
+                return
+            yield node_to_pull_request(node)
+
+        if not pull_requests["pageInfo"]["hasNextPage"]:
+            break
+        variables["cursor"] = pull_requests["pageInfo"]["endCursor"]
+
+
+def load_fixture(fixture_path):
+    """Load pull requests previously recorded with record_fixture"""
+    with open(fixture_path) as fd:
+        return json.load(fd)
+
+
+def record_fixture(pull_requests, fixture_path):
+    """Record pull requests to a JSON file
+
+    Args:
+        pull_requests (iterable[dict]): The pull requests to record
+        fixture_path (str): Path to the JSON file
+
+    Returns:
+        list[dict]: The recorded pull requests
+    """
+    pull_requests = list(pull_requests)
+    with open(fixture_path, "w") as fd:
+        json.dump(pull_requests, fd, indent=1)
+    print(f"[INFO] recorded {len(pull_requests)} pull requests to {fixture_path}")
+    return pull_requests
@@ -0,0 +1,108 @@
+import json
+
+import responses
+from responses import matchers
+
+from metrics import metrics, prscan
+
+
+def make_node(number, paths, merged=False, closed=False, draft=False, login="dev"):
+    return {
+        "number": number,
+        "author": {"login": login},
+        "isDraft": draft,
+        "baseRefName": "main",
+        "closedAt": "2024-01-02T00:00:00Z" if closed or merged else None,
+        "mergedAt": "2024-01-02T00:00:00Z" if merged else None,
+        "updatedAt": "2024-01-02T00:00:00Z",
+        "files": {"totalCount": len(paths), "nodes": [{"path": p} for p in paths]},
+    }
+
+
+def make_response(nodes, end_cursor=None):
+    return {
+        "data": {
+            "repository": {
+                "pullRequests": {
+                    "pageInfo": {
+                        "hasNextPage": end_cursor is not None,
+                        "endCursor": end_cursor,
+                    },
+                    "nodes": nodes,
+                }
+            },
+            "rateLimit": {"cost": 1, "remaining": 4999, "resetAt": None},
+        }
+    }
+
+
+report_path = "charts/partners/acme/awesome/1.0.0/report.yaml"
+tgz_path = "charts/partners/acme/awesome/1.0.0/awesome-1.0.0.tgz"
+
+
+@responses.activate
+def test_iter_pull_requests_pages_through_results():
+    responses.post(
+        prscan.GRAPHQL_URL,
+        json=make_response([make_node(3, [report_path])], end_cursor="abc"),
+        match=[
+            matchers.json_params_matcher(
+                {"variables": {"cursor": None}}, strict_match=False
+            )
+        ],
+    )
+    responses.post(
+        prscan.GRAPHQL_URL,
+        json=make_response([make_node(2, ["README.md"]), make_node(1, [])]),
+        match=[
+            matchers.json_params_matcher(
+                {"variables": {"cursor": "abc"}}, strict_match=False
+            )
+        ],
+    )
+
+    pull_requests = list(prscan.iter_pull_requests("acme/charts"))
+
+    assert [pr["number"] for pr in pull_requests] == [3, 2, 1]
+    assert pull_requests[0]["files"] == [report_path]
+    assert pull_requests[0]["file_count"] == 1
+    assert len(responses.calls) == 2
+
+
+def test_summary_from_fixture(tmp_path):
+    nodes = [
+        make_node(1, [report_path, tgz_path], merged=True),
+        make_node(2, [report_path], closed=True),
+        make_node(3, [tgz_path]),
+        make_node(4, [report_path], draft=True),
+        make_node(5, ["docs/README.md"], merged=True),
+        make_node(6, [report_path], merged=True, login="openshift-helm-charts-bot"),
+    ]
+    fixture_path = tmp_path / "prs.json"
+    prscan.record_fixture(map(prscan.node_to_pull_request, nodes), fixture_path)
+
+    pull_requests = prscan.load_fixture(fixture_path)
+    classifications = list(
+        metrics.get_scanned_pr_classifications(
+            pull_requests, "openshift-helm-charts/charts"
+        )
+    )
+
+    assert [c["content"] for c in classifications] == [
+        "report and tgz",
+        "report only",
+        "tgz only",
+        "not-chart",
+        "not-chart",
+        "not-chart",
+    ]
+    assert metrics.summarize_pull_requests(classifications) == {
+        "submissions": 3,
+        "merged": 1,
+        "abandoned": 1,
+        "in_progress": 1,
+        "partners": 1,
+        "partner_charts": 1,
+    }
+    with open(fixture_path) as fd:
+        assert json.load(fd) == pull_requests
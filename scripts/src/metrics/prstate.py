@@ -0,0 +1,92 @@
+"""Persistent state of the PR summary metrics.
+
+Classifying a pull request (see metrics.get_pr_content) requires its files, which
+is the bulk of the cost of the PR summary. The state keeps the classification of
+every pull request seen so far, so a run only needs to classify the pull requests
+updated since the previous run, then recomputes the summary from the state.
+
+The state is stored as JSON lines, one classification per line, as returned by
+metrics.make_pr_classification. Each classification records the updated_at of the
+pull request at the time it was classified; the most recent updated_at in the state
+is the watermark from which the next run collects pull requests.
+"""
+
+import json
+import os
+
+
+def load_state(state_path):
+    """Load the state from a JSON lines file
+
+    Args:
+        state_path (str): Path to the state file, which may not exist yet
+
+    Returns:
+        dict: Classifications, keyed by pull request number
+    """
+    state = {}
+    if not os.path.exists(state_path):
+        print(f"[INFO] no PR state found at {state_path}, starting from scratch")
+        return state
+
+    with open(state_path) as fd:
+        for line in fd:
+            if line.strip():
+                classification = json.loads(line)
+                state[classification["number"]] = classification
+    print(f"[INFO] loaded the state of {len(state)} PRs from {state_path}")
+    return state
+
+
+def save_state(state_path, state):
+    """Write the state to a JSON lines file, atomically
+
+    Args:
+        state_path (str): Path to the state file
+        state (dict): Classifications, keyed by pull request number
+    """
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as fd:
+        for number in sorted(state):
+            fd.write(json.dumps(state[number], sort_keys=True) + "\n")
+    os.replace(tmp_path, state_path)
+    print(f"[INFO] saved the state of {len(state)} PRs to {state_path}")
+
+
+def get_watermark(state):
+    """Get the most recent updated_at of the pull requests in the state
+
+    Timestamps are compared as strings, they must all use the same ISO 8601 format
+    (see metrics.format_timestamp).
+
+    Returns:
+        str: The watermark, or None if the state is empty
+    """
+    return max(
+        (c["updated_at"] for c in state.values() if c.get("updated_at")),
+        default=None,
+    )
+
+
+def is_current(state, pr_number, updated_at):
+    """Check if the state holds the classification of this update of a pull request"""
+    classification = state.get(pr_number)
+    return classification is not None and classification["updated_at"] == updated_at
+
+
+def update_state(state, pr_classifications):
+    """Record new classifications in the state
+
+    Args:
+        state (dict): Classifications, keyed by pull request number
+        pr_classifications (iterable[dict]): New classifications
+
+    Returns:
+        list[dict]: All the classifications in the state, after the update
+    """
+    updated = 0
+    for classification in pr_classifications:
+        state[classification["number"]] = classification
+        updated += 1
+    print(f"[INFO] {updated} PRs classified since the last run")
+    return list(state.values())
@@ -0,0 +1,96 @@
+from metrics import metrics, prstate
+
+report_path = "charts/partners/acme/awesome/1.0.0/report.yaml"
+
+
+def make_pull_request(number, updated_at, merged_at=None):
+    return {
+        "number": number,
+        "login": "dev",
+        "draft": False,
+        "base_ref": "main",
+        "closed_at": merged_at,
+        "merged_at": merged_at,
+        "updated_at": updated_at,
+        "files": [report_path],
+        "file_count": 1,
+    }
+
+
+def test_state_round_trip(tmp_path):
+    state_path = str(tmp_path / "state.jsonl")
+    assert prstate.load_state(state_path) == {}
+
+    state = {}
+    prstate.update_state(
+        state,
+        [
+            metrics.make_pr_classification(
+                2,
+                "2024-01-02T00:00:00Z",
+                "report only",
+                "partner",
+                "acme",
+                "a",
+                False,
+                False,
+            ),
+            metrics.make_pr_classification(
+                1, "2024-01-01T00:00:00Z", "not-chart", "", "", "", False, False
+            ),
+        ],
+    )
+    prstate.save_state(state_path, state)
+
+    loaded = prstate.load_state(state_path)
+    assert loaded == state
+    assert prstate.get_watermark(loaded) == "2024-01-02T00:00:00Z"
+    assert prstate.is_current(loaded, 1, "2024-01-01T00:00:00Z")
+    assert not prstate.is_current(loaded, 1, "2024-01-03T00:00:00Z")
+    assert not prstate.is_current(loaded, 3, "2024-01-01T00:00:00Z")
+
+
+def test_incremental_summary(tmp_path, monkeypatch):
+    summaries = []
+    monkeypatch.setattr(
+        metrics, "send_summary_metric", lambda *args: summaries.append(args[1:])
+    )
+    classified = []
+    check_and_get_scanned_pr_content = metrics.check_and_get_scanned_pr_content
+
+    def classify(pull_request, repo_name):
+        classified.append(pull_request["number"])
+        return check_and_get_scanned_pr_content(pull_request, repo_name)
+
+    monkeypatch.setattr(metrics, "check_and_get_scanned_pr_content", classify)
+
+    fixture_path = str(tmp_path / "prs.json")
+    state_path = str(tmp_path / "state.jsonl")
+    metrics.prscan.record_fixture(
+        [
+            make_pull_request(2, "2024-01-02T00:00:00Z"),
+            make_pull_request(1, "2024-01-01T00:00:00Z"),
+        ],
+        fixture_path,
+    )
+    metrics.send_pull_request_metrics(
+        "key", None, pr_fixture=fixture_path, pr_state=state_path
+    )
+    assert classified == [2, 1]
+    assert summaries[-1] == (2, 0, 0, 2, 0, 0)
+
+    # PR 2 got merged, PR 3 was opened
+    classified.clear()
+    metrics.prscan.record_fixture(
+        [
+            make_pull_request(3, "2024-01-04T00:00:00Z"),
+            make_pull_request(2, "2024-01-03T00:00:00Z", "2024-01-03T00:00:00Z"),
+            make_pull_request(1, "2024-01-01T00:00:00Z"),
+        ],
+        fixture_path,
+    )
+    metrics.send_pull_request_metrics(
+        "key", None, pr_fixture=fixture_path, pr_state=state_path
+    )
+    assert classified == [3, 2]
+    assert summaries[-1] == (3, 1, 0, 2, 1, 1)
@@ -1,9 +1,8 @@
 import argparse
 import sys
 
-import analytics
-
 sys.path.append("../")
+from metrics import sink
 from owners import owners_file
 
 
@@ -106,19 +105,10 @@ def send_owner_metric(
         send_metric(write_key, id, "owners v1.0", properties)
 
 
-def on_error(error, items):
-    print("An error occurred creating metrics:", error)
-    print("error with items:", items)
-    sys.exit(1)
-
-
 def send_metric(write_key, id, event, properties):
-    analytics.write_key = write_key
-    analytics.on_error = on_error
-
     print(f"[INFO] Add track:  id: {id},  event:{event},  properties:{properties}")
 
-    analytics.track(id, event, properties)
+    sink.get_sink(write_key).track(id, event, properties)
 
 
 def main():
@@ -166,6 +156,13 @@ def main():
         required=False,
         help="The prefix of the id in segment",
     )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        type=str,
+        required=False,
+        help="NDJSON file where to write the metrics instead of sending them to segment",
+    )
 
     args = parser.parse_args()
     print("Input arguments:")
@@ -175,11 +172,14 @@ def main():
     print(f"   --modified : {args.modified}")
     print(f"   --repository : {args.repository}")
     print(f"   --prefix : {args.prefix}")
+    print(f"   --dry-run : {args.dry_run}")
 
     if not args.write_key:
         print("Error: Segment write key not set")
         sys.exit(1)
 
+    sink.configure(args.write_key, args.dry_run)
+
     (
         users_included,
         web_catalog_only,
@@ -201,6 +201,10 @@ def main():
         update,
     )
 
+    if sink.close()["failed"]:
+        print("[ERROR] some metrics could not be sent")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+"""Harvest the releases of the charts repository from the GitHub API.
+
+The releases are listed 100 per page. Rather than requesting one page after the
+other until an empty page is returned, the harvester:
+* reads the Link header of the first page to learn the number of the last page,
+* fetches the remaining pages concurrently, with a bounded number of workers,
+* pauses all workers until the rate limit resets when X-RateLimit-Remaining gets low,
+  through the rate limit bucket of the shared GitHub client (tools.github_client),
+* yields the releases page by page, in order, as soon as they are available.
+
+If the first page has no Link header, the pages are fetched serially until an empty
+page is returned.
+"""
+
+import collections
+import itertools
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append("../")
+from tools import github_client
+
+RELEASES_URL = "https://api.github.com/repos/openshift-helm-charts/charts/releases"
+PER_PAGE = 100
+MAX_WORKERS = 8
+
+
+class ReleaseHarvestError(Exception):
+    pass
+
+
+def _get_page(client, url, page):
+    response = client.get(url, params={"per_page": PER_PAGE, "page": page})
+
+    if not 200 <= response.status_code < 300:
+        raise ReleaseHarvestError(
+            f"unexpected response getting release data : {response.status_code} : {response.reason}"
+        )
+
+    response_json = response.json()
+    if "message" in response_json:
+        raise ReleaseHarvestError(f'getting releases: {response_json["message"]}')
+
+    return response, response_json
+
+
+def get_last_page(response):
+    """Get the number of the last page from the Link header of a response.
+
+    Returns:
+        int: the number of the last page, or None if the response has no such link.
+    """
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(last_url).query)
+    try:
+        return int(query["page"][0])
+    except (KeyError, ValueError):
+        return None
+
+
+def iter_releases(url=RELEASES_URL, max_workers=MAX_WORKERS):
+    """Iterate over all the releases of a repository.
+
+    Args:
+        url (str): URL of the releases endpoint of the GitHub API
+        max_workers (int): Maximum number of pages fetched concurrently
+
+    Yields:
+        dict: The releases, in the order returned by the GitHub API
+
+    Raises:
+        ReleaseHarvestError: if a page cannot be retrieved
+    """
+    # The pages are fetched with the shared client, which pools the connections,
+    # retries the requests failing with a transient error and holds back all workers
+    # while the rate limit is nearly exhausted
+    client = github_client.get_client()
+    response, releases = _get_page(client, url, 1)
+    yield from releases
+    if not releases:
+        return
+
+    last_page = get_last_page(response)
+    if last_page is None:
+        print("[INFO] no pagination links, fetching release pages serially")
+        for page in itertools.count(start=2):
+            _, releases = _get_page(client, url, page)
+            if not releases:
+                return
+            yield from releases
+
+    print(f"[INFO] fetching {last_page} release pages, {max_workers} at a time")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded window of pages in flight, consumed in page order
+        pending = collections.deque()
+        try:
+            for page in range(2, last_page + 1):
+                pending.append(executor.submit(_get_page, client, url, page))
+                if len(pending) >= 2 * max_workers:
+                    yield from pending.popleft().result()[1]
+            while pending:
+                yield from pending.popleft().result()[1]
+        finally:
+            for future in pending:
+                future.cancel()
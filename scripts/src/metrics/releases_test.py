@@ -0,0 +1,97 @@
+import pytest
+import responses
+from responses import matchers
+
+from metrics import metrics, releases
+from tools import github_client
+
+releases_url = "https://api.github.com/repos/acme/charts/releases"
+
+
+def make_release(n):
+    return {
+        "name": f"acme-awesome-1.{n}.0",
+        "assets": [
+            {"name": f"awesome-1.{n}.0.tgz", "download_count": n},
+            {"name": "report.yaml", "download_count": 1},
+        ],
+    }
+
+
+def add_page(page, content, headers=None):
+    responses.get(
+        releases_url,
+        json=content,
+        headers=headers or {},
+        match=[matchers.query_param_matcher({"per_page": "100", "page": str(page)})],
+    )
+
+
+@responses.activate
+def test_iter_releases_follows_link_header():
+    link = f'<{releases_url}?per_page=100&page=2>; rel="next", <{releases_url}?per_page=100&page=4>; rel="last"'
+    add_page(1, [make_release(1)], headers={"Link": link})
+    add_page(2, [make_release(2)])
+    add_page(3, [make_release(3)])
+    add_page(4, [make_release(4)])
+
+    found = list(releases.iter_releases(releases_url, max_workers=2))
+
+    assert [release["name"] for release in found] == [
+        f"acme-awesome-1.{n}.0" for n in range(1, 5)
+    ]
+    assert len(responses.calls) == 4
+    assert metrics.parse_response(iter(found))[3] == {
+        "name": "acme-awesome-1.4.0",
+        "asset": {"awesome-1.4.0.tgz": 4},
+    }
+
+
+@responses.activate
+def test_iter_releases_without_link_header():
+    add_page(1, [make_release(1)])
+    add_page(2, [make_release(2)])
+    add_page(3, [])
+
+    found = list(releases.iter_releases(releases_url))
+
+    assert len(found) == 2
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_iter_releases_error(monkeypatch):
+    # Server errors are retried by the GitHub client before giving up
+    monkeypatch.setattr(github_client.time, "sleep", lambda delay: None)
+    responses.get(releases_url, status=500)
+
+    with pytest.raises(releases.ReleaseHarvestError):
+        list(releases.iter_releases(releases_url))
+    assert len(responses.calls) == github_client.MAX_RETRIES + 1
+
+
+@responses.activate
+def test_iter_releases_waits_on_shared_rate_limit(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(github_client.time, "time", lambda: now[0])
+    monkeypatch.setattr(github_client.time, "sleep", sleep)
+    monkeypatch.setattr(
+        github_client,
+        "_default_client",
+        github_client.GitHubClient(token="token", rate_limit_reserve=10),
+    )
+
+    link = f'<{releases_url}?per_page=100&page=2>; rel="last"'
+    rate_limit = {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1060"}
+    add_page(1, [make_release(1)], headers={"Link": link, **rate_limit})
+    add_page(2, [make_release(2)])
+
+    assert len(list(releases.iter_releases(releases_url))) == 2
+    # The second page waited for the rate limit of the shared client to reset
+    assert sleeps == [61.0]
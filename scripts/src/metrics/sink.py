@@ -0,0 +1,230 @@
+"""Batched delivery of metric events.
+
+Events are queued by track() and delivered by a background thread, in batches of up
+to batch_size events or every flush_interval seconds, whichever comes first. Batches
+failing with a transient error are retried with exponential backoff and jitter.
+
+Two backends are available:
+* SegmentBackend: posts the batches to the Segment batch API.
+* FileBackend: appends the events to an NDJSON file, for dry runs and tests.
+
+The sink keeps counts of the events sent, failed and retried. The default sink is
+flushed and its counts reported when the process exits.
+"""
+
+import atexit
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+from analytics import request as segment_request
+from analytics.version import VERSION
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+
+
+class RetryableSendError(Exception):
+    pass
+
+
+class SegmentBackend:
+    def __init__(self, write_key):
+        self.write_key = write_key
+
+    def send(self, batch):
+        try:
+            segment_request.post(self.write_key, batch=batch)
+        except segment_request.APIError as err:
+            if err.status == 429 or err.status >= 500:
+                raise RetryableSendError(str(err)) from err
+            raise
+        except (requests.ConnectionError, requests.Timeout) as err:
+            raise RetryableSendError(str(err)) from err
+
+
+class FileBackend:
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, batch):
+        with open(self.path, "a") as fd:
+            for event in batch:
+                fd.write(json.dumps(event, sort_keys=True) + "\n")
+
+
+class _Flush:
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class MetricsSink:
+    """Queue of metric events, delivered in batches by a background thread"""
+
+    def __init__(
+        self,
+        backend,
+        batch_size=DEFAULT_BATCH_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "retried": 0}
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def track(self, user_id, event, properties):
+        """Queue a track event"""
+        if self._closed:
+            raise RuntimeError("metrics sink is closed")
+        self.stats["queued"] += 1
+        self._queue.put(
+            {
+                "type": "track",
+                "userId": user_id,
+                "event": event,
+                "properties": properties,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "messageId": str(uuid.uuid4()),
+                "context": {
+                    "library": {"name": "analytics-python", "version": VERSION}
+                },
+            }
+        )
+
+    def flush(self):
+        """Block until all the events queued so far are delivered or failed"""
+        if self._closed:
+            return
+        request = _Flush()
+        self._queue.put(request)
+        request.done.wait()
+
+    def close(self):
+        """Deliver the queued events and stop the background thread
+
+        Returns:
+            dict: The counts of events queued, sent, failed and retried
+        """
+        if not self._closed:
+            self._closed = True
+            request = _Flush(stop=True)
+            self._queue.put(request)
+            request.done.wait()
+            print(
+                f"[INFO] metrics sent: {self.stats['sent']}, failed: {self.stats['failed']}, retried: {self.stats['retried']}"
+            )
+        return dict(self.stats)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._send(batch)
+                batch = []
+            deadline = None
+
+            if isinstance(item, _Flush):
+                item.done.set()
+                if item.stop:
+                    return
+
+    def _send(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.backend.send(batch)
+                self.stats["sent"] += len(batch)
+                return
+            except RetryableSendError as err:
+                if attempt == self.max_retries:
+                    print(f"[ERROR] sending metrics, giving up: {err}")
+                    break
+                delay = self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+                print(f"[INFO] sending metrics failed, retry in {delay:.1f}s: {err}")
+                self.stats["retried"] += len(batch)
+                time.sleep(delay)
+            except Exception as err:
+                print(f"[ERROR] sending metrics: {err}")
+                break
+        self.stats["failed"] += len(batch)
+
+
+_default_sink = None
+_default_sink_lock = threading.Lock()
+
+
+def configure(write_key, dry_run_file=None, **kwargs):
+    """Create the default sink
+
+    Args:
+        write_key (str): segment write key
+        dry_run_file (str): if set, events are written to this NDJSON file instead of
+                            being sent to Segment
+        **kwargs: see MetricsSink
+
+    Returns:
+        MetricsSink: the default sink
+    """
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is not None:
+            _default_sink.close()
+        if dry_run_file:
+            print(f"[INFO] dry run, metrics are written to {dry_run_file}")
+            backend = FileBackend(dry_run_file)
+        else:
+            backend = SegmentBackend(write_key)
+        _default_sink = MetricsSink(backend, **kwargs)
+        return _default_sink
+
+
+def get_sink(write_key):
+    """Get the default sink, sending to Segment unless configured otherwise"""
+    with _default_sink_lock:
+        sink = _default_sink
+    return sink or configure(write_key)
+
+
+def close():
+    """Close the default sink, if any
+
+    Returns:
+        dict: The counts of events of the default sink, see MetricsSink.close
+    """
+    with _default_sink_lock:
+        sink = _default_sink
+    if sink is None:
+        return {"queued": 0, "sent": 0, "failed": 0, "retried": 0}
+    return sink.close()
+
+
+atexit.register(close)
@@ -0,0 +1,52 @@
+import json
+
+from metrics import sink
+
+
+class FlakyBackend:
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def send(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise sink.RetryableSendError("try again")
+        self.batches.append(batch)
+
+
+def test_events_are_batched():
+    backend = FlakyBackend(failures=0)
+    metrics_sink = sink.MetricsSink(backend, batch_size=3, flush_interval=60)
+    for i in range(7):
+        metrics_sink.track(f"id-{i}", "Chart Downloads v1.0", {"rank": i})
+    metrics_sink.flush()
+
+    assert [len(batch) for batch in backend.batches] == [3, 3, 1]
+    assert metrics_sink.close() == {"queued": 7, "sent": 7, "failed": 0, "retried": 0}
+
+
+def test_retries_and_failures():
+    backend = FlakyBackend(failures=2)
+    metrics_sink = sink.MetricsSink(backend, max_retries=2, backoff=0)
+    metrics_sink.track("id", "event", {})
+    metrics_sink.flush()
+    assert metrics_sink.stats == {"queued": 1, "sent": 1, "failed": 0, "retried": 2}
+
+    backend.failures = 3
+    metrics_sink.track("id", "event", {})
+    assert metrics_sink.close() == {"queued": 2, "sent": 1, "failed": 1, "retried": 4}
+
+
+def test_dry_run_writes_ndjson(tmp_path):
+    dry_run_file = tmp_path / "metrics.ndjson"
+    sink.configure("key", str(dry_run_file))
+    sink.get_sink("key").track("helm-metric-summary", "PR Summary", {"merged": 1})
+    assert sink.close()["sent"] == 1
+
+    with open(dry_run_file) as fd:
+        events = [json.loads(line) for line in fd]
+    assert len(events) == 1
+    assert events[0]["type"] == "track"
+    assert events[0]["userId"] == "helm-metric-summary"
+    assert events[0]["properties"] == {"merged": 1}
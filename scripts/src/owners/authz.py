@@ -0,0 +1,287 @@
+"""Authorization index of the repository.
+
+Checking whether a user may submit a chart, or is an approver of the repository,
+requires the OWNERS file of the chart or the root OWNERS file. Rather than parsing
+them on every check, generate-chart-locks can write an authorization index next to
+the lock file (see its --authz-file option). The index is a compact JSON file:
+
+    {
+        "version": 3,
+        "approvers": ["user", ...],
+        "charts": {
+            "<category>/<organization>/<chart>": {
+                "chart": "<chart.name of the OWNERS file>",
+                "vendor_label": "<vendor.label of the OWNERS file>",
+                "users": ["user", ...]
+            }
+        },
+        "users": {"user": ["<category>/<organization>/<chart>", ...]},
+        "blobs": {"<path of an OWNERS file>": "<git blob id of its content>", ...}
+    }
+
+When the OWNERS_AUTHZ_FILE environment variable points to an index, get_index loads
+it once per process and the checks are set and dict lookups. Without an index, the
+callers fall back to parsing the OWNERS files.
+
+The index is generated from a checkout of the base branch, and used from another
+checkout, e.g. the head of a pull request. An entry of the index is only used while
+the OWNERS file it was read from has the same content in the checkout it is used
+from: get_chart_owners and get_approvers compare the git blob id of the file with
+the one recorded in the index (see get_blob_id), and parse the file if it changed.
+A stale entry would keep authorizing users removed from the OWNERS file.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import yaml
+
+sys.path.append("../")
+from owners import owners_file
+
+INDEX_VERSION = 3
+ROOT_OWNERS_FILE = "OWNERS"
+OWNERS_PATHSPECS = [ROOT_OWNERS_FILE, ":(glob)charts/**/OWNERS"]
+
+_indexes = {}
+
+
+class AuthzIndexError(Exception):
+    pass
+
+
+def chart_key(category, organization, chart):
+    return f"{category}/{organization}/{chart}"
+
+
+def get_owners_path(category, organization, chart):
+    return os.path.join("charts", category, organization, chart, "OWNERS")
+
+
+def get_blob_id(path):
+    """Get the git blob id of a file, as computed by git hash-object
+
+    Returns:
+        str: the blob id, None if the file does not exist
+    """
+    try:
+        with open(path, "rb") as fd:
+            content = fd.read()
+    except FileNotFoundError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def get_owners_blobs():
+    """Get the git blob ids of the OWNERS files of the checkout, see OWNERS_PATHSPECS
+
+    Returns:
+        dict: blob id of each OWNERS file by path, without the files with local
+              changes. Empty if the blob ids cannot be retrieved.
+    """
+    try:
+        ls_files = subprocess.run(
+            ["git", "ls-files", "--stage", "-z", "--", *OWNERS_PATHSPECS],
+            capture_output=True,
+            check=True,
+        )
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "-z", "--", *OWNERS_PATHSPECS],
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as err:
+        print(f"[WARNING] unable to list the OWNERS files blobs: {err}")
+        return {}
+
+    changed = set()
+    entries = iter(status.stdout.decode().split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        changed.add(entry[3:])
+        if entry[0] in "RC":
+            # Renames and copies are followed by the original path
+            changed.add(next(entries, ""))
+
+    blobs = {}
+    for entry in ls_files.stdout.decode().split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        if path not in changed:
+            blobs[path] = info.split()[1]
+    return blobs
+
+
+class AuthzIndex:
+    def __init__(self, approvers, charts, blobs=None):
+        """
+        Args:
+            approvers (list[str]): approvers of the repository
+            charts (dict): chart, vendor_label and users of the OWNERS file of each
+                           chart, by chart key (see chart_key)
+            blobs (dict): git blob id of the OWNERS files the index was read from,
+                          by path. The entries of the OWNERS files without a blob id
+                          are never used, see is_current.
+        """
+        self.blobs = blobs or {}
+        self.approvers = frozenset(approvers)
+        self.charts = charts
+        users = {}
+        for key, owners in charts.items():
+            for username in owners["users"]:
+                users.setdefault(username, set()).add(key)
+        self.users = {username: frozenset(keys) for username, keys in users.items()}
+
+    @classmethod
+    def load(cls, path):
+        """Load an index file
+
+        Raises:
+            AuthzIndexError: if the file cannot be read or is not a valid index
+        """
+        try:
+            with open(path) as fd:
+                data = json.load(fd)
+        except (OSError, ValueError) as e:
+            raise AuthzIndexError(f"Error loading authorization index {path}: {e}")
+        if data.get("version") != INDEX_VERSION:
+            raise AuthzIndexError(
+                f"Unsupported authorization index version: {data.get('version')}"
+            )
+        return cls(data["approvers"], data["charts"], data.get("blobs"))
+
+    def save(self, path):
+        """Save the index, atomically"""
+        data = {
+            "version": INDEX_VERSION,
+            "generated": datetime.now(timezone.utc).astimezone().isoformat(),
+            "approvers": sorted(self.approvers),
+            "charts": self.charts,
+            "users": {
+                username: sorted(keys) for username, keys in sorted(self.users.items())
+            },
+            "blobs": self.blobs,
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as fd:
+            json.dump(data, fd, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def is_current(self, owners_path):
+        """Check that an OWNERS file has the content the index was read from"""
+        blob = self.blobs.get(os.path.normpath(owners_path))
+        return blob is not None and blob == get_blob_id(owners_path)
+
+    def is_approver(self, username):
+        return username in self.approvers
+
+    def get_chart(self, category, organization, chart):
+        """Get the chart, vendor_label and users of the OWNERS file of a chart, None
+        if the chart has no OWNERS file"""
+        return self.charts.get(chart_key(category, organization, chart))
+
+    def can_submit(self, username, category, organization, chart):
+        """Check that a user is in the OWNERS file of a chart"""
+        return chart_key(category, organization, chart) in self.users.get(username, ())
+
+
+def get_index():
+    """Get the index pointed to by OWNERS_AUTHZ_FILE, loaded once per process
+
+    The lookups of the index itself don't check that the OWNERS files are unchanged,
+    use get_chart_owners and get_approvers.
+
+    Returns:
+        AuthzIndex: the index, None if OWNERS_AUTHZ_FILE is not set
+
+    Raises:
+        AuthzIndexError: if the index cannot be loaded
+    """
+    path = os.environ.get("OWNERS_AUTHZ_FILE")
+    if not path:
+        return None
+    if path not in _indexes:
+        _indexes[path] = AuthzIndex.load(path)
+        print(f"[INFO] loaded authorization index {path}")
+    return _indexes[path]
+
+
+def load_chart_owners(owners_path):
+    """Parse the OWNERS file of a chart into an index entry, when there is no index
+
+    Returns:
+        dict: chart, vendor_label and users of the OWNERS file, None if the file
+              does not exist
+
+    Raises:
+        owners_file.OwnersFileError: if the file cannot be parsed
+    """
+    if not os.path.exists(owners_path):
+        return None
+    owner_data = owners_file.get_owner_data_from_file(owners_path)
+    return {
+        "chart": owners_file.get_chart(owner_data),
+        "vendor_label": owners_file.get_vendor_label(owner_data),
+        "users": owners_file.get_github_usernames(owner_data),
+    }
+
+
+def load_approvers(owners_path=ROOT_OWNERS_FILE):
+    """Parse the approvers out of the root OWNERS file
+
+    Raises:
+        AuthzIndexError: if the file cannot be read or has no list of approvers
+    """
+    try:
+        with open(owners_path) as fd:
+            data = yaml.load(fd, Loader=owners_file.SafeLoader)
+    except (OSError, yaml.YAMLError) as e:
+        raise AuthzIndexError(f"Error loading {owners_path}: {e}")
+    approvers = data.get("approvers") if isinstance(data, dict) else None
+    if not isinstance(approvers, list):
+        raise AuthzIndexError(f'{owners_path} has no list of "approvers"')
+    return approvers
+
+
+def get_chart_owners(category, organization, chart):
+    """Get the chart, vendor_label and users of the OWNERS file of a chart, from the
+    index if there is one, from the OWNERS file otherwise
+
+    Returns:
+        dict: see AuthzIndex.get_chart, None if the chart has no OWNERS file
+
+    Raises:
+        AuthzIndexError: if the index cannot be loaded
+        owners_file.OwnersFileError: if the OWNERS file cannot be parsed
+    """
+    owners_path = get_owners_path(category, organization, chart)
+    index = get_index()
+    if index is not None:
+        if index.is_current(owners_path):
+            return index.get_chart(category, organization, chart)
+        print(f"[INFO] {owners_path} is not in the authorization index or changed")
+    return load_chart_owners(owners_path)
+
+
+def get_approvers(owners_path=ROOT_OWNERS_FILE):
+    """Get the approvers of the repository, from the index if there is one, from the
+    root OWNERS file otherwise
+
+    Returns:
+        frozenset[str]: GitHub usernames of the approvers
+
+    Raises:
+        AuthzIndexError: if the index or the root OWNERS file cannot be loaded
+    """
+    index = get_index()
+    if index is not None:
+        if index.is_current(owners_path):
+            return index.approvers
+        print(f"[INFO] {owners_path} is not in the authorization index or changed")
+    return frozenset(load_approvers(owners_path))
@@ -0,0 +1,223 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from owners import authz, checkuser
+from owners.ownerstree_test import generate_locks, git, write_owners
+
+root_owners = """\
+approvers:
+- approver1
+- approver2
+reviewers:
+- reviewer1
+"""
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OWNERS_CACHE_FILE", str(tmp_path / "owners-cache.json"))
+    monkeypatch.delenv("OWNERS_AUTHZ_FILE", raising=False)
+    monkeypatch.setattr(authz, "_indexes", {})
+    (tmp_path / "OWNERS").write_text(root_owners)
+    write_owners("partners", "acme", "awesome")
+    write_owners("community", "foo", "bar")
+    return tmp_path
+
+
+def test_index_lookups(repo):
+    index = authz.AuthzIndex(
+        ["approver1"],
+        {
+            "partners/acme/awesome": {
+                "chart": "awesome",
+                "vendor_label": "acme",
+                "users": ["alice", "bob"],
+            },
+            "community/foo/bar": {
+                "chart": "bar",
+                "vendor_label": "foo",
+                "users": ["bob"],
+            },
+        },
+    )
+    index.save("authz.json")
+    index = authz.AuthzIndex.load("authz.json")
+
+    assert index.is_approver("approver1")
+    assert not index.is_approver("alice")
+    assert index.can_submit("alice", "partners", "acme", "awesome")
+    assert not index.can_submit("alice", "community", "foo", "bar")
+    assert index.can_submit("bob", "community", "foo", "bar")
+    assert not index.can_submit("carol", "partners", "acme", "awesome")
+    assert index.get_chart("partners", "acme", "missing") is None
+
+    with open("authz.json") as fd:
+        assert json.load(fd)["users"] == {
+            "alice": ["partners/acme/awesome"],
+            "bob": ["community/foo/bar", "partners/acme/awesome"],
+        }
+
+
+def commit_all(message="update"):
+    git("add", "-A")
+    git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", message)
+
+
+def test_lookups_with_and_without_index(repo, monkeypatch, capsys):
+    git("init", "-q")
+    commit_all()
+    without_index = authz.get_chart_owners("partners", "acme", "awesome")
+    assert without_index == {
+        "chart": "awesome",
+        "vendor_label": "acme",
+        "users": ["someone"],
+    }
+    assert checkuser.verify_user("approver1")
+    assert not checkuser.verify_user("someone")
+
+    rc, _ = generate_locks(monkeypatch, capsys, "--authz-file", "authz.json")
+    assert rc is None
+    blobs = authz.AuthzIndex.load("authz.json").blobs
+    assert sorted(blobs) == [
+        "OWNERS",
+        "charts/community/foo/bar/OWNERS",
+        "charts/partners/acme/awesome/OWNERS",
+    ]
+    monkeypatch.setenv("OWNERS_AUTHZ_FILE", str(repo / "authz.json"))
+
+    # The OWNERS files are not read again once the index is generated
+    def load_owners(*args):
+        raise AssertionError("OWNERS file read")
+
+    with monkeypatch.context() as m:
+        m.setattr(authz, "load_chart_owners", load_owners)
+        m.setattr(authz, "load_approvers", load_owners)
+        assert authz.get_chart_owners("partners", "acme", "awesome") == without_index
+        assert checkuser.verify_user("approver1")
+        assert not checkuser.verify_user("someone")
+    assert authz.get_chart_owners("partners", "acme", "missing") is None
+
+
+def test_get_blob_id(repo):
+    hash_object = subprocess.run(
+        ["git", "hash-object", "OWNERS"], capture_output=True, check=True
+    )
+    assert authz.get_blob_id("OWNERS") == hash_object.stdout.decode().strip()
+    assert authz.get_blob_id("missing") is None
+
+
+def test_stale_index_is_ignored(repo, monkeypatch, capsys):
+    git("init", "-q")
+    commit_all()
+    rc, _ = generate_locks(monkeypatch, capsys, "--authz-file", "authz.json")
+    assert rc is None
+    monkeypatch.setenv("OWNERS_AUTHZ_FILE", str(repo / "authz.json"))
+
+    # approver2 is removed from the OWNERS file after the index was built
+    (repo / "OWNERS").write_text("approvers:\n- approver1\n")
+    assert not checkuser.verify_user("approver2")
+
+    commit_all()
+    assert not checkuser.verify_user("approver2")
+    assert checkuser.verify_user("approver1")
+
+
+def test_index_with_local_changes(repo, monkeypatch, capsys):
+    git("init", "-q")
+    commit_all()
+    write_owners(
+        "community",
+        "foo",
+        "bar",
+        "chart:\n  name: bar\nvendor:\n  label: foo\nusers:\n- githubUsername: carol\n",
+    )
+    rc, _ = generate_locks(monkeypatch, capsys, "--authz-file", "authz.json")
+    assert rc is None
+
+    # The OWNERS files with local changes don't have a blob id in the index
+    assert (
+        "charts/community/foo/bar/OWNERS"
+        not in authz.AuthzIndex.load("authz.json").blobs
+    )
+
+
+def test_index_from_ancestor_checkout(repo, monkeypatch, capsys):
+    """The index is generated from the base branch and used from a pull request"""
+    git("init", "-q")
+    commit_all("base")
+    base = repo.parent / f"{repo.name}-base"
+    git("worktree", "add", "-q", "--detach", str(base), "HEAD")
+
+    # The pull request changes a chart and an OWNERS file
+    os.makedirs("charts/partners/acme/awesome/1.0.0")
+    (repo / "charts/partners/acme/awesome/1.0.0/report.yaml").write_text("report\n")
+    write_owners(
+        "community",
+        "foo",
+        "bar",
+        "chart:\n  name: bar\nvendor:\n  label: foo\nusers:\n- githubUsername: carol\n",
+    )
+    commit_all("pull request")
+
+    authz_file = str(repo / "authz.json")
+    monkeypatch.chdir(base)
+    rc, _ = generate_locks(monkeypatch, capsys, "--authz-file", authz_file)
+    assert rc is None
+
+    monkeypatch.chdir(repo)
+    monkeypatch.setenv("OWNERS_AUTHZ_FILE", authz_file)
+    loaded = []
+
+    def load_chart_owners(owners_path):
+        loaded.append(owners_path)
+        return original_load_chart_owners(owners_path)
+
+    original_load_chart_owners = authz.load_chart_owners
+    monkeypatch.setattr(authz, "load_chart_owners", load_chart_owners)
+    monkeypatch.setattr(authz, "load_approvers", None)
+
+    # Unchanged OWNERS files are served from the index
+    assert authz.get_chart_owners("partners", "acme", "awesome")["users"] == ["someone"]
+    assert checkuser.verify_user("approver1")
+    assert loaded == []
+
+    # The OWNERS file changed by the pull request is read again
+    assert authz.get_chart_owners("community", "foo", "bar")["users"] == ["carol"]
+    assert loaded == ["charts/community/foo/bar/OWNERS"]
+
+
+def test_generate_locks_since_patches_index(repo, monkeypatch, capsys):
+    git("init", "-q")
+    git("add", "charts")
+    git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "init")
+    lock_file = repo / "chart-locks.json"
+    _, out = generate_locks(monkeypatch, capsys, "--authz-file", "authz.json")
+    lock_file.write_text(out)
+
+    write_owners(
+        "community",
+        "foo",
+        "bar",
+        "chart:\n  name: bar\nvendor:\n  label: foo\nusers:\n- githubUsername: carol\n",
+    )
+    os.remove("charts/partners/acme/awesome/OWNERS")
+    rc, _ = generate_locks(
+        monkeypatch,
+        capsys,
+        "--since",
+        "HEAD",
+        "--lock-file",
+        str(lock_file),
+        "--authz-file",
+        "authz.json",
+    )
+    assert rc is None
+
+    index = authz.AuthzIndex.load("authz.json")
+    assert list(index.charts) == ["community/foo/bar"]
+    assert index.users == {"carol": frozenset(["community/foo/bar"])}
+    assert index.approvers == {"approver1", "approver2"}
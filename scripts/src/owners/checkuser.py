@@ -11,18 +11,11 @@ results:
 """
 
 import argparse
-import os
 import re
 import sys
 
-import yaml
-
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
-
 sys.path.append("../")
+from owners import authz
 from pullrequest import prartifact
 
 OWNERS_FILE = "OWNERS"
@@ -32,16 +25,15 @@ THIS_FILE = "scripts/src/owners/checkuser.py"
 
 def verify_user(username):
     print(f"[INFO] Verify user. {username}")
-    if not os.path.exists(OWNERS_FILE):
-        print(f"[ERROR] {OWNERS_FILE} file does not exist.")
-    else:
-        data = open(OWNERS_FILE).read()
-        out = yaml.load(data, Loader=Loader)
-        if username in out["approvers"]:
-            print(f"[INFO] {username} authorized")
-            return True
-        else:
-            print(f"[ERROR] {username} not auhtorized")
+    try:
+        approvers = authz.get_approvers(OWNERS_FILE)
+    except authz.AuthzIndexError as e:
+        print(f"[ERROR] {e}")
+        return False
+    if username in approvers:
+        print(f"[INFO] {username} authorized")
+        return True
+    print(f"[ERROR] {username} not auhtorized")
     return False
 
 
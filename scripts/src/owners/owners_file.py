@@ -4,7 +4,7 @@ import os
 import yaml
 
 try:
-    from yaml import CSafeoader as SafeLoader
+    from yaml import CSafeLoader as SafeLoader
 except ImportError:
     from yaml import SafeLoader
 
@@ -92,6 +92,16 @@ def get_web_catalog_only(owner_data, raise_if_missing=False):
     )
 
 
+def get_github_usernames(owner_data):
+    """Get the GitHub usernames of the users allowed to submit the chart"""
+    users = owner_data.get("users") or []
+    return [
+        user["githubUsername"]
+        for user in users
+        if isinstance(user, dict) and "githubUsername" in user
+    ]
+
+
 def get_users_included(owner_data):
     users = owner_data.get("users", list())
     return len(users) != 0
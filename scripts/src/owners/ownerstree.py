@@ -0,0 +1,253 @@
+"""Load the OWNERS files of a tree of charts.
+
+Tools like generate-chart-locks need a few fields of every OWNERS file of the
+repository (the chart name, the vendor label and the GitHub users), which holds
+thousands of them. This module loads them:
+* in parallel, on a process pool, with the C YAML loader when available (see
+  owners.owners_file).
+* through a persistent cache of the fields of each file, keyed by its path. A cached
+  entry is used if the file has the same mtime and size, or else the same content
+  SHA: a fresh git checkout changes the mtime of every file, but not their content.
+
+The cache is a JSON file, OWNERS_CACHE_FILE (owners-cache-<checkout>.json in the
+temporary directory by default, one per checkout). The paths of the files are
+relative to the root of the checkout, the current directory, which is recorded in
+the cache: a cache written for another checkout is not used. Files that fail to load
+are never cached.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from typing import NamedTuple
+
+import yaml
+
+sys.path.append("../")
+from owners import owners_file
+
+CACHE_VERSION = 3
+
+# Below this number of files to parse, a process pool costs more than it saves
+MIN_FILES_FOR_POOL = 256
+CHUNK_SIZE = 64
+
+
+class OwnersRecord(NamedTuple):
+    path: str
+    chart: str = ""
+    vendor_label: str = ""
+    users: tuple = ()
+    # Set if the file could not be loaded, in which case the other fields are empty
+    error: str = None
+
+
+def get_root():
+    """Get the root of the checkout the paths of the cache are relative to"""
+    return os.path.abspath(os.getcwd())
+
+
+def get_cache_file():
+    cache_file = os.environ.get("OWNERS_CACHE_FILE")
+    if cache_file:
+        return cache_file
+    root_key = hashlib.sha256(get_root().encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"owners-cache-{root_key}.json")
+
+
+def load_cache(cache_file):
+    """Load the cache of parsed OWNERS files
+
+    Returns:
+        dict: the cached entries by path, empty if there is no usable cache for the
+              current checkout
+    """
+    try:
+        with open(cache_file) as fd:
+            cache = json.load(fd)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("root") != get_root():
+        return {}
+    return cache["entries"]
+
+
+def save_cache(cache_file, entries):
+    """Save the cache of parsed OWNERS files, atomically"""
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fd:
+        json.dump(
+            {"version": CACHE_VERSION, "root": get_root(), "entries": entries}, fd
+        )
+    os.replace(tmp_path, cache_file)
+
+
+def parse_owners_file(path, known_sha=None):
+    """Parse the fields of an OWNERS file, in a worker process
+
+    Args:
+        path (str): path of the OWNERS file
+        known_sha (str): SHA of the content of the file when it was last parsed. The
+                         file is not parsed again if its content has this SHA.
+
+    Returns:
+        tuple: (sha, fields, error). fields is a dict with the chart, vendor_label
+               and users keys, None if the content has the known SHA or could not
+               be loaded, in which case error is set.
+    """
+    try:
+        with open(path, "rb") as fd:
+            content = fd.read()
+    except OSError as e:
+        return None, None, f"Error opening OWNERS file: {e}"
+
+    sha = hashlib.sha256(content).hexdigest()
+    if sha == known_sha:
+        return sha, None, None
+
+    try:
+        owner_data = yaml.load(content, Loader=owners_file.SafeLoader)
+    except yaml.YAMLError as e:
+        return sha, None, f"Exception loading OWNERS file: {e}"
+    if not isinstance(owner_data, dict):
+        return sha, None, "Exception loading OWNERS file: not a mapping"
+
+    fields = {
+        "chart": owners_file.get_chart(owner_data),
+        "vendor_label": owners_file.get_vendor_label(owner_data),
+        "users": owners_file.get_github_usernames(owner_data),
+    }
+    return sha, fields, None
+
+
+def make_record(path, fields):
+    return OwnersRecord(
+        path, fields["chart"], fields["vendor_label"], tuple(fields["users"])
+    )
+
+
+def _parse_task(task):
+    return parse_owners_file(*task)
+
+
+def load_owners_files(paths, cache_file=None, max_workers=None):
+    """Load the fields of OWNERS files, using the cache
+
+    Args:
+        paths (list[str]): paths of the OWNERS files
+        cache_file (str): path of the cache, see get_cache_file by default
+        max_workers (int): number of worker processes, the number of CPUs by default.
+                           Set to 1 to parse in the current process.
+
+    Returns:
+        list[OwnersRecord]: the records of the files, in the order of paths
+    """
+    cache_file = cache_file or get_cache_file()
+    cache = load_cache(cache_file)
+
+    records = {}
+    tasks = []
+    stats = {}
+    for path in paths:
+        entry = cache.get(path)
+        try:
+            stat = os.stat(path)
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stats[path] = None
+        if entry and stats[path] == (entry["mtime_ns"], entry["size"]):
+            records[path] = make_record(path, entry)
+        else:
+            tasks.append((path, entry["sha"] if entry else None))
+
+    if max_workers != 1 and len(tasks) >= MIN_FILES_FOR_POOL:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_parse_task, tasks, chunksize=CHUNK_SIZE))
+    else:
+        results = [_parse_task(task) for task in tasks]
+
+    for (path, _), (sha, fields, error) in zip(tasks, results):
+        if error:
+            records[path] = OwnersRecord(path, error=error)
+            cache.pop(path, None)
+            continue
+        if fields is None:
+            # The content did not change since it was parsed
+            fields = cache[path]
+        if stats[path] is None:
+            # The file could not be stated, e.g. it was created since. The entry is
+            # revalidated with the SHA of its content on the next run.
+            mtime_ns, size = None, None
+        else:
+            mtime_ns, size = stats[path]
+        cache[path] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "sha": sha,
+            "chart": fields["chart"],
+            "vendor_label": fields["vendor_label"],
+            "users": fields["users"],
+        }
+        records[path] = make_record(path, fields)
+
+    print(
+        f"[INFO] loaded {len(paths)} OWNERS files, {len(paths) - len(tasks)} unchanged",
+        file=sys.stderr,
+    )
+    if tasks:
+        save_cache(cache_file, cache)
+    return [records[path] for path in paths]
+
+
+def find_owners_files(base_dir="charts"):
+    """Find the OWNERS files of a tree of charts"""
+    return glob(f"{base_dir}/**/OWNERS", recursive=True)
+
+
+def get_changed_owners_files(since, base_dir="charts"):
+    """Get the OWNERS files that changed since a git revision, in the working tree
+
+    Args:
+        since (str): git revision
+        base_dir (str): directory of the charts, relative to the current directory
+
+    Returns:
+        list[str]: paths of the OWNERS files added, modified or deleted since the
+                   revision, including the ones not yet committed
+
+    Raises:
+        subprocess.CalledProcessError: if the revision is unknown
+    """
+    pathspec = f":(glob){base_dir}/**/OWNERS"
+    diff = subprocess.run(
+        [
+            "git",
+            "diff",
+            "--relative",
+            "--name-only",
+            "--no-renames",
+            "-z",
+            since,
+            "--",
+            pathspec,
+        ],
+        capture_output=True,
+        check=True,
+    )
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z", "--", pathspec],
+        capture_output=True,
+        check=True,
+    )
+    paths = set()
+    for out in (diff.stdout, untracked.stdout):
+        paths.update(path for path in out.decode("utf-8").split("\0") if path)
+    return sorted(paths)
@@ -0,0 +1,168 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from owners import ownerstree
+from packagemapping import generatelocks
+
+owners_template = """\
+chart:
+  name: {chart}
+  shortDescription: Awesome chart
+publicPgpKey: unknown
+users:
+- githubUsername: someone
+vendor:
+  label: {organization}
+  name: {organization} Inc.
+"""
+
+
+def write_owners(category, organization, chart, content=None):
+    path = os.path.join("charts", category, organization, chart, "OWNERS")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fd:
+        fd.write(
+            content or owners_template.format(chart=chart, organization=organization)
+        )
+    return path
+
+
+def git(*args):
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def charts_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OWNERS_CACHE_FILE", str(tmp_path / "cache" / "owners.json"))
+    write_owners("partners", "acme", "awesome")
+    write_owners("partners", "acme", "other")
+    write_owners("community", "foo", "bar")
+    return tmp_path
+
+
+def test_load_owners_files_uses_cache(charts_tree, monkeypatch):
+    paths = sorted(ownerstree.find_owners_files())
+    records = ownerstree.load_owners_files(paths)
+    assert records == [
+        ownerstree.OwnersRecord(paths[0], "bar", "foo", ("someone",)),
+        ownerstree.OwnersRecord(paths[1], "awesome", "acme", ("someone",)),
+        ownerstree.OwnersRecord(paths[2], "other", "acme", ("someone",)),
+    ]
+
+    parsed = []
+
+    def parse_owners_file(path, known_sha=None):
+        parsed.append(path)
+        return original_parse(path, known_sha)
+
+    original_parse = ownerstree.parse_owners_file
+    monkeypatch.setattr(ownerstree, "parse_owners_file", parse_owners_file)
+
+    # Unchanged files are not read again
+    assert ownerstree.load_owners_files(paths) == records
+    assert parsed == []
+
+    # A file with a new mtime but the same content is read, but not parsed again
+    os.utime(paths[0], ns=(0, 0))
+    write_owners("partners", "acme", "other", "chart:\n  name: renamed\n")
+    assert ownerstree.load_owners_files(paths, max_workers=1) == [
+        records[0],
+        records[1],
+        ownerstree.OwnersRecord(paths[2], "renamed", ""),
+    ]
+    assert parsed == [paths[0], paths[2]]
+
+
+def test_load_owners_files_errors_are_not_cached(charts_tree):
+    path = write_owners("partners", "acme", "broken", "chart: [")
+    (record,) = ownerstree.load_owners_files([path])
+    assert record.error.startswith("Exception loading OWNERS file")
+
+    with open(ownerstree.get_cache_file()) as fd:
+        assert path not in json.load(fd)["entries"]
+
+
+def test_cache_is_per_checkout(charts_tree, monkeypatch):
+    paths = sorted(ownerstree.find_owners_files())
+    ownerstree.load_owners_files(paths)
+
+    # Another checkout, with a file of the same path, mtime and size, doesn't use
+    # the cache
+    stat = os.stat(paths[0])
+    other = charts_tree / "other-checkout"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    write_owners(
+        "community",
+        "foo",
+        "bar",
+        owners_template.format(chart="baz", organization="foo"),
+    )
+    os.utime(paths[0], ns=(stat.st_mtime_ns, stat.st_mtime_ns))
+    assert os.stat(paths[0]).st_size == stat.st_size
+    (record,) = ownerstree.load_owners_files(paths[:1])
+    assert record.chart == "baz"
+
+    monkeypatch.delenv("OWNERS_CACHE_FILE")
+    default_cache_file = ownerstree.get_cache_file()
+    monkeypatch.chdir(charts_tree)
+    assert ownerstree.get_cache_file() != default_cache_file
+
+
+def generate_locks(monkeypatch, capsys, *args):
+    monkeypatch.setattr("sys.argv", ["generate-chart-locks", *args])
+    rc = generatelocks.main()
+    return rc, capsys.readouterr().out
+
+
+def test_generate_locks_since(charts_tree, monkeypatch, capsys):
+    git("init", "-q")
+    git("add", "charts")
+    git(
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "-qm",
+        "init",
+    )
+
+    rc, out = generate_locks(monkeypatch, capsys)
+    assert rc is None
+    lock_file = charts_tree / "chart-locks.json"
+    lock_file.write_text(out)
+    assert json.loads(out)["packages"] == {
+        "awesome": "partners/acme/awesome",
+        "bar": "community/foo/bar",
+        "other": "partners/acme/other",
+    }
+
+    # Move a chart to another organization, add and remove one
+    os.remove("charts/partners/acme/awesome/OWNERS")
+    write_owners("partners", "newacme", "awesome")
+    write_owners("redhat", "redhat", "redhat-new")
+    os.remove("charts/community/foo/bar/OWNERS")
+
+    rc, out = generate_locks(
+        monkeypatch, capsys, "--since", "HEAD", "--lock-file", str(lock_file)
+    )
+    assert rc is None
+    assert json.loads(out)["packages"] == {
+        "awesome": "partners/newacme/awesome",
+        "other": "partners/acme/other",
+        "redhat-new": "redhat/redhat/redhat-new",
+    }
+    rc, full_out = generate_locks(monkeypatch, capsys)
+    assert json.loads(full_out)["packages"] == json.loads(out)["packages"]
+
+    # A duplicate chart name is detected against the unchanged charts
+    write_owners("community", "foo", "other")
+    rc, _ = generate_locks(
+        monkeypatch, capsys, "--since", "HEAD", "--lock-file", str(lock_file)
+    )
+    assert rc == 40
@@ -12,12 +12,8 @@ Any other non-zero is considered a failed execution (contextually, something bro
 import os
 import sys
 
-import yaml
-
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
+sys.path.append("../")
+from owners import authz
 
 OWNERS_FILE = "OWNERS"
 
@@ -25,25 +21,13 @@ OWNERS_FILE = "OWNERS"
 def is_approver(username: str) -> bool:
     """Returns true if username is in the OWNERS file
 
+    The approvers are looked up in the authorization index if there is one (see
+    owners.authz).
+
     Raises an Exception in cases where the content from the OWNERS file
     does not match our expectations.
     """
-
-    with open(OWNERS_FILE, "r") as f:
-        data = f.read()
-        out = yaml.load(data, Loader=Loader)
-
-    if "approvers" not in out:
-        raise Exception('OWNERS file did not have the required "approvers" key')
-
-    approvers = out.get("approvers")
-    if not isinstance(approvers, list):
-        raise Exception('The "approvers" key was not a list, and a list is expected')
-
-    if username in out.get("approvers"):
-        return True
-
-    return False
+    return username in authz.get_approvers(OWNERS_FILE)
 
 
 def main():
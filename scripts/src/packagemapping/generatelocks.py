@@ -1,10 +1,17 @@
+import argparse
+import json
+import os
 import re
+import subprocess
 import sys
 from datetime import datetime, timezone
-from glob import glob
 from json import dumps as to_json
 
-from owners import owners_file
+from owners import authz, ownerstree
+
+OWNERS_FILE_PATTERN = re.compile(
+    r"charts/(partners|redhat|community)/([\w-]+)/([\w-]+)/OWNERS"
+)
 
 
 def ownerfile_regex():
@@ -18,9 +25,7 @@ def ownerfile_regex():
         E.g. category | organization | chartname
              partner  | hashicorp    | vault
     """
-
-    pattern = re.compile(r"charts/(partners|redhat|community)/([\w-]+)/([\w-]+)/OWNERS")
-    return pattern
+    return OWNERS_FILE_PATTERN
 
 
 def logError(msg, file=sys.stderr):
@@ -38,11 +43,125 @@ def logWarn(msg, file=sys.stderr):
     print(f"[WARN] {msg}", file=file)
 
 
+def parse_owners_path(filename):
+    """Parse the category, organization and chart name out of the path of an OWNERS
+    file.
+
+    Returns:
+        A tuple (return code, (category, organization, chart)). The return code is 0
+        if the path was successfully parsed, see main otherwise.
+    """
+    matched = ownerfile_regex().match(filename)
+    if matched is None:
+        logError(
+            f"did not successfully parse the input. Did you run this in the right place? filename: {filename}",
+        )
+        return 10, None
+
+    category, organization, chart = matched.groups()
+    if category is None or organization is None or chart is None:
+        logError(
+            f"did not successfully parse the input filename: {filename}",
+            "expecting format charts/{category}/{organization}/{chartname}/OWNERS. Did you run this in the right place?",
+        )
+        return 20, None
+
+    return 0, (category, organization, chart)
+
+
+def add_package(packages, record, path_info):
+    """Check the content of an OWNERS file and add its chart to the package map.
+
+    Args:
+        packages (dict): the package map, updated in place
+        record (ownerstree.OwnersRecord): the loaded OWNERS file
+        path_info (tuple): category, organization and chart name of the OWNERS file,
+            see parse_owners_path
+
+    Returns:
+        0 if the chart was added, the return code of main otherwise.
+    """
+    category, organization, chart = path_info
+    if record.error:
+        logError(
+            f"Failed to load OWNERS file content. filename: {record.path} with error {record.error}"
+        )
+        return 30
+
+    if record.chart != chart:
+        logError(
+            f"the chart name in the OWNERS file did not match the chart name directory structure. OWNERS_FILE_VALUE={record.chart}, DIRECTORY_VALUE:{chart}"
+        )
+        return 35
+
+    if record.vendor_label != organization:
+        logError(
+            f"the vendor label in the OWNERS file did not match the organization name directory structure. OWNERS_FILE_VALUE={record.chart}, DIRECTORY_VALUE:{chart}"
+        )
+        return 35
+
+    new_entry = f"{category}/{organization}/{chart}"
+    if packages.get(chart) is not None:
+        logError(
+            f"Duplicate chart name detected. Unable to build unique package list. trying to add: {new_entry}, current_value: {packages[chart]}"
+        )
+        return 40
+
+    packages[chart] = new_entry
+    return 0
+
+
+def load_previous_packages(lock_file, since):
+    """Load the package map of a previous lock file and the OWNERS files changed
+    since it was generated.
+
+    Returns:
+        A tuple (packages, changed files), (None, None) if either could not be
+        retrieved.
+    """
+    try:
+        with open(lock_file) as fd:
+            packages = json.load(fd)["packages"]
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        logWarn(f"unable to load the previous lock file {lock_file}: {err}")
+        return None, None
+
+    try:
+        changed = ownerstree.get_changed_owners_files(since)
+    except (OSError, subprocess.CalledProcessError) as err:
+        logWarn(f"unable to list the OWNERS files changed since {since}: {err}")
+        return None, None
+
+    return packages, changed
+
+
+def load_previous_authz_charts(authz_file):
+    """Load the charts of a previous authorization index
+
+    Returns:
+        The charts of the index, None if it could not be loaded.
+    """
+    try:
+        return authz.AuthzIndex.load(authz_file).charts
+    except (authz.AuthzIndexError, KeyError, TypeError) as err:
+        logWarn(f"unable to load the previous authorization index: {err}")
+        return None
+
+
 def main():
     """Generates a mapping of chart names to their associated paths.
 
     Prints the resulting output as a JSON blob.
 
+    With --since, the package map of a previous lock file is patched with the OWNERS
+    files added, modified or removed since the given git revision, instead of
+    loading all the OWNERS files. All the OWNERS files are loaded if the previous
+    lock file or the changes cannot be retrieved.
+
+    With --authz-file, the authorization index of the repository (see owners.authz)
+    is written to the given file, from the same OWNERS files and the root OWNERS
+    file. With --since, the previous index at that path is patched as well.
+
     Return codes:
         0:  All is well.
         10: Parsing failure for the input path to a given OWNERS file.
@@ -52,62 +171,106 @@ def main():
         40: A duplicate chart name entry has been found.
         50: The resulting data contained no entries, which
             is certainly unexpected.
+        60: The authorization index could not be written.
     """
-    packages = {}
-    for filename in glob("charts/**/OWNERS", recursive=True):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--since",
+        dest="since",
+        type=str,
+        required=False,
+        help="git revision the previous lock file was generated from",
+    )
+    parser.add_argument(
+        "--lock-file",
+        dest="lock_file",
+        type=str,
+        required=False,
+        help="previous lock file, patched with the changes since --since",
+    )
+    parser.add_argument(
+        "--cache-file",
+        dest="cache_file",
+        type=str,
+        required=False,
+        help="cache of the parsed OWNERS files",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        required=False,
+        help="number of processes loading the OWNERS files",
+    )
+    parser.add_argument(
+        "--authz-file",
+        dest="authz_file",
+        type=str,
+        required=False,
+        help="where to write the authorization index",
+    )
+    args = parser.parse_args()
+    if args.since and not args.lock_file:
+        parser.error("--since requires --lock-file")
+
+    packages = None
+    authz_charts = {}
+    if args.since:
+        packages, filenames = load_previous_packages(args.lock_file, args.since)
+        if packages is not None and args.authz_file:
+            authz_charts = load_previous_authz_charts(args.authz_file)
+            if authz_charts is None:
+                packages = None
+    if packages is None:
+        packages = {}
+        authz_charts = {}
+        filenames = ownerstree.find_owners_files()
+    else:
+        logInfo(f"{len(filenames)} OWNERS files changed since {args.since}")
+
+    paths_info = {}
+    for filename in filenames:
         logInfo(f"processing file {filename}")
-        pattern = ownerfile_regex()
-        matched = pattern.match(filename)
-        if matched is None:
-            logError(
-                f"did not successfully parse the input. Did you run this in the right place? filename: {filename}",
-            )
-            return 10
-
-        category, organization, chart = matched.groups()
-        if category is None or organization is None or chart is None:
-            logError(
-                f"did not successfully parse the input filename: {filename}",
-                "expecting format charts/{category}/{organization}/{chartname}/OWNERS. Did you run this in the right place?",
-            )
-            return 20
+        rc, paths_info[filename] = parse_owners_path(filename)
+        if rc:
+            return rc
 
-        try:
-            owners_content = owners_file.get_owner_data_from_file(filename)
-        except owners_file.OwnersFileError as of_err:
-            logError(
-                f"Failed to load OWNERS file content. filename: {filename} with error {of_err}"
-            )
-            return 30
-
-        owners_value_chart_name = owners_file.get_chart(owners_content)
-        owners_value_vendor_label = owners_file.get_vendor_label(owners_content)
-
-        if owners_value_chart_name != chart:
-            logError(
-                f"the chart name in the OWNERS file did not match the chart name directory structure. OWNERS_FILE_VALUE={owners_value_chart_name}, DIRECTORY_VALUE:{chart}"
-            )
-            return 35
-
-        if owners_value_vendor_label != organization:
-            logError(
-                f"the vendor label in the OWNERS file did not match the organization name directory structure. OWNERS_FILE_VALUE={owners_value_chart_name}, DIRECTORY_VALUE:{chart}"
-            )
-            return 35
-
-        new_entry = f"{category}/{organization}/{chart}"
-        if packages.get(chart) is not None:
-            logError(
-                f"Duplicate chart name detected. Unable to build unique package list. trying to add: {new_entry}, current_value: {packages[chart]}"
-            )
-            return 40
-
-        packages[chart] = new_entry
+    # Remove the charts of the changed OWNERS files before adding them back, so that
+    # a chart moved to another organization is not reported as a duplicate.
+    for filename, (category, organization, chart) in paths_info.items():
+        if packages.get(chart) == f"{category}/{organization}/{chart}":
+            del packages[chart]
+        authz_charts.pop(authz.chart_key(category, organization, chart), None)
+
+    records = ownerstree.load_owners_files(
+        [filename for filename in filenames if os.path.exists(filename)],
+        cache_file=args.cache_file,
+        max_workers=args.workers,
+    )
+    for record in records:
+        rc = add_package(packages, record, paths_info[record.path])
+        if rc:
+            return rc
+        authz_charts[authz.chart_key(*paths_info[record.path])] = {
+            "chart": record.chart,
+            "vendor_label": record.vendor_label,
+            "users": list(record.users),
+        }
 
     if len(packages.keys()) == 0:
         logError("the package map contained no items!")
         return 50
 
+    if args.authz_file:
+        try:
+            approvers = authz.load_approvers()
+            blobs = authz.get_owners_blobs()
+            authz.AuthzIndex(approvers, authz_charts, blobs).save(args.authz_file)
+        except (authz.AuthzIndexError, OSError) as err:
+            logError(f"unable to write the authorization index: {err}")
+            return 60
+        logInfo(f"authorization index written to {args.authz_file}")
+
     now = datetime.now(timezone.utc).astimezone().isoformat()
 
     print(
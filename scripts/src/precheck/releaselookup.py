@@ -0,0 +1,161 @@
+"""Check that a chart release does not exist yet, in the index and as a GitHub tag.
+
+A chart version can only be submitted once: it must neither be in the index.yaml of
+the Helm repository nor have a release tag. Both lookups are sent concurrently, with
+a timeout, so the check takes as long as the slower of the two rather than their
+sum. The lookups run on daemon threads: a lookup that timed out is abandoned, it
+doesn't keep the process alive once the check is over.
+
+The versions of the index are looked up in a set per chart name (see
+indexfile.cache.load_version_index), built once per process.
+"""
+
+import sys
+import threading
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+
+sys.path.append("../")
+from indexfile import cache
+from tools import github_client
+
+DEFAULT_TIMEOUT = 30
+
+
+def get_index_url(repository, branch="gh-pages"):
+    return f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
+
+
+def get_tag_api_url(repository, tag_name):
+    return f"https://api.github.com/repos/{repository}/git/ref/tags/{tag_name}"
+
+
+@dataclass
+class ReleaseLookup:
+    """Combined verdict of the index and release tag lookups
+
+    in_index and tag_exists are None when the lookup failed, in which case the
+    failure is in errors.
+    """
+
+    chart: str
+    version: str
+    tag_name: str
+    in_index: bool = None
+    tag_exists: bool = None
+    errors: list = field(default_factory=list)
+
+    @property
+    def available(self):
+        """True if the release exists neither in the index nor as a tag"""
+        return self.in_index is False and self.tag_exists is False
+
+    def get_error_messages(self):
+        messages = []
+        if self.in_index:
+            messages.append(
+                f"[ERROR] Helm chart release already exists in the index.yaml: {self.version}"
+            )
+        if self.tag_exists:
+            messages.append(
+                f"[ERROR] Helm chart release already exists in the GitHub Release/Tag: {self.tag_name}"
+            )
+        messages.extend(self.errors)
+        return messages
+
+
+def lookup_index(index_url, chart, version, timeout=DEFAULT_TIMEOUT):
+    """Check if a chart version is in an index
+
+    Returns:
+        bool: True if the version is in the index. The index is considered empty if
+              it does not exist.
+
+    Raises:
+        KeyError: if the index is malformed
+        requests.RequestException: if the index could not be downloaded
+    """
+    versions = cache.load_version_index(index_url, timeout=timeout)
+    return version in versions.get(chart, ())
+
+
+def lookup_tag(repository, tag_name, timeout=DEFAULT_TIMEOUT):
+    """Check if a release tag exists in a GitHub repository
+
+    Raises:
+        requests.RequestException: if the GitHub API could not be reached
+    """
+    tag_api = get_tag_api_url(repository, tag_name)
+    print(f"[INFO] checking tag: {tag_api}")
+    r = github_client.get_client().head(tag_api, timeout=timeout)
+    return r.status_code == 200
+
+
+def _submit_daemon(func, *args):
+    """Run func on a daemon thread
+
+    Returns:
+        concurrent.futures.Future: the result of func
+    """
+    future = Future()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(func(*args))
+        except BaseException as err:
+            future.set_exception(err)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def check_release(
+    repository, chart, version, tag_name, index_url=None, timeout=DEFAULT_TIMEOUT
+):
+    """Look up a chart release in the index and as a GitHub tag, concurrently
+
+    Args:
+        repository (str): Name of the GitHub repository, e.g.
+                          "openshift-helm-charts/charts"
+        chart (str): Name of the chart, as in the index
+        version (str): Version of the chart
+        tag_name (str): Name of the release tag of the chart
+        index_url (str): URL of the index, the one of the gh-pages branch of the
+                         repository by default
+        timeout (float): Maximum time to wait for the lookups, in seconds
+
+    Returns:
+        ReleaseLookup: the result of both lookups
+    """
+    index_url = index_url or get_index_url(repository)
+    result = ReleaseLookup(chart, version, tag_name)
+
+    futures = {
+        "index": _submit_daemon(lookup_index, index_url, chart, version, timeout),
+        "tag": _submit_daemon(lookup_tag, repository, tag_name, timeout),
+    }
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    for name, future in futures.items():
+        if future not in done:
+            result.errors.append(
+                f"[ERROR] Timed out after {timeout}s looking up the release {tag_name} in the {name}"
+            )
+            continue
+        try:
+            found = future.result()
+        except KeyError:
+            result.errors.append(f"[ERROR] Malformed index: {index_url}")
+            continue
+        except Exception as err:
+            result.errors.append(
+                f"[ERROR] Failed to look up the release {tag_name} in the {name}: {err}"
+            )
+            continue
+        if name == "index":
+            result.in_index = found
+        else:
+            result.tag_exists = found
+
+    return result
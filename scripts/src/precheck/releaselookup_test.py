@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+import responses
+
+from indexfile import cache
+from precheck import releaselookup
+
+repository = "my-fake-org/my-fake-repo"
+index_url = releaselookup.get_index_url(repository)
+index_content = """\
+apiVersion: v1
+entries:
+  awesome:
+  - name: awesome
+    version: 1.42.0
+  - name: awesome
+    version: 1.41.0
+generated: '2024-01-01T00:00:00.000000+00:00'
+"""
+
+
+def tag_api_url(tag_name):
+    return releaselookup.get_tag_api_url(repository, tag_name)
+
+
+@pytest.fixture(autouse=True)
+def index_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("INDEX_CACHE_DIR", str(tmp_path))
+    cache.clear_memo()
+    yield tmp_path
+    cache.clear_memo()
+
+
+@responses.activate
+def test_check_release_in_index():
+    responses.get(index_url, body=index_content)
+    responses.head(tag_api_url("acme-awesome-1.42.0"), status=404)
+
+    lookup = releaselookup.check_release(
+        repository, "awesome", "1.42.0", "acme-awesome-1.42.0"
+    )
+    assert lookup.in_index is True
+    assert lookup.tag_exists is False
+    assert not lookup.available
+    assert lookup.get_error_messages() == [
+        "[ERROR] Helm chart release already exists in the index.yaml: 1.42.0"
+    ]
+
+
+@responses.activate
+def test_check_release_tag_exists():
+    responses.get(index_url, body=index_content)
+    responses.head(tag_api_url("acme-awesome-1.43.0"))
+
+    lookup = releaselookup.check_release(
+        repository, "awesome", "1.43.0", "acme-awesome-1.43.0"
+    )
+    assert lookup.in_index is False
+    assert lookup.tag_exists is True
+    assert lookup.get_error_messages() == [
+        "[ERROR] Helm chart release already exists in the GitHub Release/Tag: acme-awesome-1.43.0"
+    ]
+
+
+@responses.activate
+def test_check_release_available():
+    # A repository without index yet
+    responses.get(index_url, status=404)
+    responses.head(tag_api_url("acme-awesome-1.42.0"), status=404)
+
+    lookup = releaselookup.check_release(
+        repository, "awesome", "1.42.0", "acme-awesome-1.42.0"
+    )
+    assert lookup.available
+    assert lookup.get_error_messages() == []
+
+
+@responses.activate
+def test_check_release_malformed_index():
+    responses.get(index_url, body="apiVersion: v1\n")
+    responses.head(tag_api_url("acme-awesome-1.42.0"), status=404)
+
+    lookup = releaselookup.check_release(
+        repository, "awesome", "1.42.0", "acme-awesome-1.42.0"
+    )
+    assert lookup.in_index is None
+    assert not lookup.available
+    assert lookup.errors == [f"[ERROR] Malformed index: {index_url}"]
+
+
+def test_check_release_timeout(monkeypatch):
+    released = threading.Event()
+    daemon = []
+
+    def slow_lookup_tag(repository, tag_name, timeout):
+        # A hung lookup must not keep the process alive at exit
+        daemon.append(threading.current_thread().daemon)
+        released.wait(5)
+        return False
+
+    monkeypatch.setattr(releaselookup, "lookup_index", lambda *args: False)
+    monkeypatch.setattr(releaselookup, "lookup_tag", slow_lookup_tag)
+    try:
+        lookup = releaselookup.check_release(
+            repository, "awesome", "1.42.0", "acme-awesome-1.42.0", timeout=0.1
+        )
+    finally:
+        released.set()
+
+    assert daemon == [True]
+    assert lookup.in_index is False
+    assert lookup.tag_exists is None
+    assert not lookup.available
+    assert lookup.errors == [
+        "[ERROR] Timed out after 0.1s looking up the release acme-awesome-1.42.0 in the tag"
+    ]
@@ -1,20 +1,11 @@
 import os
-import re
-import requests
-import semver
-import yaml
-
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
 
 from dataclasses import dataclass, field
 
-from checkprcontent import checkpr
 from owners import owners_file
-from tools import gitutils
-from reporegex import matchers
+from pullrequest import manifest
+from reporegex import classifier
+from tools import versions
 from report import verifier_report
 
 xRateLimit = "X-RateLimit-Limit"
@@ -43,14 +34,6 @@ class WebCatalogOnlyError(SubmissionError):
     pass
 
 
-class HelmIndexError(SubmissionError):
-    pass
-
-
-class ReleaseTagError(SubmissionError):
-    pass
-
-
 class ChartError(Exception):
     pass
 
@@ -78,7 +61,7 @@ class Chart:
             msg = "[ERROR] A PR must contain only one chart. Current PR includes files for multiple charts."
             raise DuplicateChartError(msg)
 
-        if not semver.VersionInfo.is_valid(version):
+        if not versions.is_valid_semver(version):
             msg = (
                 f"[ERROR] Helm chart version is not a valid semantic version: {version}"
             )
@@ -106,50 +89,6 @@ class Chart:
     def get_release_tag(self):
         return f"{self.organization}-{self.name}-{self.version}"
 
-    def check_index(self, index):
-        """Check if the chart is present in the Helm index
-
-        Args:
-            index (dict): Content of the Helm repo index
-
-        Raise:
-            HelmIndexError if:
-            * The provided index is malformed
-            * The Chart is already present in the index
-
-        """
-        try:
-            chart_entry = index["entries"].get(self.name, [])
-        except KeyError as e:
-            raise HelmIndexError(f"Malformed index {index}") from e
-
-        for chart in chart_entry:
-            if chart["version"] == self.version:
-                msg = f"[ERROR] Helm chart release already exists in the index.yaml: {self.version}"
-                raise HelmIndexError(msg)
-
-    def check_release_tag(self, repository: str):
-        """Check for the existence of the chart's release tag on the provided repository.
-
-        Args:
-            repository (str): Name of the GitHub repository to check for existing tag.
-                              (e.g. "openshift-helm-charts/charts")
-
-        Raise: ReleaseTagError if the tag already exists in the GitHub repo.
-
-        """
-        tag_name = self.get_release_tag()
-        tag_api = f"https://api.github.com/repos/{repository}/git/ref/tags/{tag_name}"
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-        }
-        print(f"[INFO] checking tag: {tag_api}")
-        r = requests.head(tag_api, headers=headers)
-        if r.status_code == 200:
-            msg = f"[ERROR] Helm chart release already exists in the GitHub Release/Tag: {tag_name}"
-            raise ReleaseTagError(msg)
-
 
 @dataclass
 class Report:
@@ -212,41 +151,12 @@ class Submission:
             self._parse_modified_files()
 
     def _get_modified_files(self):
-        """Query the GitHub API in order to retrieve the list of files that are added / modified by
-        this PR"""
-        page_number = 1
-        max_page_size, page_size = 100, 100
-        files_api_url = re.sub(r"^https://api\.github\.com/", "", self.api_url)
-
-        while page_size == max_page_size:
-            files_api_query = (
-                f"{files_api_url}/files?per_page={page_size}&page={page_number}"
-            )
-            print(f"[INFO] Query files : {files_api_query}")
-
-            try:
-                r = gitutils.github_api(
-                    "get", files_api_query, os.environ.get("BOT_TOKEN")
-                )
-            except SystemExit as e:
-                raise SubmissionError(e)
-
-            files = r.json()
-            page_size = len(files)
-            page_number += 1
-
-            if xRateLimit in r.headers:
-                print(f"[DEBUG] {xRateLimit} : {r.headers[xRateLimit]}")
-            if xRateRemain in r.headers:
-                print(f"[DEBUG] {xRateRemain}  : {r.headers[xRateRemain]}")
-
-            if "message" in files:
-                msg = f'[ERROR] getting pr files: {files["message"]}'
-                raise SubmissionError(msg)
-            else:
-                for file in files:
-                    if "filename" in file:
-                        self.modified_files.append(file["filename"])
+        """Retrieve the list of files that are added / modified by this PR, from the PR
+        files manifest (see pullrequest.manifest)"""
+        try:
+            self.modified_files.extend(manifest.get_filenames(self.api_url))
+        except manifest.ManifestError as e:
+            raise SubmissionError(str(e))
 
     def _parse_modified_files(self):
         """Classify the list of modified files.
@@ -268,17 +178,16 @@ class Submission:
 
         """
         for file_path in self.modified_files:
-            file_category, match = get_file_type(file_path)
+            file_category, record = get_file_type(file_path)
             if file_category == "report":
-                self.chart.register_chart_info(*match.groups())
+                self.chart.register_chart_info(*record.submission)
                 self.set_report(file_path)
             elif file_category == "source":
-                self.chart.register_chart_info(*match.groups())
+                self.chart.register_chart_info(*record.submission)
                 self.set_source(file_path)
             elif file_category == "tarball":
-                category, organization, name, version, _ = match.groups()
-                self.chart.register_chart_info(category, organization, name, version)
-                self.set_tarball(file_path, match)
+                self.chart.register_chart_info(*record.submission)
+                self.set_tarball(file_path, record)
             elif file_category == "owners":
                 self.modified_owners.append(file_path)
             elif file_category == "unknwown":
@@ -310,7 +219,7 @@ class Submission:
             self.source.found = True
             self.source.path = file_path
 
-    def set_tarball(self, file_path, tarball_match):
+    def set_tarball(self, file_path, tarball_record):
         """Action to take when a file related to the tarball is found.
 
         This can either be the .tgz tarball itself, or the .prov provenance key.
@@ -322,10 +231,9 @@ class Submission:
             self.tarball.found = True
             self.tarball.path = file_path
 
-            _, _, chart_name, chart_version, tar_name = tarball_match.groups()
-            expected_tar_name = f"{chart_name}-{chart_version}.tgz"
-            if tar_name != expected_tar_name:
-                msg = f"[ERROR] the tgz file is named incorrectly. Expected: {expected_tar_name}. Got: {tar_name}"
+            expected_tar_name = f"{tarball_record.chart}-{tarball_record.version}.tgz"
+            if tarball_record.tarball != expected_tar_name:
+                msg = f"[ERROR] the tgz file is named incorrectly. Expected: {expected_tar_name}. Got: {tarball_record.tarball}"
                 raise SubmissionError(msg)
         elif file_extension == ".prov":
             self.tarball.provenance = file_path
@@ -489,44 +397,11 @@ def get_file_type(file_path):
     - OWNERS file
     - or another "unknown" category
 
+    Returns:
+        (str, reporegex.classifier.PathRecord): the category and the classification
+                                                of the file
     """
-    pattern, reportpattern, tarballpattern = checkpr.get_file_match_compiled_patterns()
-    owners_pattern = re.compile(
-        matchers.submission_path_matcher(include_version_matcher=False) + r"/OWNERS"
-    )
-    src_pattern = re.compile(matchers.submission_path_matcher() + r"/src/")
-
-    # Match all files under charts/<category>/<organization>/<name>/<version>
-    match = pattern.match(file_path)
-    if match:
-        report_match = reportpattern.match(file_path)
-        if report_match:
-            return "report", report_match
-
-        src_match = src_pattern.match(file_path)
-        if src_match:
-            return "source", src_match
-
-        tar_match = tarballpattern.match(file_path)
-        if tar_match:
-            return "tarball", tar_match
-    else:
-        owners_match = owners_pattern.match(file_path)
-        if owners_match:
-            return "owners", owners_match
-
-    return "unknwown", None
-
-
-def download_index_data(repository, branch="gh_pages"):
-    """Download the helm repository index"""
-    r = requests.get(
-        f"https://raw.githubusercontent.com/{repository}/{branch}/index.yaml"
-    )
-
-    if r.status_code == 200:
-        data = yaml.load(r.text, Loader=Loader)
-    else:
-        data = {}
-
-    return data
+    record = classifier.classify(file_path)
+    if record.kind in (classifier.CHART, classifier.UNKNOWN):
+        return "unknwown", record
+    return record.kind, record
@@ -0,0 +1,265 @@
+"""Manifest of the files modified by a pull request.
+
+The list of files of a PR is needed by most jobs of the workflow. Rather than each
+job paginating through the /pulls/N/files endpoint of the GitHub API, the list is
+computed once per head commit of the PR and saved as a manifest, which the following
+jobs load from disk.
+
+The manifest is computed, in order of preference:
+* from the local git repository, by diffing PR_BASE_SHA...PR_HEAD_SHA, when both
+  commits are available locally. No API call is made.
+* from the GitHub API otherwise.
+
+The manifest is saved in the PR_MANIFEST_DIR directory (the temporary directory of
+the runner by default) as pr-files-<head sha>.json. The jobs of a workflow run on
+separate runners: the build workflow uploads the manifest computed by its setup job
+as the pr-files-manifest artifact, and the following jobs download it to their
+temporary directory. The setup job checks out the full history and fetches the head
+commit of the PR, so that the manifest is computed with git. When PR_HEAD_SHA is not
+set, the files are retrieved from the GitHub API on every call.
+
+Each file of the manifest is represented by a dict with the following keys:
+* filename (str): path of the file
+* status (str): added, removed, modified, renamed, copied or changed
+* sha (str): SHA of the blob of the file, in the head commit if not removed
+* size (int): size of the blob, in bytes, None if unknown
+* previous_filename (str): for renamed and copied files only
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+
+sys.path.append("../")
+from tools import github_client
+
+MANIFEST_VERSION = 1
+PAGE_SIZE = 100
+
+GIT_STATUSES = {
+    "A": "added",
+    "C": "copied",
+    "D": "removed",
+    "M": "modified",
+    "R": "renamed",
+    "T": "changed",
+}
+
+_manifests = {}
+_lock = threading.Lock()
+
+
+class ManifestError(Exception):
+    pass
+
+
+def get_head_sha():
+    return os.environ.get("PR_HEAD_SHA")
+
+
+def get_base_sha():
+    return os.environ.get("PR_BASE_SHA")
+
+
+def get_manifest_path(head_sha):
+    directory = os.environ.get(
+        "PR_MANIFEST_DIR", os.environ.get("RUNNER_TEMP", tempfile.gettempdir())
+    )
+    return os.path.join(directory, f"pr-files-{head_sha}.json")
+
+
+def load_manifest(head_sha, api_url=None):
+    """Load the manifest saved for a head commit
+
+    Args:
+        head_sha (str): SHA of the head commit of the PR
+        api_url (str): if set, the manifest is ignored if it is for another PR
+
+    Returns:
+        list[dict]: the files of the manifest, None if there is no usable manifest
+    """
+    try:
+        with open(get_manifest_path(head_sha)) as fd:
+            manifest = json.load(fd)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    if api_url and manifest.get("api_url") != api_url:
+        return None
+    return manifest["files"]
+
+
+def save_manifest(head_sha, api_url, base_sha, source, files):
+    """Save the manifest of a head commit, atomically"""
+    manifest_path = get_manifest_path(head_sha)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fd:
+        json.dump(
+            {
+                "version": MANIFEST_VERSION,
+                "api_url": api_url,
+                "head_sha": head_sha,
+                "base_sha": base_sha,
+                "source": source,
+                "files": files,
+            },
+            fd,
+            indent=1,
+        )
+    os.replace(tmp_path, manifest_path)
+    print(f"[INFO] saved manifest of {len(files)} PR files to {manifest_path}")
+
+
+def _git(*args, input=None):
+    return subprocess.run(["git", *args], input=input, capture_output=True)
+
+
+def _has_commit(sha):
+    return _git("cat-file", "-e", f"{sha}^{{commit}}").returncode == 0
+
+
+def get_blob_sizes(shas):
+    """Get the size of git blobs from the local repository
+
+    Returns:
+        dict: the size of each blob found locally, by SHA
+    """
+    shas = [sha for sha in shas if sha and not re.fullmatch("0+", sha)]
+    if not shas:
+        return {}
+    out = _git("cat-file", "--batch-check", input="\n".join(shas).encode() + b"\n")
+    sizes = {}
+    for line in out.stdout.decode().splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[1] == "blob":
+            sizes[fields[0]] = int(fields[2])
+    return sizes
+
+
+def parse_diff_raw(output):
+    """Parse the output of git diff --raw -z --no-abbrev into manifest files"""
+    files = []
+    fields = output.split("\0")
+    i = 0
+    while i < len(fields) - 1:
+        # :<old mode> <new mode> <old sha> <new sha> <status>[<score>]
+        _, _, old_sha, new_sha, status = fields[i].lstrip(":").split(" ")
+        code = status[0]
+        file = {"status": GIT_STATUSES.get(code, "changed")}
+        if code in ("R", "C"):
+            file["previous_filename"] = fields[i + 1]
+            file["filename"] = fields[i + 2]
+            i += 3
+        else:
+            file["filename"] = fields[i + 1]
+            i += 2
+        file["sha"] = old_sha if code == "D" else new_sha
+        files.append(file)
+    return files
+
+
+def get_files_from_git(base_sha, head_sha):
+    """Get the files modified by a PR from the local repository
+
+    Returns:
+        list[dict]: the files of the manifest, None if either commit is not available
+                    locally
+    """
+    if not (_has_commit(base_sha) and _has_commit(head_sha)):
+        return None
+    out = _git("diff", "--raw", "-z", "--no-abbrev", "-M", f"{base_sha}...{head_sha}")
+    if out.returncode != 0:
+        return None
+    files = parse_diff_raw(out.stdout.decode("utf-8"))
+    sizes = get_blob_sizes([file["sha"] for file in files])
+    for file in files:
+        file["size"] = sizes.get(file["sha"])
+    return files
+
+
+def get_files_from_api(api_url):
+    """Get the files modified by a PR from the GitHub API
+
+    Raises:
+        ManifestError: if the API returns an error
+    """
+    files = []
+    page_number = 1
+    page_size = PAGE_SIZE
+    client = github_client.get_client()
+    while page_size == PAGE_SIZE:
+        files_api_query = f"{api_url}/files?per_page={PAGE_SIZE}&page={page_number}"
+        print(f"[INFO] Query files : {files_api_query}")
+        r = client.get(files_api_query)
+        page = r.json()
+        if "message" in page:
+            raise ManifestError(f'[ERROR] getting pr files: {page["message"]}')
+        page_size = len(page)
+        page_number += 1
+        for file in page:
+            if "filename" in file:
+                entry = {
+                    "filename": file["filename"],
+                    "status": file.get("status"),
+                    "sha": file.get("sha"),
+                }
+                if file.get("previous_filename"):
+                    entry["previous_filename"] = file["previous_filename"]
+                files.append(entry)
+
+    # The API does not give the size of the files, get it from the local blobs
+    sizes = get_blob_sizes([file["sha"] for file in files])
+    for file in files:
+        file["size"] = sizes.get(file["sha"])
+    return files
+
+
+def get_manifest(api_url):
+    """Get the files modified by a PR, computing the manifest only if needed
+
+    Args:
+        api_url (str): URL of the GitHub PR
+
+    Returns:
+        list[dict]: the files of the manifest, see the module docstring
+
+    Raises:
+        ManifestError: if the files must be retrieved from the API and it returns an
+                       error
+    """
+    head_sha = get_head_sha()
+    if not head_sha:
+        # Without the head commit, the files may change between calls
+        return get_files_from_api(api_url)
+
+    base_sha = get_base_sha()
+    key = (api_url, head_sha)
+    with _lock:
+        if key in _manifests:
+            return _manifests[key]
+
+        files = load_manifest(head_sha, api_url)
+        if files is not None:
+            print(f"[INFO] loaded manifest of PR files for {head_sha}")
+        else:
+            source = "git"
+            if base_sha:
+                files = get_files_from_git(base_sha, head_sha)
+            if files is None:
+                source = "api"
+                files = get_files_from_api(api_url)
+            save_manifest(head_sha, api_url, base_sha, source, files)
+
+        _manifests[key] = files
+        return files
+
+
+def get_filenames(api_url):
+    """Get the paths of the files modified by a PR, see get_manifest"""
+    return [file["filename"] for file in get_manifest(api_url)]
@@ -0,0 +1,119 @@
+import json
+import subprocess
+
+import pytest
+import responses
+
+from pullrequest import manifest
+
+api_url = "https://api.github.com/repos/openshift-helm-charts/charts/pulls/42"
+
+
+@pytest.fixture(autouse=True)
+def manifest_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("PR_MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.delenv("PR_HEAD_SHA", raising=False)
+    monkeypatch.delenv("PR_BASE_SHA", raising=False)
+    monkeypatch.setattr(manifest, "_manifests", {})
+
+
+def git(*args):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def pr_repo(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    git("init", "-q")
+    chart_dir = repo / "charts/partners/acme/awesome"
+    chart_dir.mkdir(parents=True)
+    (chart_dir / "OWNERS").write_text("chart:\n  name: awesome\n")
+    (repo / "README.md").write_text("readme\n")
+    (repo / "old.txt").write_text("a file to be renamed, long enough to be similar\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "base")
+    base_sha = git("rev-parse", "HEAD")
+
+    (chart_dir / "0.1.0").mkdir()
+    (chart_dir / "0.1.0/report.yaml").write_text("apiversion: v1\n")
+    (chart_dir / "OWNERS").write_text("chart:\n  name: awesome\n  x: y\n")
+    (repo / "README.md").unlink()
+    git("mv", "old.txt", "new.txt")
+    git("add", "-A")
+    git("commit", "-q", "-m", "head")
+    head_sha = git("rev-parse", "HEAD")
+
+    monkeypatch.setenv("PR_BASE_SHA", base_sha)
+    monkeypatch.setenv("PR_HEAD_SHA", head_sha)
+    return head_sha
+
+
+@responses.activate
+def test_get_manifest_from_git(pr_repo):
+    files = manifest.get_manifest(api_url)
+
+    by_name = {file["filename"]: file for file in files}
+    report = "charts/partners/acme/awesome/0.1.0/report.yaml"
+    assert by_name[report]["status"] == "added"
+    assert by_name[report]["size"] == len("apiversion: v1\n")
+    assert by_name[report]["sha"] == git("rev-parse", f"HEAD:{report}")
+    assert by_name["charts/partners/acme/awesome/OWNERS"]["status"] == "modified"
+    assert by_name["README.md"]["status"] == "removed"
+    assert by_name["README.md"]["size"] == len("readme\n")
+    assert by_name["new.txt"]["status"] == "renamed"
+    assert by_name["new.txt"]["previous_filename"] == "old.txt"
+    # No API call
+    assert len(responses.calls) == 0
+
+    with open(manifest.get_manifest_path(pr_repo)) as fd:
+        saved = json.load(fd)
+    assert saved["source"] == "git"
+    assert saved["files"] == files
+
+
+@responses.activate
+def test_get_manifest_from_api_saved_and_reused(monkeypatch):
+    monkeypatch.setenv("PR_HEAD_SHA", "f" * 40)
+    responses.get(
+        f"{api_url}/files",
+        json=[
+            {"filename": "charts/partners/acme/awesome/OWNERS", "status": "added"},
+            {"filename": "new.txt", "status": "renamed", "previous_filename": "a"},
+        ],
+    )
+
+    assert manifest.get_filenames(api_url) == [
+        "charts/partners/acme/awesome/OWNERS",
+        "new.txt",
+    ]
+    assert len(responses.calls) == 1
+
+    # Another job of the same workflow run loads the manifest from disk
+    monkeypatch.setattr(manifest, "_manifests", {})
+    files = manifest.get_manifest(api_url)
+    assert files[1] == {
+        "filename": "new.txt",
+        "status": "renamed",
+        "sha": None,
+        "previous_filename": "a",
+        "size": None,
+    }
+    assert len(responses.calls) == 1
+
+    # The manifest of another PR with the same head commit is not reused
+    assert manifest.load_manifest("f" * 40, api_url.replace("42", "43")) is None
+
+
+@responses.activate
+def test_get_manifest_api_error():
+    responses.get(f"{api_url}/files", json={"message": "Not Found"})
+
+    with pytest.raises(manifest.ManifestError):
+        manifest.get_manifest(api_url)
@@ -1,9 +1,8 @@
 import json
-import re
 import sys
 from argparse import ArgumentParser
 
-from reporegex import matchers
+from reporegex import classifier
 from tools import gitutils
 
 from pullrequest import prartifact
@@ -49,15 +48,11 @@ def extract_from_path_for_pr(pr_api_url):
 
     modified_files = prartifact.get_modified_files(pr_api_url)
     first_match = None
-    modification_matcher = re.compile(
-        matchers.submission_path_matcher(
-            strict_categories=True, include_version_matcher=False
-        )
-    )
     for file in modified_files:
-        match = modification_matcher.match(file)
-        if not match:
+        record = classifier.classify(file)
+        if record.chart is None:
             continue
+        match = (record.category, record.organization, record.chart)
 
         # Store the value of our groupings the first time we match
         # so that we can track if it changes.
@@ -65,17 +60,17 @@ def extract_from_path_for_pr(pr_api_url):
             first_match = match
             continue
 
-        if match.groups() != first_match.groups():
+        if match != first_match:
             raise MultipleMatchesError(
-                first_match=first_match.groups(),
-                subsequent_match=match.groups(),
+                first_match=first_match,
+                subsequent_match=match,
             )
 
     # We didn't find a match, so we need to bail.
     if not first_match:
         raise NoMatchesError
 
-    cat, org, name = first_match.groups()
+    cat, org, name = first_match
     # normalize the partners directory to partner
     cat = "partner" if cat == "partners" else cat
     return cat, org, name
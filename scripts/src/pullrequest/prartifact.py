@@ -4,11 +4,10 @@ import pathlib
 import shutil
 import sys
 
-import requests
-
 sys.path.append("../")
 from checkprcontent import checkpr
-from tools import gitutils
+from pullrequest import manifest
+from tools import github_client, gitutils
 
 pr_files = []
 pr_labels = []
@@ -39,45 +38,18 @@ def get_modified_files(api_url):
         list[str]: List of modified files
     """
     if not pr_files:
-        page_number = 1
-        max_page_size, page_size = 100, 100
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-        }
-        files_api_url = f"{api_url}/files"
-
-        while page_size == max_page_size:
-            files_api_query = f"{files_api_url}?per_page={page_size}&page={page_number}"
-            print(f"[INFO] Query files : {files_api_query}")
-            r = requests.get(files_api_query, headers=headers)
-            files = r.json()
-            page_size = len(files)
-            page_number += 1
-
-            if xRateLimit in r.headers:
-                print(f"[DEBUG] {xRateLimit} : {r.headers[xRateLimit]}")
-            if xRateRemain in r.headers:
-                print(f"[DEBUG] {xRateRemain}  : {r.headers[xRateRemain]}")
-
-            if "message" in files:
-                print(f'[ERROR] getting pr files: {files["message"]}')
-                sys.exit(1)
-            else:
-                for file in files:
-                    if "filename" in file:
-                        pr_files.append(file["filename"])
+        try:
+            pr_files.extend(manifest.get_filenames(api_url))
+        except manifest.ManifestError as err:
+            print(err)
+            sys.exit(1)
 
     return pr_files
 
 
 def get_labels(api_url):
     if not pr_labels:
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "Authorization": f'Bearer {os.environ.get("BOT_TOKEN")}',
-        }
-        r = requests.get(api_url, headers=headers)
+        r = github_client.get_client().get(api_url)
         pr_data = r.json()
 
         if xRateLimit in r.headers:
@@ -36,7 +36,7 @@ from release import release_info, releaser
 sys.path.append("../")
 from owners import checkuser
 from pullrequest import prartifact
-from tools import gitutils
+from tools import gitutils, versions
 
 VERSION_FILE = "release/release_info.json"
 CHARTS_PR_BASE_REPO = gitutils.CHARTS_REPO
@@ -104,7 +104,7 @@ def check_if_dev_release_branch(sender, pr_branch, pr_body, api_url, pr_head_rep
         return False
 
     version = pr_branch.removeprefix(releaser.DEV_PR_BRANCH_NAME_PREFIX)
-    if not semver.VersionInfo.is_valid(version):
+    if not versions.is_valid_semver(version):
         print(
             f"Release part ({version}) of branch name {pr_branch} is not a valid semantic version."
         )
@@ -139,7 +139,7 @@ def check_if_charts_release_branch(sender, pr_branch, pr_body, api_url, pr_head_
         return False
 
     version = pr_branch.removeprefix(releaser.CHARTS_PR_BRANCH_NAME_PREFIX)
-    if not semver.VersionInfo.is_valid(version):
+    if not versions.is_valid_semver(version):
         print(
             f"Release part ({version}) of branch name {pr_branch} is not a valid semantic version."
         )
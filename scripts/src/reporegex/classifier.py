@@ -0,0 +1,121 @@
+"""Classify the paths of the files of a chart submission in a single pass.
+
+Each path is matched once against a single regular expression, built from the
+matchers of reporegex.matchers, which captures the category, organization, chart
+name and version of the submission along with the kind of file:
+* report: charts/<category>/<organization>/<chart>/<version>/report.yaml, and its
+  signature report.yaml.asc
+* source: any file under charts/<category>/<organization>/<chart>/<version>/src/
+* tarball: charts/<category>/<organization>/<chart>/<version>/<name>.tgz, and its
+  provenance file <name>.tgz.prov
+* chart: any other file under charts/<category>/<organization>/<chart>/<version>/
+* owners: charts/<category>/<organization>/<chart>/OWNERS
+* unknown: any other file
+
+The rules are the same as the ones historically applied with separate regexes (see
+precheck.submission.get_file_type): paths are matched from their start, a report
+takes precedence over a source file, and a source file over a tarball.
+"""
+
+import functools
+import re
+import sys
+from typing import NamedTuple
+
+sys.path.append("../")
+from reporegex import matchers
+
+REPORT = "report"
+SOURCE = "source"
+TARBALL = "tarball"
+CHART = "chart"
+OWNERS = "owners"
+UNKNOWN = "unknown"
+
+
+class PathRecord(NamedTuple):
+    kind: str
+    category: str = None
+    organization: str = None
+    chart: str = None
+    version: str = None
+    # Path of the tarball relative to the version directory, for any file with .tgz
+    # in its path under the version directory
+    tarball: str = None
+
+    @property
+    def submission(self):
+        """(category, organization, chart, version) of the chart the file belongs to"""
+        return self.category, self.organization, self.chart, self.version
+
+
+UNKNOWN_RECORD = PathRecord(UNKNOWN)
+
+
+class PathClassifier:
+    def __init__(self, base_dir="charts", strict_categories=True):
+        category_matcher = (
+            matchers.strictCategoryMatcher
+            if strict_categories
+            else matchers.relaxedCategoryMatcher
+        )
+        self.pattern = re.compile(
+            rf"{re.escape(base_dir)}/(?P<category>{category_matcher})"
+            rf"/(?P<organization>{matchers.organizationMatcher})"
+            rf"/(?P<chart>{matchers.chartMatcher})"
+            r"(?:"
+            rf"/(?P<version>{matchers.versionMatcher})/"
+            r"(?:(?=(?P<tarball>.*\.tgz)))?"
+            r"(?:(?P<report>report.yaml)|(?P<source>src/))?"
+            r"|/(?P<owners>OWNERS)"
+            r")?"
+        )
+
+    def classify(self, file_path):
+        """Classify the path of a file
+
+        Args:
+            file_path (str): path of the file, relative to the root of the repository
+
+        Returns:
+            PathRecord: the kind of file and the submission it belongs to. The
+                        category, organization and chart are set for any path under
+                        a chart directory, the version for any path under a version
+                        directory.
+        """
+        match = self.pattern.match(file_path)
+        if not match:
+            return UNKNOWN_RECORD
+        category, organization, chart, version, tarball, report, source, owners = (
+            match.groups()
+        )
+        if version is not None:
+            if report is not None:
+                kind = REPORT
+            elif source is not None:
+                kind = SOURCE
+            elif tarball is not None:
+                kind = TARBALL
+            else:
+                kind = CHART
+        elif owners is not None:
+            kind = OWNERS
+        else:
+            kind = UNKNOWN
+        return PathRecord(kind, category, organization, chart, version, tarball)
+
+    def classify_all(self, file_paths):
+        """Classify the paths of files, see classify"""
+        return [self.classify(file_path) for file_path in file_paths]
+
+
+@functools.cache
+def get_classifier(strict_categories=True):
+    """Get the classifier of paths under charts/, compiled once"""
+    return PathClassifier(strict_categories=strict_categories)
+
+
+def classify(file_path, strict_categories=True):
+    """Classify the path of a file with the shared classifier, see
+    PathClassifier.classify"""
+    return get_classifier(strict_categories).classify(file_path)
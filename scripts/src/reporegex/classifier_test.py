@@ -0,0 +1,89 @@
+import re
+
+import pytest
+
+from reporegex import classifier, matchers
+
+paths = [
+    "charts/partners/acme/awesome/1.42.0/report.yaml",
+    "charts/partners/acme/awesome/1.42.0/report.yaml.asc",
+    "charts/partners/acme/awesome/1.42.0/awesome-1.42.0.tgz",
+    "charts/partners/acme/awesome/1.42.0/awesome-1.42.0.tgz.prov",
+    "charts/partners/acme/awesome/1.42.0/wrong-name.tgz",
+    "charts/partners/acme/awesome/1.42.0/src/Chart.yaml",
+    "charts/partners/acme/awesome/1.42.0/src/charts/dep-0.1.0.tgz",
+    "charts/partners/acme/awesome/1.42.0/README.md",
+    "charts/partners/acme/awesome/1.42.0/",
+    "charts/redhat/redhat/redhat-awesome/0.1.0+build.1/report.yaml",
+    "charts/community/acme/awesome/OWNERS",
+    "charts/community/acme/awesome/OWNERS.bak",
+    "charts/community/acme/awesome/OWNERS/1.0.0",
+    "charts/partners/acme/awesome/README.md",
+    "charts/partners/acme/awesome",
+    "charts/unknown/acme/awesome/1.42.0/report.yaml",
+    "charts/unknown/acme/awesome/OWNERS",
+    ".github/workflows/build.yml",
+    "scripts/src/charts/partners/acme/awesome/1.0.0/report.yaml",
+]
+
+
+def legacy_get_file_type(file_path):
+    """The classification of precheck.submission.get_file_type, before the classifier"""
+    base = matchers.submission_path_matcher()
+    pattern = re.compile(base + r"/.*")
+    reportpattern = re.compile(base + r"/report.yaml")
+    tarballpattern = re.compile(base + r"/(.*\.tgz)")
+    owners_pattern = re.compile(
+        matchers.submission_path_matcher(include_version_matcher=False) + r"/OWNERS"
+    )
+    src_pattern = re.compile(matchers.submission_path_matcher() + r"/src/")
+
+    if pattern.match(file_path):
+        for kind, kind_pattern in [
+            ("report", reportpattern),
+            ("source", src_pattern),
+            ("tarball", tarballpattern),
+        ]:
+            match = kind_pattern.match(file_path)
+            if match:
+                return kind, match.groups()
+        return "chart", pattern.match(file_path).groups()
+    match = owners_pattern.match(file_path)
+    if match:
+        return "owners", match.groups()
+    return "unknown", None
+
+
+@pytest.mark.parametrize("file_path", paths)
+def test_classify_matches_legacy_patterns(file_path):
+    record = classifier.classify(file_path)
+    kind, groups = legacy_get_file_type(file_path)
+
+    assert record.kind == kind
+    if kind == "owners":
+        assert (record.category, record.organization, record.chart) == groups
+    elif kind == "tarball":
+        assert record.submission + (record.tarball,) == groups
+    elif kind != "unknown":
+        assert record.submission == groups
+
+
+def test_classify_records():
+    assert classifier.classify(
+        "charts/partners/acme/awesome/1.42.0/src/charts/dep-0.1.0.tgz"
+    ) == classifier.PathRecord(
+        "source", "partners", "acme", "awesome", "1.42.0", "src/charts/dep-0.1.0.tgz"
+    )
+    # The chart is known for any path under the chart directory
+    assert classifier.classify(
+        "charts/partners/acme/awesome/README.md"
+    ) == classifier.PathRecord("unknown", "partners", "acme", "awesome")
+    assert classifier.classify("README.md") is classifier.UNKNOWN_RECORD
+
+
+def test_classify_relaxed_categories():
+    record = classifier.classify(
+        "charts/unknown/acme/awesome/1.42.0/report.yaml", strict_categories=False
+    )
+    assert record.kind == "report"
+    assert record.category == "unknown"
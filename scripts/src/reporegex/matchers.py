@@ -1,3 +1,10 @@
+relaxedCategoryMatcher = r"\w+"
+strictCategoryMatcher = "partners|redhat|community"
+organizationMatcher = r"[\w-]+"
+chartMatcher = r"[\w-]+"
+versionMatcher = r"[\w\.\-+]+"
+
+
 def submission_path_matcher(
     base_dir="charts", strict_categories=True, include_version_matcher=True
 ):
@@ -22,15 +29,9 @@ def submission_path_matcher(
         A regular expression-compatible string with the mentioned groupings.
     """
 
-    relaxedCategoryMatcher = "\w+"
-    strictCategoryMatcher = "partners|redhat|community"
-
     categoryMatcher = (
         strictCategoryMatcher if strict_categories else relaxedCategoryMatcher
     )
-    organizationMatcher = "[\w-]+"
-    chartMatcher = "[\w-]+"
-    versionMatcher = "[\w\.\-+]+"
 
     matcher = (
         rf"{base_dir}/({categoryMatcher})/({organizationMatcher})/({chartMatcher})"
@@ -1,18 +1,34 @@
+import copy
+import hashlib
 import json
 import os
 import subprocess
 import sys
+import threading
 
 import docker
 
+sys.path.append("../")
+from tools import messages
+
 REPORT_ANNOTATIONS = "annotations"
 REPORT_RESULTS = "results"
 REPORT_DIGESTS = "digests"
 REPORT_METADATA = "metadata"
+REPORT_ALL = "all"
 SHA_ERROR = "Digest in report did not match report content"
 
+_report_info_cache = {}
+_report_info_locks = {}
+_report_info_lock = threading.Lock()
+
 
 def write_error_log(*msg):
+    if messages.collect_messages(msg):
+        # Written with the messages of the other chartprreview checks
+        for line in msg:
+            print(line)
+        return
     directory = os.environ.get("WORKFLOW_WORKING_DIRECTORY")
     if directory:
         os.makedirs(directory, exist_ok=True)
@@ -25,88 +41,158 @@ def write_error_log(*msg):
         print(line)
 
 
-def _get_report_info(
-    report_path, report_info_path, info_type, profile_type, profile_version
-):
-    if report_info_path and len(report_info_path) > 0:
-        print(f"[INFO] Using existing report info: {report_info_path}")
-        report_out = json.load(open(report_info_path))
+def _run_report_command(report_path, info_type, profile_type, profile_version):
+    """Run chart-verifier to get report info, using docker if VERIFIER_IMAGE is set
+
+    Args:
+        report_path (str): Path to the report
+        info_type (str): Type of report info, or "all" to get all of them at once
+        profile_type (str): Profile vendor type to check the report against
+        profile_version (str): Profile version to check the report against
+
+    Returns:
+        dict: The parsed output of chart-verifier
+    """
+    command = "report"
+    set_values = ""
+    if profile_type:
+        set_values = "profile.vendortype=%s" % profile_type
+    if profile_version:
+        if set_values:
+            set_values = "%s,profile.version=%s" % (set_values, profile_version)
+        else:
+            set_values = "profile.version=%s" % profile_version
+
+    if os.environ.get("VERIFIER_IMAGE"):
+        print(f"[INFO] Generate report info using docker  : {report_path}")
+        docker_command = (
+            f"{command} {info_type} /charts/{os.path.basename(report_path)}"
+        )
+        if set_values:
+            docker_command = "%s --set %s" % (docker_command, set_values)
+
+        client = docker.from_env()
+        report_directory = os.path.dirname(os.path.abspath(report_path))
+        print(
+            f'Call docker using image: {os.environ.get("VERIFIER_IMAGE")}, docker command: {docker_command}, report directory: {report_directory}'
+        )
+        output = client.containers.run(
+            os.environ.get("VERIFIER_IMAGE"),
+            docker_command,
+            stdin_open=True,
+            tty=True,
+            stdout=True,
+            volumes={report_directory: {"bind": "/charts/", "mode": "rw"}},
+        )
     else:
-        command = "report"
-        set_values = ""
-        if profile_type:
-            set_values = "profile.vendortype=%s" % profile_type
-        if profile_version:
-            if set_values:
-                set_values = "%s,profile.version=%s" % (set_values, profile_version)
-            else:
-                set_values = "profile.version=%s" % profile_version
-
-        if os.environ.get("VERIFIER_IMAGE"):
-            print(f"[INFO] Generate report info using docker  : {report_path}")
-            docker_command = (
-                f"{command} {info_type} /charts/{os.path.basename(report_path)}"
-            )
-            if set_values:
-                docker_command = "%s --set %s" % (docker_command, set_values)
-
-            client = docker.from_env()
-            report_directory = os.path.dirname(os.path.abspath(report_path))
-            print(
-                f'Call docker using image: {os.environ.get("VERIFIER_IMAGE")}, docker command: {docker_command}, report directory: {report_directory}'
-            )
-            output = client.containers.run(
-                os.environ.get("VERIFIER_IMAGE"),
-                docker_command,
-                stdin_open=True,
-                tty=True,
-                stdout=True,
-                volumes={report_directory: {"bind": "/charts/", "mode": "rw"}},
+        print(
+            f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}"
+        )
+        if set_values:
+            out = subprocess.run(
+                [
+                    "chart-verifier",
+                    command,
+                    info_type,
+                    "--set",
+                    set_values,
+                    os.path.abspath(report_path),
+                ],
+                capture_output=True,
             )
         else:
-            print(
-                f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}"
+            out = subprocess.run(
+                [
+                    "chart-verifier",
+                    command,
+                    info_type,
+                    os.path.abspath(report_path),
+                ],
+                capture_output=True,
             )
-            if set_values:
-                out = subprocess.run(
-                    [
-                        "chart-verifier",
-                        command,
-                        info_type,
-                        "--set",
-                        set_values,
-                        os.path.abspath(report_path),
-                    ],
-                    capture_output=True,
-                )
-            else:
-                out = subprocess.run(
-                    [
-                        "chart-verifier",
-                        command,
-                        info_type,
-                        os.path.abspath(report_path),
-                    ],
-                    capture_output=True,
+        output = out.stdout.decode("utf-8")
+
+    if SHA_ERROR in output:
+        msg = f"[ERROR] {SHA_ERROR}"
+        write_error_log(msg)
+        sys.exit(1)
+
+    try:
+        return json.loads(output)
+    except BaseException as err:
+        msgs = []
+        msgs.append(f"[ERROR] loading report output: /n{output}")
+        msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
+        write_error_log(*msgs)
+        sys.exit(1)
+
+
+def _get_lock(key):
+    with _report_info_lock:
+        return _report_info_locks.setdefault(key, threading.Lock())
+
+
+def _get_report_digest(report_path):
+    with open(report_path, "rb") as fd:
+        return hashlib.sha256(fd.read()).hexdigest()
+
+
+def _load_report_info(
+    report_path, report_info_path, info_type, profile_type, profile_version
+):
+    """Get the report info holding info_type, running chart-verifier at most once.
+
+    All the info types are requested at once (chart-verifier report all), and the
+    output is kept for the life of the process, keyed by the path and content of
+    the report and by the profile. Only the results depend on the profile: the
+    other info types are taken from the output for any profile.
+
+    Returns:
+        dict: The report info, shared between callers and must not be modified.
+    """
+    if report_info_path and len(report_info_path) > 0:
+        key = ("report-info", os.path.abspath(report_info_path))
+        with _get_lock(key):
+            if key not in _report_info_cache:
+                print(f"[INFO] Using existing report info: {report_info_path}")
+                with open(report_info_path) as fd:
+                    _report_info_cache[key] = json.load(fd)
+            return _report_info_cache[key]
+
+    content_key = (os.path.abspath(report_path), _get_report_digest(report_path))
+    key = content_key + (profile_type or "", profile_version or "")
+    # Concurrent callers on the same report wait for a single verifier run
+    with _get_lock(content_key):
+        report_out = _report_info_cache.get(key)
+        if report_out is None and info_type != REPORT_RESULTS:
+            for cached_key, cached_out in list(_report_info_cache.items()):
+                if cached_key[:2] == content_key and info_type in cached_out:
+                    return cached_out
+
+        if report_out is None:
+            report_out = _run_report_command(
+                report_path, REPORT_ALL, profile_type, profile_version
+            )
+            _report_info_cache[key] = report_out
+        if info_type not in report_out:
+            # Older verifiers may not return every info type with "all"
+            report_out.update(
+                _run_report_command(
+                    report_path, info_type, profile_type, profile_version
                 )
-            output = out.stdout.decode("utf-8")
-
-        if SHA_ERROR in output:
-            msg = f"[ERROR] {SHA_ERROR}"
-            write_error_log(msg)
-            sys.exit(1)
-
-        try:
-            report_out = json.loads(output)
-        except BaseException as err:
-            msgs = []
-            msgs.append(f"[ERROR] loading report output: /n{output}")
-            msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
-            write_error_log(*msgs)
-            sys.exit(1)
+            )
+        return report_out
+
+
+def _get_report_info(
+    report_path, report_info_path, info_type, profile_type, profile_version
+):
+    report_out = _load_report_info(
+        report_path, report_info_path, info_type, profile_type, profile_version
+    )
 
     if info_type not in report_out:
-        msg = f"Error extracting {info_type} from the report:", report_out.strip()
+        msg = f"Error extracting {info_type} from the report: {report_out}"
         write_error_log(msg)
         sys.exit(1)
 
@@ -117,7 +203,15 @@ def _get_report_info(
 
         return annotations
 
-    return report_out[info_type]
+    # Callers may modify what they get
+    return copy.deepcopy(report_out[info_type])
+
+
+def clear_report_info_cache():
+    """Forget about the report info retrieved so far in this process"""
+    with _report_info_lock:
+        _report_info_cache.clear()
+        _report_info_locks.clear()
 
 
 def get_report_annotations(report_path=None, report_info_path=None):
@@ -0,0 +1,99 @@
+import json
+import subprocess
+
+import pytest
+
+from report import report_info
+
+report_output = {
+    "annotations": [
+        {"name": "charts.openshift.io/digest", "value": "sha256:abc"},
+    ],
+    "results": {"passed": "10", "failed": "0", "message": []},
+    "digests": {"chart": "sha256:abc", "package": "def"},
+    "metadata": {"chart-uri": "awesome-1.0.0.tgz", "chart": {"name": "awesome"}},
+}
+
+
+@pytest.fixture
+def verifier_calls(monkeypatch):
+    calls = []
+    omitted_from_all = []
+
+    def run(args, capture_output):
+        calls.append(args[2:-1])
+        output = report_output
+        if args[2] != "all":
+            output = {args[2]: report_output[args[2]]}
+        else:
+            output = {
+                k: v for k, v in report_output.items() if k not in omitted_from_all
+            }
+        return subprocess.CompletedProcess(args, 0, json.dumps(output).encode(), b"")
+
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+    monkeypatch.setattr(subprocess, "run", run)
+    report_info.clear_report_info_cache()
+    yield calls, omitted_from_all
+    report_info.clear_report_info_cache()
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "report.yaml"
+    path.write_text("apiversion: v1\n")
+    return str(path)
+
+
+def test_verifier_runs_once_per_report_and_profile(verifier_calls, report_path):
+    calls, _ = verifier_calls
+
+    results = report_info.get_report_results(report_path, "partner", "v1.3")
+    assert results["passed"] == 10
+    assert report_info.get_report_annotations(report_path) == {
+        "charts.openshift.io/digest": "sha256:abc"
+    }
+    assert report_info.get_report_digests(report_path)["package"] == "def"
+    assert report_info.get_report_chart_url(report_path) == "awesome-1.0.0.tgz"
+    assert calls == [
+        ["all", "--set", "profile.vendortype=partner,profile.version=v1.3"]
+    ]
+
+    # Results depend on the profile
+    report_info.get_report_results(report_path, "community", "v1.3")
+    assert len(calls) == 2
+
+    # Callers get their own copy
+    assert report_info.get_report_results(report_path, "partner", "v1.3") == results
+    assert report_output["results"]["passed"] == "10"
+    assert len(calls) == 2
+
+
+def test_verifier_runs_again_when_report_changes(verifier_calls, report_path):
+    calls, _ = verifier_calls
+
+    report_info.get_report_metadata(report_path)
+    with open(report_path, "a") as fd:
+        fd.write("kind: verify-report\n")
+    report_info.get_report_metadata(report_path)
+    assert calls == [["all"], ["all"]]
+
+
+def test_fallback_to_info_type(verifier_calls, report_path):
+    calls, omitted_from_all = verifier_calls
+    omitted_from_all.append("digests")
+
+    assert report_info.get_report_digests(report_path)["chart"] == "sha256:abc"
+    assert report_info.get_report_digests(report_path)["chart"] == "sha256:abc"
+    assert calls == [["all"], ["digests"]]
+
+
+def test_existing_report_info(verifier_calls, tmp_path):
+    calls, _ = verifier_calls
+    report_info_path = tmp_path / "report_info.json"
+    report_info_path.write_text(json.dumps(report_output))
+
+    assert report_info.get_report_chart(report_info_path=str(report_info_path)) == {
+        "name": "awesome"
+    }
+    assert calls == []
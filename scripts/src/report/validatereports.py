@@ -0,0 +1,200 @@
+"""Validate all the report.yaml files of the repository at once.
+
+Used to audit the historical submissions: every charts/*/*/*/*/report.yaml is
+validated with report.verifier_report.validate, in parallel on a bounded pool of
+worker processes, each running chart-verifier for its reports.
+
+parameters:
+    --directory : root of the repository, the current directory by default
+    --ocp-version-range : range of OCP versions the charts must support. If not
+        set, the supportedOpenShiftVersions annotation of each report is used.
+    --workers : number of worker processes, the number of CPUs by default
+    --output : where to write the JSON summary, stdout by default
+
+results:
+    A JSON summary with the outcome and the validation time of each report.
+    exit code 1 if any report is invalid or could not be validated.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from glob import glob
+
+sys.path.append("../")
+from report import report_info, verifier_report
+
+REPORT_GLOB = os.path.join("charts", "*", "*", "*", "*", "report.yaml")
+
+
+def find_reports(directory="."):
+    """Find the report.yaml of every chart version of a repository"""
+    return sorted(glob(os.path.join(directory, REPORT_GLOB)))
+
+
+def get_report_ocp_version_range(report_path):
+    """Get the supported OpenShift versions annotated in a report, None if missing"""
+    annotations = report_info.get_report_annotations(report_path)
+    return annotations.get(verifier_report.SUPPORTED_VERSIONS_ANNOTATION)
+
+
+def validate_report(report_path, ocp_version_range=None):
+    """Validate a report, in a worker process
+
+    Args:
+        report_path (str): Path to the report.yaml file
+        ocp_version_range (str): Range of supported OCP versions, see
+                                 get_report_ocp_version_range if None
+
+    Returns:
+        dict: the outcome of the validation, see main
+    """
+    result = {"path": report_path, "valid": False, "message": ""}
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        # Keep the logs of the validation for the reports that fail
+        with contextlib.redirect_stdout(output):
+            if ocp_version_range is None:
+                is_valid_yaml, report_data = verifier_report.get_report_data(
+                    report_path
+                )
+                # The range is only checked for the reports of passing charts
+                if (
+                    is_valid_yaml
+                    and verifier_report.report_is_valid(report_data)
+                    and verifier_report.get_chart_testing_result(report_data)[0]
+                ):
+                    ocp_version_range = get_report_ocp_version_range(report_path)
+            result["ocp_version_range"] = ocp_version_range
+            result["valid"], result["message"] = verifier_report.validate(
+                report_path, ocp_version_range
+            )
+    except (Exception, SystemExit) as err:
+        # chart-verifier errors exit, see report_info
+        result["error"] = f"{type(err).__name__}: {err}"
+    finally:
+        # The report info of a report is not needed once validated
+        report_info.clear_report_info_cache()
+        verifier_report.clear_reports()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    if not result["valid"]:
+        result["log"] = output.getvalue()
+    return result
+
+
+def _validate_task(task):
+    return validate_report(*task)
+
+
+def validate_reports(report_paths, ocp_version_range=None, workers=None):
+    """Validate reports on a pool of worker processes
+
+    Args:
+        report_paths (list[str]): Paths to the report.yaml files
+        ocp_version_range (str): see validate_report
+        workers (int): number of worker processes, the number of CPUs by default.
+                       Set to 1 to validate in the current process.
+
+    Returns:
+        list[dict]: the outcome of each report, in the order of report_paths
+    """
+    tasks = [(report_path, ocp_version_range) for report_path in report_paths]
+    if workers == 1:
+        return [_validate_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Each validation runs chart-verifier, there is no point in batching them
+        return list(executor.map(_validate_task, tasks, chunksize=1))
+
+
+def make_summary(results, ocp_version_range, workers, elapsed):
+    return {
+        "generated": datetime.now(timezone.utc).astimezone().isoformat(),
+        "ocp_version_range": ocp_version_range,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "total": len(results),
+        "valid": sum(1 for result in results if result["valid"]),
+        "invalid": sum(
+            1 for result in results if not result["valid"] and "error" not in result
+        ),
+        "errors": sum(1 for result in results if "error" in result),
+        "reports": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-d",
+        "--directory",
+        dest="directory",
+        type=str,
+        default=".",
+        help="root of the repository",
+    )
+    parser.add_argument(
+        "-r",
+        "--ocp-version-range",
+        dest="ocp_version_range",
+        type=str,
+        required=False,
+        help="range of supported OCP versions, from the reports if not set",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        type=str,
+        required=False,
+        help="where to write the JSON summary, stdout if not set",
+    )
+    args = parser.parse_args()
+
+    report_paths = find_reports(args.directory)
+    print(
+        f"[INFO] validating {len(report_paths)} reports with {args.workers} workers",
+        file=sys.stderr,
+    )
+    start = time.perf_counter()
+    results = validate_reports(report_paths, args.ocp_version_range, args.workers)
+    summary = make_summary(
+        results, args.ocp_version_range, args.workers, time.perf_counter() - start
+    )
+
+    if args.output:
+        with open(args.output, "w") as fd:
+            json.dump(summary, fd, indent=2)
+    else:
+        print(json.dumps(summary, indent=2))
+
+    for result in results:
+        if not result["valid"]:
+            print(
+                f"[ERROR] {result['path']}: {result.get('error') or result['message']}",
+                file=sys.stderr,
+            )
+    print(
+        f"[INFO] {summary['valid']} valid, {summary['invalid']} invalid, {summary['errors']} errors in {summary['seconds']}s",
+        file=sys.stderr,
+    )
+    if summary["valid"] != summary["total"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
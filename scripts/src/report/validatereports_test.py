@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+
+from report import report_info, validatereports
+
+report_template = """\
+apiversion: v1
+kind: verify-report
+metadata:
+    tool:
+        profile:
+            VendorType: partner
+            version: v1.1
+    chart:
+        name: {chart}
+        version: 1.0.0
+results:
+  - check: v1.1/chart-testing
+    type: Mandatory
+    outcome: {outcome}
+    reason: Chart tests have passed
+"""
+
+
+def write_report(directory, chart, content):
+    path = os.path.join(directory, "charts", "partners", "acme", chart, "1.0.0")
+    os.makedirs(path)
+    with open(os.path.join(path, "report.yaml"), "w") as fd:
+        fd.write(content)
+    return os.path.join(path, "report.yaml")
+
+
+@pytest.fixture
+def verifier_calls(monkeypatch):
+    calls = []
+
+    def run_report_command(report_path, info_type, profile_type, profile_version):
+        calls.append(report_path)
+        return {
+            "annotations": [
+                {
+                    "name": "charts.openshift.io/testedOpenShiftVersion",
+                    "value": "4.12",
+                },
+                {
+                    "name": "charts.openshift.io/supportedOpenShiftVersions",
+                    "value": ">=4.10",
+                },
+            ],
+            "metadata": {"chart": {"kubeVersion": ">=1.23.0"}},
+        }
+
+    monkeypatch.setattr(report_info, "_run_report_command", run_report_command)
+    return calls
+
+
+@pytest.fixture
+def reports(tmp_path):
+    return [
+        write_report(tmp_path, "invalid-yaml", "kind: [verify-report"),
+        write_report(tmp_path, "incomplete", "kind: verify-report\n"),
+        write_report(
+            tmp_path, "failed", report_template.format(chart="failed", outcome="FAIL")
+        ),
+        write_report(
+            tmp_path, "passed", report_template.format(chart="passed", outcome="PASS")
+        ),
+    ]
+
+
+def test_validate_reports(tmp_path, reports, verifier_calls):
+    assert validatereports.find_reports(tmp_path) == sorted(reports)
+
+    results = validatereports.validate_reports(reports, workers=1)
+    assert [result["valid"] for result in results] == [False, False, True, True]
+    assert results[0]["message"].startswith("Report is not valid yaml")
+    assert results[1]["message"].startswith("Report is incomplete")
+    # The range is taken from the report
+    assert results[3]["ocp_version_range"] == ">=4.10"
+    # chart-verifier only runs for the passing chart, once
+    assert verifier_calls == [reports[3]]
+    assert all(result["seconds"] >= 0 for result in results)
+    assert "log" in results[0] and "log" not in results[3]
+
+
+def test_validate_reports_with_range(reports, verifier_calls):
+    (result,) = validatereports.validate_reports(reports[3:], ">=4.13", workers=1)
+    assert not result["valid"]
+    assert result["message"] == (
+        "Tested OpenShift version 4.12.0 not within specified kube-versions : >=4.13"
+    )
+
+
+def test_validate_reports_verifier_error(reports, monkeypatch):
+    def run_report_command(*args):
+        raise SystemExit(1)
+
+    monkeypatch.setattr(report_info, "_run_report_command", run_report_command)
+    (result,) = validatereports.validate_reports(reports[3:], workers=1)
+    assert not result["valid"]
+    assert result["error"] == "SystemExit: 1"
+
+
+def test_main_summary(tmp_path, reports, verifier_calls, monkeypatch):
+    summary_path = tmp_path / "summary.json"
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "validate-reports",
+            "--directory",
+            str(tmp_path),
+            "--workers",
+            "1",
+            "--output",
+            str(summary_path),
+        ],
+    )
+    with pytest.raises(SystemExit):
+        validatereports.main()
+
+    summary = json.loads(summary_path.read_text())
+    assert (summary["total"], summary["valid"], summary["invalid"]) == (4, 2, 2)
+    assert summary["errors"] == 0
+    assert [report["path"] for report in summary["reports"]] == sorted(reports)
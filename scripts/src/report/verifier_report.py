@@ -23,7 +23,10 @@ A tampered report is only determined if the chart-testing check has passed:
 These are not comprehensive lists - other certification checks will preform further checks
 """
 
+import os
 import sys
+import threading
+from collections.abc import Mapping
 
 import semantic_version
 import yaml
@@ -35,6 +38,7 @@ except ImportError:
 
 sys.path.append("../")
 from report import report_info
+from tools import versions
 
 MIN_SUPPORTED_OPENSHIFT_VERSION = semantic_version.SimpleSpec(">=4.1.0")
 TESTED_VERSION_ANNOTATION = "charts.openshift.io/testedOpenShiftVersion"
@@ -47,6 +51,132 @@ class ConfigKeyMissing(Exception):
     pass
 
 
+class VerifierReport(Mapping):
+    """The content of a report.yaml file, parsed once
+
+    A VerifierReport is a read-only mapping of the top-level keys of the report, so
+    it can be used wherever the dict loaded from report.yaml is expected. The most
+    used sections are also exposed as attributes:
+    * metadata: the metadata section
+    * tool: metadata.tool, the verifier settings, digests and OCP versions
+    * chart: metadata.chart, the Chart.yaml of the chart
+    * annotations: metadata.chart.annotations
+    * results: the results section, the list of checks
+
+    The results are indexed by check name on the first lookup, see get_result.
+
+    Reports are shared between callers (see load_report) and must not be modified.
+    """
+
+    __slots__ = (
+        "path",
+        "_data",
+        "metadata",
+        "tool",
+        "chart",
+        "annotations",
+        "results",
+        "_results_by_check",
+    )
+
+    def __init__(self, path, data):
+        self.path = path
+        self._data = data if isinstance(data, dict) else {}
+        self.metadata = self._get_section(self._data, "metadata")
+        self.tool = self._get_section(self.metadata, "tool")
+        self.chart = self._get_section(self.metadata, "chart")
+        self.annotations = self._get_section(self.chart, "annotations")
+        results = self._data.get("results")
+        self.results = results if isinstance(results, list) else []
+        self._results_by_check = None
+
+    @staticmethod
+    def _get_section(data, key):
+        section = data.get(key) if isinstance(data, dict) else None
+        return section if isinstance(section, dict) else {}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"VerifierReport({self.path!r})"
+
+    def _index_results(self):
+        results_by_check = {}
+        for result in self.results:
+            # e.g. v1.1/chart-testing, indexed as chart-testing
+            name = result["check"].rsplit("/", 1)[-1]
+            results_by_check.setdefault(name, result)
+        return results_by_check
+
+    def get_check(self, check_name):
+        """Get the result of a check
+
+        Args:
+            check_name (str): Name of the check, with or without its profile version
+                              (e.g. /chart-testing or v1.1/chart-testing)
+
+        Returns:
+            dict: The result of the first check of that name, None if not found.
+        """
+        if self._results_by_check is None:
+            self._results_by_check = self._index_results()
+        name = check_name.rsplit("/", 1)[-1]
+        result = self._results_by_check.get(name)
+        if result is not None and not result["check"].endswith(check_name):
+            # A profile version was given and the indexed check is of another one
+            result = next(
+                (r for r in self.results if r["check"].endswith(check_name)), None
+            )
+        return result
+
+
+_reports = {}
+_reports_lock = threading.Lock()
+
+
+def load_report(report_path):
+    """Load report.yaml, at most once per content of the file
+
+    Reports are memoized by path, and loaded again if the modification time or the
+    size of the file changed.
+
+    Args:
+        report_path (str): Path to the report.yaml file.
+
+    Returns:
+        VerifierReport: the content of the report, shared between callers
+
+    Raises:
+        OSError: if the file cannot be read
+        yaml.YAMLError: if the file is not valid YAML
+    """
+    key = os.path.abspath(report_path)
+    stat = os.stat(report_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _reports_lock:
+        cached = _reports.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    with open(report_path) as fd:
+        report = VerifierReport(report_path, yaml.load(fd, Loader=SafeLoader))
+    with _reports_lock:
+        _reports[key] = (stamp, report)
+    return report
+
+
+def clear_reports():
+    """Forget about the reports loaded so far in this process"""
+    with _reports_lock:
+        _reports.clear()
+
+
 def get_report_data(report_path):
     """Load and returns the report data contained in report.yaml
 
@@ -54,13 +184,12 @@ def get_report_data(report_path):
         report_path (str): Path to the report.yaml file.
 
     Returns:
-        (bool, dict): A boolean indicating if the loading was successfull and the
-                      content of the report.yaml file.
+        (bool, VerifierReport): A boolean indicating if the loading was successfull
+                                and the content of the report.yaml file, see
+                                load_report.
     """
     try:
-        with open(report_path) as report_data:
-            report_content = yaml.load(report_data, Loader=SafeLoader)
-        return True, report_content
+        return True, load_report(report_path)
     except Exception as err:
         print(f"Exception 2 loading file: {err}")
         return False, ""
@@ -77,6 +206,12 @@ def get_result(report_data, check_name):
         (bool, str): a boolean to True if the test passed, false otherwise
                      and the corresponding "reason" field.
     """
+    if isinstance(report_data, VerifierReport):
+        result = report_data.get_check(check_name)
+        if result is None:
+            return False, "Not Found"
+        return result["outcome"] == "PASS", result["reason"]
+
     outcome = False
     reason = "Not Found"
     for result in report_data["results"]:
@@ -244,7 +379,7 @@ def validate(report_path, ocp_version_range):
         profile_version_string = get_profile_version(report_data)
 
         try:
-            profile_version = semantic_version.Version.coerce(profile_version_string)
+            profile_version = versions.coerce_version(profile_version_string)
             v1_0_profile = False
             if profile_version.major == 1 and profile_version.minor == 0:
                 v1_0_profile = True
@@ -266,7 +401,7 @@ def validate(report_path, ocp_version_range):
             return False, f"No annotation provided for {tested_version_annotation}"
 
         try:
-            tested_version = semantic_version.Version.coerce(tested_version_string)
+            tested_version = versions.coerce_version(tested_version_string)
             if tested_version not in MIN_SUPPORTED_OPENSHIFT_VERSION:
                 return (
                     False,
@@ -282,7 +417,7 @@ def validate(report_path, ocp_version_range):
         if has_kubeversion_outcome:
             if not v1_0_profile:
                 chart = report_info.get_report_chart(report_path)
-                kube_supported_versions = semantic_version.NpmSpec(ocp_version_range)
+                kube_supported_versions = versions.npm_spec(ocp_version_range)
 
                 if tested_version not in kube_supported_versions:
                     return (
@@ -295,7 +430,7 @@ def validate(report_path, ocp_version_range):
                         SUPPORTED_VERSIONS_ANNOTATION
                     ]
                     try:
-                        supported_versions = semantic_version.NpmSpec(
+                        supported_versions = versions.npm_spec(
                             supported_versions_string
                         )
                     except ValueError:
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from report import verifier_report
+
+report_content = """\
+apiversion: v1
+kind: verify-report
+metadata:
+    tool:
+        profile:
+            VendorType: partner
+            version: v1.1
+        digests:
+            package: abcdef
+        webCatalogOnly: true
+    chart:
+        name: awesome
+        version: 1.42.0
+        annotations:
+            charts.openshift.io/name: Awesome
+results:
+  - check: v1.1/has-kubeversion
+    type: Mandatory
+    outcome: PASS
+    reason: Kubernetes version specified
+  - check: v1.1/chart-testing
+    type: Mandatory
+    outcome: FAIL
+    reason: Chart tests have failed
+"""
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    verifier_report.clear_reports()
+    path = tmp_path / "report.yaml"
+    path.write_text(report_content)
+    yield str(path)
+    verifier_report.clear_reports()
+
+
+def test_load_report(report_path):
+    report = verifier_report.load_report(report_path)
+
+    assert report.chart["name"] == "awesome"
+    assert report.annotations == {"charts.openshift.io/name": "Awesome"}
+    assert report.tool["digests"]["package"] == "abcdef"
+    assert len(report.results) == 2
+    with pytest.raises(AttributeError):
+        report.extra = True
+
+    # The report can be used as the dict loaded from report.yaml
+    assert report["kind"] == "verify-report"
+    assert "results" in report and "missing" not in report
+    assert verifier_report.report_is_valid(report)
+    assert verifier_report.get_web_catalog_only(report)
+    assert verifier_report.get_package_digest(report) == "abcdef"
+    assert verifier_report.get_profile_version(report) == "1.1"
+
+
+def test_load_report_is_memoized(report_path):
+    report = verifier_report.load_report(report_path)
+    assert verifier_report.get_report_data(report_path) == (True, report)
+    assert verifier_report.get_report_data(report_path)[1] is report
+
+    with open(report_path, "a") as fd:
+        fd.write("  - check: v1.1/signature-is-valid\n")
+        fd.write("    outcome: PASS\n")
+        fd.write("    reason: Chart is signed\n")
+    os.utime(report_path, ns=(0, 0))
+    reloaded = verifier_report.load_report(report_path)
+    assert reloaded is not report
+    assert verifier_report.get_signature_is_valid_result(reloaded) == (
+        True,
+        "Chart is signed",
+    )
+
+
+@pytest.mark.parametrize(
+    "check_name",
+    [
+        "/chart-testing",
+        "/has-kubeversion",
+        "v1.1/chart-testing",
+        "v1.0/chart-testing",
+        "/missing",
+    ],
+)
+def test_get_result_matches_dict_lookup(report_path, check_name):
+    report = verifier_report.load_report(report_path)
+    assert verifier_report.get_result(report, check_name) == verifier_report.get_result(
+        dict(report), check_name
+    )
+
+
+def test_get_report_data_invalid(tmp_path):
+    path = tmp_path / "report.yaml"
+    path.write_text("kind: [verify-report")
+    assert verifier_report.get_report_data(str(path)) == (False, "")
+    assert verifier_report.get_report_data(str(tmp_path / "missing.yaml")) == (
+        False,
+        "",
+    )
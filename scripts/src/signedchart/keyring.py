@@ -0,0 +1,194 @@
+"""Verification of PGP signatures against the public keys of OWNERS files.
+
+The keys are imported in a keyring of its own, in a temporary GNUPGHOME, so that the
+keyring of the user running the checks is neither used nor modified. Each key is
+imported once per run: keys are identified by the digest of the publicPgpKey value of
+the OWNERS file, and the fingerprints obtained when importing it are kept.
+
+A signature is only valid if it was made with the key of the OWNERS file it is
+checked against, not with any other key of the keyring.
+"""
+
+import atexit
+import base64
+import binascii
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+
+
+class KeyImportError(Exception):
+    pass
+
+
+@dataclass
+class SignatureResult:
+    signature_path: str
+    data_path: str
+    valid: bool
+    fingerprint: str
+    message: str
+
+
+def key_digest(owners_key):
+    """Get the digest of a PGP key from an OWNERS file
+
+    The digest is the same as the one computed by "echo <key> | sha256sum", which is
+    how the chart-verifier computes the key digest it puts in the report.
+
+    Args:
+        owners_key (str): The publicPgpKey value of the OWNERS file
+
+    Returns:
+        str: the hex SHA256 digest
+    """
+    return hashlib.sha256((" ".join(owners_key.split()) + "\n").encode()).hexdigest()
+
+
+def decode_owners_key(owners_key):
+    """Get the key of an OWNERS file as it can be imported by gpg
+
+    The key is expected to be base64 encoded, but ASCII armored keys are accepted
+    as well.
+    """
+    if owners_key.lstrip().startswith("-----BEGIN PGP"):
+        return owners_key.encode()
+    try:
+        return base64.b64decode(owners_key)
+    except binascii.Error:
+        return owners_key.encode()
+
+
+class Keyring:
+    def __init__(self, gnupghome=None):
+        self._own_home = gnupghome is None
+        self.gnupghome = gnupghome or tempfile.mkdtemp(prefix="gnupg-")
+        os.chmod(self.gnupghome, 0o700)
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Remove the keyring, if it was created by this instance"""
+        if self._own_home and os.path.exists(self.gnupghome):
+            shutil.rmtree(self.gnupghome, ignore_errors=True)
+
+    def _gpg(self, *args, input=None):
+        return subprocess.run(
+            [
+                "gpg",
+                "--batch",
+                "--no-tty",
+                "--homedir",
+                self.gnupghome,
+                "--status-fd",
+                "1",
+                *args,
+            ],
+            input=input,
+            capture_output=True,
+        )
+
+    @staticmethod
+    def _status(out, keyword):
+        """Get the arguments of the status lines with the given keyword"""
+        lines = []
+        for line in out.stdout.decode("utf-8", errors="replace").splitlines():
+            fields = line.split()
+            if len(fields) > 1 and fields[0] == "[GNUPG:]" and fields[1] == keyword:
+                lines.append(fields[2:])
+        return lines
+
+    def import_key(self, owners_key):
+        """Import the key of an OWNERS file, unless it was already imported
+
+        Args:
+            owners_key (str): The publicPgpKey value of the OWNERS file
+
+        Returns:
+            frozenset[str]: the fingerprints of the imported keys
+
+        Raises:
+            KeyImportError: if gpg could not import any key
+        """
+        digest = key_digest(owners_key)
+        with self._lock:
+            if digest not in self._fingerprints:
+                out = self._gpg("--import", input=decode_owners_key(owners_key))
+                fingerprints = frozenset(
+                    fields[1]
+                    for fields in self._status(out, "IMPORT_OK")
+                    if len(fields) > 1
+                )
+                if not fingerprints:
+                    raise KeyImportError(
+                        f"could not import PGP key {digest}: {out.stderr.decode('utf-8', errors='replace').strip()}"
+                    )
+                print(f"[INFO] imported PGP key {digest}: {', '.join(fingerprints)}")
+                self._fingerprints[digest] = fingerprints
+            return self._fingerprints[digest]
+
+    def verify(self, signature_path, data_path, owners_key):
+        """Verify a detached signature with the key of an OWNERS file
+
+        Args:
+            signature_path (str): Path to the signature, e.g. report.yaml.asc
+            data_path (str): Path to the signed file, e.g. report.yaml
+            owners_key (str): The publicPgpKey value of the OWNERS file
+
+        Returns:
+            SignatureResult: the result of the verification
+        """
+        try:
+            fingerprints = self.import_key(owners_key)
+        except KeyImportError as err:
+            return SignatureResult(signature_path, data_path, False, "", str(err))
+
+        out = self._gpg("--verify", signature_path, data_path)
+        message = out.stderr.decode("utf-8", errors="replace").strip()
+        for fields in self._status(out, "VALIDSIG"):
+            # VALIDSIG <fingerprint> ... <primary key fingerprint>
+            if fields[0] in fingerprints or fields[-1] in fingerprints:
+                return SignatureResult(
+                    signature_path, data_path, True, fields[-1], message
+                )
+        return SignatureResult(signature_path, data_path, False, "", message)
+
+    def verify_many(self, signatures):
+        """Verify detached signatures, importing each key once
+
+        Args:
+            signatures (iterable[(str, str, str)]): The path to the signature, the
+                path to the signed file and the publicPgpKey value of the OWNERS file
+                of each signature to verify
+
+        Returns:
+            list[SignatureResult]: the results, in the order of the signatures
+        """
+        return [
+            self.verify(signature_path, data_path, owners_key)
+            for signature_path, data_path, owners_key in signatures
+        ]
+
+
+_default_keyring = None
+_default_keyring_lock = threading.Lock()
+
+
+def get_keyring():
+    """Get the keyring shared by all the checks of this run, removed at exit"""
+    global _default_keyring
+    with _default_keyring_lock:
+        if _default_keyring is None:
+            _default_keyring = Keyring()
+            atexit.register(_default_keyring.close)
+        return _default_keyring
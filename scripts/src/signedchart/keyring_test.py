@@ -0,0 +1,90 @@
+import base64
+import shutil
+import subprocess
+
+import pytest
+
+from signedchart import keyring
+
+pytestmark = pytest.mark.skipif(shutil.which("gpg") is None, reason="gpg not found")
+
+
+def gpg(home, *args):
+    return subprocess.run(
+        ["gpg", "--batch", "--no-tty", "--homedir", str(home), *args],
+        capture_output=True,
+        check=True,
+    )
+
+
+@pytest.fixture(scope="module")
+def signer(tmp_path_factory):
+    """Generate two keys, return the OWNERS key of each and a function signing files"""
+    home = tmp_path_factory.mktemp("signer-gnupg")
+    home.chmod(0o700)
+    owners_keys = {}
+    for uid in ("signer@example.com", "other@example.com"):
+        gpg(home, "--passphrase", "", "--quick-gen-key", uid, "ed25519", "sign")
+        armored = gpg(home, "--armor", "--export", uid).stdout
+        owners_keys[uid] = base64.b64encode(armored).decode()
+
+    def sign(path, uid="signer@example.com"):
+        gpg(home, "--local-user", uid, "--armor", "--detach-sign", str(path))
+        return f"{path}.asc"
+
+    return owners_keys, sign
+
+
+def test_key_digest():
+    owners_key = "LS0tLS1CRUdJTi  BQR1AgUFVCTElD "
+    expected = subprocess.getoutput(f"echo {owners_key} | sha256sum").split(" ")[0]
+    assert keyring.key_digest(owners_key) == expected
+
+
+def test_verify_many(tmp_path, signer, monkeypatch):
+    owners_keys, sign = signer
+    good = tmp_path / "good.yaml"
+    good.write_text("chart: good\n")
+    tampered = tmp_path / "tampered.yaml"
+    tampered.write_text("chart: tampered\n")
+    other = tmp_path / "other.yaml"
+    other.write_text("chart: other\n")
+    good_sig = sign(good)
+    tampered_sig = sign(tampered)
+    tampered.write_text("chart: modified\n")
+    other_sig = sign(other, uid="other@example.com")
+
+    with keyring.Keyring() as kr:
+        imports = []
+        gpg_run = kr._gpg
+
+        def counting_gpg(*args, **kwargs):
+            if args[0] == "--import":
+                imports.append(args)
+            return gpg_run(*args, **kwargs)
+
+        monkeypatch.setattr(kr, "_gpg", counting_gpg)
+
+        signer_key = owners_keys["signer@example.com"]
+        results = kr.verify_many(
+            [
+                (good_sig, str(good), signer_key),
+                (tampered_sig, str(tampered), signer_key),
+                # signed with a key of the keyring, but not the one of the OWNERS file
+                (other_sig, str(other), signer_key),
+                (other_sig, str(other), owners_keys["other@example.com"]),
+            ]
+        )
+
+    assert [result.valid for result in results] == [True, False, False, True]
+    assert results[0].fingerprint
+    assert len(imports) == 2
+
+
+def test_verify_invalid_key(tmp_path):
+    data = tmp_path / "report.yaml"
+    data.write_text("chart: test\n")
+    with keyring.Keyring() as kr:
+        result = kr.verify(f"{data}.asc", str(data), "bm90IGEga2V5Cg==")
+    assert not result.valid
+    assert "could not import PGP key" in result.message
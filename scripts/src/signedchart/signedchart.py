@@ -2,7 +2,6 @@ import base64
 import filecmp
 import os
 import re
-import subprocess
 import sys
 
 sys.path.append("../")
@@ -10,6 +9,7 @@ from owners import owners_file
 from pullrequest import prartifact
 from reporegex import matchers
 from report import verifier_report
+from signedchart import keyring
 
 
 def check_and_prepare_signed_chart(api_url, report_path, owner_path, key_file_path):
@@ -114,9 +114,7 @@ def check_pgp_public_key(owner_pgp_key, report_path):
     """
     found, report_data = verifier_report.get_report_data(report_path)
     if found:
-        pgp_public_key_digest_owners = subprocess.getoutput(
-            f"echo {owner_pgp_key} | sha256sum"
-        ).split(" ")[0]
+        pgp_public_key_digest_owners = keyring.key_digest(owner_pgp_key)
         print(f"[INFO] digest of PGP key from OWNERS :{pgp_public_key_digest_owners}:")
         pgp_public_digest_report = verifier_report.get_public_key_digest(report_data)
         print(f"[INFO] PGP key digest in report :{pgp_public_digest_report}:")
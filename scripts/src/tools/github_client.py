@@ -0,0 +1,266 @@
+"""Shared client for the GitHub REST API.
+
+All the requests to the GitHub API of a process go through one client, which:
+* reuses connections, through a requests Session with a connection pool,
+* throttles requests with a token bucket filled from the X-RateLimit-Remaining and
+  X-RateLimit-Reset headers of the responses: once the remaining calls are spent,
+  requests wait for the rate limit to reset,
+* retries, with exponential backoff and jitter, the requests failing with a rate
+  limit error (primary or secondary) and, for GET and HEAD requests only, with a
+  server error or a connection error: a write that timed out may have been applied,
+  replaying it could e.g. open the same PR twice,
+* counts the calls and their latency per endpoint, and prints a summary at exit.
+
+Requests are sent with the BOT_TOKEN of the environment, unless other headers are
+given, and only over HTTPS.
+"""
+
+import atexit
+import collections
+import os
+import random
+import re
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GITHUB_BASE_URL = "https://api.github.com"
+POOL_MAXSIZE = 16
+MAX_RETRIES = 4
+BACKOFF = 1.0
+# Calls left unused before the rate limit resets, for the other jobs using the token
+RATE_LIMIT_RESERVE = 10
+# Retried for all the methods: the request was rejected, not processed
+RATE_LIMIT_STATUS = {429}
+# Retried for the idempotent methods only
+RETRY_STATUS = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+xRateLimit = "X-RateLimit-Limit"
+xRateRemain = "X-RateLimit-Remaining"
+xRateReset = "X-RateLimit-Reset"
+
+
+class RateLimitBucket:
+    """Token bucket holding the calls that can be made before the rate limit resets
+
+    The bucket is refilled from the rate limit headers of every response. Until a
+    first response is received, requests are not throttled.
+    """
+
+    def __init__(self, reserve=RATE_LIMIT_RESERVE):
+        self.reserve = reserve
+        self.tokens = None
+        self.reset_at = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting for the rate limit to reset if there is none left"""
+        while True:
+            with self.lock:
+                if self.tokens is None:
+                    return
+                if self.tokens > 0:
+                    self.tokens -= 1
+                    return
+                delay = self.reset_at - time.time()
+                if delay <= 0:
+                    # The rate limit has been reset, refilled by the next response
+                    self.tokens = None
+                    return
+            print(f"[INFO] GitHub rate limit nearly exhausted, waiting {delay:.0f}s")
+            time.sleep(delay)
+
+    def update(self, headers):
+        try:
+            remaining = int(headers[xRateRemain])
+            reset = int(headers[xRateReset])
+        except (KeyError, ValueError):
+            return
+        with self.lock:
+            self.tokens = remaining - self.reserve
+            # One extra second to not resume right before the reset
+            self.reset_at = reset + 1
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+def get_endpoint(method, url):
+    """Get the endpoint of a request, for the metrics
+
+    Numbers, such as PR numbers, are replaced by {n} in the path, and the query is
+    left out.
+    """
+    path = re.sub(r"/\d+(?=/|$)", "/{n}", urllib.parse.urlparse(url).path)
+    return f"{method.upper()} {path}"
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        token=None,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=MAX_RETRIES,
+        backoff=BACKOFF,
+        rate_limit_reserve=RATE_LIMIT_RESERVE,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.bucket = RateLimitBucket(rate_limit_reserve)
+        self.stats = collections.defaultdict(EndpointStats)
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Accept": "application/vnd.github.v3+json",
+                "Authorization": f'Bearer {token or os.environ.get("BOT_TOKEN")}',
+            }
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+
+    def _record(self, endpoint, elapsed, retry, error):
+        with self._stats_lock:
+            stats = self.stats[endpoint]
+            stats.calls += 1
+            stats.retries += retry
+            stats.errors += error
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
+    def _retry_delay(self, idempotent, response, attempt):
+        """Get the delay before retrying a request, None if it is not to be retried"""
+        if response is None:
+            # Connection error or timeout, the request may have been processed
+            if not idempotent:
+                return None
+        else:
+            if response.status_code == 403:
+                if response.headers.get(xRateRemain) == "0":
+                    # Primary rate limit, the bucket waits for the reset
+                    return 0
+                if "Retry-After" not in response.headers and (
+                    "secondary rate limit" not in response.text.lower()
+                ):
+                    return None
+            elif response.status_code not in RATE_LIMIT_STATUS and (
+                not idempotent or response.status_code not in RETRY_STATUS
+            ):
+                return None
+
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return int(retry_after)
+
+        return self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        """Send a request to the GitHub API
+
+        Args:
+            method (str): HTTP method, e.g. "get"
+            url (str): URL, or endpoint relative to GITHUB_BASE_URL
+            idempotent (bool): whether the request can be replayed after a server or
+                               connection error, e.g. True for a GraphQL query. By
+                               default, only GET and HEAD requests are.
+            **kwargs: passed to requests.Session.request
+
+        Returns:
+            requests.Response: the response, the last one if the request was retried
+
+        Raises:
+            ValueError: if the URL is not an HTTPS URL, the token would be sent in
+                        cleartext
+            requests.ConnectionError, requests.Timeout: if the last retry failed to
+                                                        get a response
+        """
+        if "://" not in url:
+            url = f"{GITHUB_BASE_URL}/{url.lstrip('/')}"
+        elif not url.startswith("https://"):
+            raise ValueError(f"Refusing to send a GitHub API request to {url}")
+        endpoint = get_endpoint(method, url)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            start = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                error = err
+            else:
+                error = None
+                self.bucket.update(response.headers)
+            elapsed = time.monotonic() - start
+
+            delay = self._retry_delay(idempotent, response, attempt)
+            retry = delay is not None and attempt < self.max_retries
+            self._record(
+                endpoint,
+                elapsed,
+                retry,
+                error is not None or response.status_code >= 400,
+            )
+            if not retry:
+                if error is not None:
+                    raise error
+                return response
+
+            reason = error or f"{response.status_code} {response.reason}"
+            print(f"[INFO] {endpoint} failed ({reason}), retry in {delay:.1f}s")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("get", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("head", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("post", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("put", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("delete", url, **kwargs)
+
+    def print_summary(self):
+        """Print the count and latency of the calls, per endpoint"""
+        with self._stats_lock:
+            stats = sorted(self.stats.items())
+        if not stats:
+            return
+        print("[INFO] GitHub API calls:")
+        for endpoint, endpoint_stats in stats:
+            average = endpoint_stats.total_time / endpoint_stats.calls
+            print(
+                f"[INFO]   {endpoint}: {endpoint_stats.calls} calls, {endpoint_stats.retries} retried, {endpoint_stats.errors} errors, avg {average * 1000:.0f}ms, max {endpoint_stats.max_time * 1000:.0f}ms"
+            )
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Get the client shared by the process, its summary is printed at exit"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GitHubClient()
+            atexit.register(_default_client.print_summary)
+        return _default_client
@@ -0,0 +1,138 @@
+import pytest
+import requests
+import responses
+
+from tools import github_client
+
+API_URL = "https://api.github.com/repos/openshift-helm-charts/charts/pulls/123"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(github_client.time, "sleep", sleeps.append)
+    return sleeps
+
+
+@responses.activate
+def test_request_retries_server_errors(sleeps):
+    responses.get(API_URL, status=502)
+    responses.get(API_URL, status=503)
+    responses.get(API_URL, json={"merged": True})
+
+    client = github_client.GitHubClient(token="abc", backoff=1.0)
+    r = client.get(API_URL)
+
+    assert r.json() == {"merged": True}
+    assert len(sleeps) == 2
+    assert 0.5 <= sleeps[0] <= 1.5 and 1.0 <= sleeps[1] <= 3.0
+    assert responses.calls[0].request.headers["Authorization"] == "Bearer abc"
+
+    stats = client.stats["GET /repos/openshift-helm-charts/charts/pulls/{n}"]
+    assert (stats.calls, stats.retries, stats.errors) == (3, 2, 2)
+
+
+@responses.activate
+def test_request_retries_secondary_rate_limit(sleeps):
+    responses.post(
+        f"{github_client.GITHUB_BASE_URL}/graphql",
+        status=403,
+        headers={"Retry-After": "7"},
+        json={"message": "You have exceeded a secondary rate limit"},
+    )
+    responses.post(f"{github_client.GITHUB_BASE_URL}/graphql", json={"data": {}})
+
+    r = github_client.GitHubClient().post("graphql", json={"query": ""})
+
+    assert r.status_code == 200
+    assert sleeps == [7]
+
+
+@responses.activate
+def test_request_does_not_retry_client_errors(sleeps):
+    responses.head(API_URL, status=404)
+    responses.get(API_URL, status=403, json={"message": "Resource not accessible"})
+
+    client = github_client.GitHubClient(max_retries=2)
+    assert client.head(API_URL).status_code == 404
+    assert client.get(API_URL).status_code == 403
+    assert sleeps == []
+
+
+@responses.activate
+def test_request_gives_up_after_max_retries(sleeps):
+    responses.get(API_URL, body=requests.ConnectionError("connection reset"))
+
+    client = github_client.GitHubClient(max_retries=2)
+    with pytest.raises(requests.ConnectionError):
+        client.get(API_URL)
+    assert len(sleeps) == 2
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_request_does_not_retry_writes_on_server_errors(sleeps):
+    pulls_url = "https://api.github.com/repos/openshift-helm-charts/charts/pulls"
+    responses.post(pulls_url, status=502)
+    responses.put(f"{pulls_url}/1", body=requests.Timeout("read timed out"))
+    responses.post(pulls_url, status=429, headers={"Retry-After": "3"})
+    responses.post(pulls_url, status=201)
+
+    client = github_client.GitHubClient(max_retries=2)
+    assert client.post(pulls_url).status_code == 502
+    with pytest.raises(requests.Timeout):
+        client.put(f"{pulls_url}/1")
+    assert len(responses.calls) == 2
+    assert sleeps == []
+
+    # Rate limited writes are not processed, they are retried
+    assert client.post(pulls_url).status_code == 201
+    assert sleeps == [3]
+
+
+def test_request_refuses_plain_http():
+    client = github_client.GitHubClient()
+    with pytest.raises(ValueError):
+        client.get("http://api.github.com/repos/openshift-helm-charts/charts")
+    # The pooled, authenticated adapter only serves HTTPS
+    assert client.session.adapters["http://"] is not client.session.adapters["https://"]
+
+
+def test_rate_limit_bucket(monkeypatch, sleeps):
+    now = [1000.0]
+    monkeypatch.setattr(github_client.time, "time", lambda: now[0])
+
+    def sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(github_client.time, "sleep", sleep)
+
+    bucket = github_client.RateLimitBucket(reserve=10)
+    # Not throttled before the first response
+    bucket.acquire()
+    bucket.update({"X-RateLimit-Remaining": "12", "X-RateLimit-Reset": "1060"})
+    bucket.acquire()
+    bucket.acquire()
+    assert sleeps == []
+
+    bucket.acquire()
+    assert sleeps == [61.0]
+
+
+def test_get_endpoint():
+    assert (
+        github_client.get_endpoint("get", f"{API_URL}/files?per_page=100&page=2")
+        == "GET /repos/openshift-helm-charts/charts/pulls/{n}/files"
+    )
+
+
+@responses.activate
+def test_request_retries_idempotent_posts(sleeps):
+    responses.post(f"{github_client.GITHUB_BASE_URL}/graphql", status=502)
+    responses.post(f"{github_client.GITHUB_BASE_URL}/graphql", json={"data": {}})
+
+    client = github_client.GitHubClient()
+    r = client.post("graphql", idempotent=True, json={"query": ""})
+    assert r.status_code == 200
+    assert len(sleeps) == 1
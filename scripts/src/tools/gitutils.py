@@ -15,9 +15,11 @@ import json
 import os
 import sys
 
-import requests
 from git import Repo
 
+sys.path.append("../")
+from tools import github_client
+
 GITHUB_BASE_URL = "https://api.github.com"
 CHARTS_REPO = "/charts"
 DEVELOPMENT_REPO = "/development"
@@ -43,7 +45,9 @@ def set_git_username_email(repo, username, email):
 
 
 def github_api_post(endpoint, headers, json):
-    r = requests.post(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers, json=json)
+    r = github_client.get_client().post(
+        f"{GITHUB_BASE_URL}/{endpoint}", headers=headers, json=json
+    )
 
     try:
         response_json = r.json()
@@ -58,7 +62,7 @@ def github_api_post(endpoint, headers, json):
 
 
 def github_api_get(endpoint, headers):
-    r = requests.get(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
+    r = github_client.get_client().get(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
     response_json = r.json()
     if "message" in response_json:
         print(f'[ERROR] get request: {response_json["message"]}')
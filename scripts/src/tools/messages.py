@@ -0,0 +1,44 @@
+"""Collect the error messages written by the task running in the current thread.
+
+A runner of concurrent tasks, such as chartprreview.checkgraph, starts collecting
+before running a task and stops once the task is over. The helpers writing error
+logs, such as report.report_info.write_error_log, hand their messages to
+collect_messages, so that they are kept with the result of the task.
+"""
+
+import threading
+
+_collector = threading.local()
+
+
+def start_collecting():
+    """Start collecting the messages of the current thread"""
+    _collector.messages = []
+
+
+def stop_collecting():
+    """Stop collecting the messages of the current thread
+
+    Returns:
+        list[str]: The messages collected since start_collecting
+    """
+    messages = getattr(_collector, "messages", None) or []
+    _collector.messages = None
+    return messages
+
+
+def collect_messages(messages):
+    """Keep error messages with the result of the task running in this thread
+
+    Args:
+        messages (iterable[str]): The error messages
+
+    Returns:
+        bool: False if no messages are collected in this thread, in which case the
+              messages are not kept
+    """
+    collected = getattr(_collector, "messages", None)
+    if collected is None:
+        return False
+    collected.extend(messages)
+    return True
@@ -0,0 +1,219 @@
+"""Parse versions and ranges of versions, once per string.
+
+The same version strings and ranges (chart versions, OCP and Kubernetes versions,
+supportedOpenShiftVersions ranges) are parsed over and over, by semantic_version and
+semver, when validating reports or scanning an index. The functions of this module
+memoize the parsed objects in bounded LRU caches, shared by the whole process. The
+parsed objects are shared between callers and must not be modified.
+
+Invalid strings are memoized as well: parsing them again raises ValueError without
+going through the parser.
+
+The module also holds the table of the Kubernetes version of each OCP version, to
+translate the kubeVersion range of a chart into a range of OCP versions (see
+get_ocp_range).
+"""
+
+import functools
+import re
+
+import semantic_version
+import semver
+
+VERSION_CACHE_SIZE = 16384
+SPEC_CACHE_SIZE = 1024
+
+# Kubernetes version of each OCP version supporting Helm charts, in order. The table
+# mirrors the one of github.com/opdev/getocprange, which translates the kubeVersion
+# of the submitted charts in CI (see .github/actions/get-ocp-range), so that the
+# functional tests check the index against the same ranges. Add a line here when
+# getocprange adds a new OCP release.
+OCP_KUBE_VERSIONS = (
+    ("4.1", "1.13"),
+    ("4.2", "1.14"),
+    ("4.3", "1.16"),
+    ("4.4", "1.17"),
+    ("4.5", "1.18"),
+    ("4.6", "1.19"),
+    ("4.7", "1.20"),
+    ("4.8", "1.21"),
+    ("4.9", "1.22"),
+    ("4.10", "1.23"),
+    ("4.11", "1.24"),
+    ("4.12", "1.25"),
+    ("4.13", "1.26"),
+    ("4.14", "1.27"),
+    ("4.15", "1.28"),
+    ("4.16", "1.29"),
+    ("4.17", "1.30"),
+)
+
+_OCP_KUBE_PARSED = tuple(
+    (ocp, semantic_version.Version.coerce(kube)) for ocp, kube in OCP_KUBE_VERSIONS
+)
+# Kubernetes minor versions above the table: a range admitting all of them is taken
+# to be supported by the future OCP versions as well
+KUBE_VERSIONS_AHEAD = 10
+_KUBE_VERSIONS_AHEAD = tuple(
+    semantic_version.Version(
+        major=_OCP_KUBE_PARSED[-1][1].major,
+        minor=_OCP_KUBE_PARSED[-1][1].minor + i,
+        patch=0,
+    )
+    for i in range(1, KUBE_VERSIONS_AHEAD + 1)
+)
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _coerce(version):
+    try:
+        return semantic_version.Version.coerce(version)
+    except ValueError:
+        return None
+
+
+def coerce_version(version):
+    """Parse a version, coercing it to SemVer, see semantic_version.Version.coerce
+
+    Raises:
+        ValueError: if the version cannot be coerced to SemVer
+    """
+    parsed = _coerce(version)
+    if parsed is None:
+        raise ValueError(f"Invalid version string: {version!r}")
+    return parsed
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def parse_chart_version(version):
+    """Parse a chart version, with or without a "v" prefix
+
+    Returns:
+        semantic_version.Version: the parsed version, None if it is not valid SemVer.
+    """
+    return _coerce(version.removeprefix("v"))
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _parse(version):
+    try:
+        return semantic_version.Version(version)
+    except ValueError:
+        return None
+
+
+def parse_version(version):
+    """Parse a strict SemVer version, see semantic_version.Version
+
+    Raises:
+        ValueError: if the version is not valid SemVer
+    """
+    parsed = _parse(version)
+    if parsed is None:
+        raise ValueError(f"Invalid version string: {version!r}")
+    return parsed
+
+
+def is_valid_semantic_version(version):
+    """Check that a version is strict SemVer, see semantic_version.validate"""
+    return _parse(version) is not None
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def is_valid_semver(version):
+    """Check that a version is valid SemVer, see semver.VersionInfo.is_valid"""
+    return semver.VersionInfo.is_valid(version)
+
+
+@functools.lru_cache(maxsize=SPEC_CACHE_SIZE)
+def _npm_spec(spec_string):
+    try:
+        return semantic_version.NpmSpec(spec_string), None
+    except ValueError as err:
+        return None, str(err)
+
+
+def npm_spec(spec_string):
+    """Parse a range of versions in the NPM syntax, see semantic_version.NpmSpec
+
+    Raises:
+        ValueError: if the range is invalid
+    """
+    spec, error = _npm_spec(spec_string)
+    if error is not None:
+        raise ValueError(error)
+    return spec
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def version_in_range(version, spec_string):
+    """Check that a version, coerced to SemVer, is in an NPM range, once per pair
+
+    Raises:
+        ValueError: if the version or the range is invalid
+    """
+    return coerce_version(version) in npm_spec(spec_string)
+
+
+def _normalize_kube_range(kube_version_range):
+    # Helm accepts spaces after the operators and commas between the constraints
+    kube_version_range = re.sub(r"(>=|<=|>|<|=|~|\^)\s+", r"\1", kube_version_range)
+    return " ".join(kube_version_range.replace(",", " ").split())
+
+
+@functools.lru_cache(maxsize=SPEC_CACHE_SIZE)
+def get_ocp_range(kube_version_range):
+    """Translate the kubeVersion range of a chart into the range of OCP versions
+    supporting it
+
+    Args:
+        kube_version_range (str): range of Kubernetes versions, e.g. ">=1.20.0-0"
+
+    Returns:
+        str: the range of OCP versions, e.g. ">=4.7" if the range has no upper bound
+             (it admits the Kubernetes versions above the table), "4.7 - 4.10"
+             otherwise, "4.7" for a single version.
+
+    Raises:
+        ValueError: if the range is invalid or no OCP version of the table supports
+                    it, e.g. if it only admits Kubernetes versions above the table
+    """
+    spec = npm_spec(_normalize_kube_range(kube_version_range))
+    supported = [ocp for ocp, kube in _OCP_KUBE_PARSED if kube in spec]
+    if not supported:
+        raise ValueError(
+            f"No OCP version supports the Kubernetes versions {kube_version_range}"
+        )
+    min_ocp, max_ocp = supported[0], supported[-1]
+    if all(kube in spec for kube in _KUBE_VERSIONS_AHEAD):
+        return f">={min_ocp}"
+    if min_ocp == max_ocp:
+        return min_ocp
+    return f"{min_ocp} - {max_ocp}"
+
+
+def cache_info():
+    """Get the statistics of the caches, by parsing function"""
+    return {
+        "coerce_version": _coerce.cache_info(),
+        "parse_chart_version": parse_chart_version.cache_info(),
+        "parse_version": _parse.cache_info(),
+        "is_valid_semver": is_valid_semver.cache_info(),
+        "npm_spec": _npm_spec.cache_info(),
+        "version_in_range": version_in_range.cache_info(),
+        "get_ocp_range": get_ocp_range.cache_info(),
+    }
+
+
+def cache_clear():
+    """Empty the caches"""
+    for function in (
+        _coerce,
+        parse_chart_version,
+        _parse,
+        is_valid_semver,
+        _npm_spec,
+        version_in_range,
+        get_ocp_range,
+    ):
+        function.cache_clear()
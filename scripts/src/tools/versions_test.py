@@ -0,0 +1,90 @@
+import pytest
+import semantic_version
+
+from chartrepomanager import indexannotations
+from tools import versions
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    versions.cache_clear()
+    yield
+    versions.cache_clear()
+
+
+def test_coerce_version_is_memoized():
+    version = versions.coerce_version("4.12")
+    assert version == semantic_version.Version("4.12.0")
+    assert versions.coerce_version("4.12") is version
+    assert versions.cache_info()["coerce_version"].hits == 1
+
+
+def test_invalid_versions_are_memoized():
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            versions.coerce_version("not-a-version")
+    assert versions.cache_info()["coerce_version"].misses == 1
+
+    assert not versions.is_valid_semantic_version("4.12")
+    assert versions.is_valid_semantic_version("4.12.1")
+    with pytest.raises(ValueError):
+        versions.parse_version("4.12")
+
+    assert versions.is_valid_semver("1.0.0-rc.1")
+    assert not versions.is_valid_semver("v1.0.0")
+
+
+def test_parse_chart_version():
+    assert versions.parse_chart_version("v1.2") == semantic_version.Version("1.2.0")
+    assert versions.parse_chart_version("1.2.3") == semantic_version.Version("1.2.3")
+    assert versions.parse_chart_version("latest") is None
+
+
+def test_npm_spec():
+    spec = versions.npm_spec(">=4.10")
+    assert versions.npm_spec(">=4.10") is spec
+    assert versions.version_in_range("4.12", ">=4.10")
+    assert not versions.version_in_range("4.9", ">=4.10")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            versions.npm_spec(">=four")
+    assert versions.cache_info()["npm_spec"].misses == 2
+
+
+@pytest.mark.parametrize(
+    "kube_version_range, ocp_range",
+    [
+        (">=1.20.0", ">=4.7"),
+        (">= 1.20.0-0", ">=4.7"),
+        (">=1.20.0, <1.24.0", "4.7 - 4.10"),
+        ("~1.25.0", "4.12"),
+        ("1.13.x", "4.1"),
+        (">=1.20.0 <2.0.0", ">=4.7"),
+        # Bounded ranges reaching the end of the table
+        ("<1.31", "4.1 - 4.17"),
+        (">=1.29.0 <1.33.0", "4.16 - 4.17"),
+        ("1.30.x", "4.17"),
+    ],
+)
+def test_get_ocp_range(kube_version_range, ocp_range):
+    assert versions.get_ocp_range(kube_version_range) == ocp_range
+    assert indexannotations.getOCPVersions(kube_version_range) == ocp_range
+    # The range of OCP versions is itself a valid range
+    versions.npm_spec(ocp_range)
+
+
+@pytest.mark.parametrize(
+    "kube_version_range",
+    [
+        "<1.13.0",
+        "1.15.x",
+        "not-a-range",
+        # Only Kubernetes versions above the table
+        ">=1.31.0-0",
+        "~1.35",
+    ],
+)
+def test_get_ocp_range_invalid(kube_version_range):
+    with pytest.raises(ValueError):
+        versions.get_ocp_range(kube_version_range)
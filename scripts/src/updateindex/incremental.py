@@ -0,0 +1,227 @@
+"""Incremental update of a Helm repository index file.
+
+The Helm repository index holds every version of every chart ever released. Loading
+and dumping the whole document to change the entry of a single chart costs time,
+memory and log volume proportional to the size of the repository.
+
+patch_index instead streams the existing index line by line and copies everything
+through byte-for-byte, except for:
+* the block of the chart entry being updated, which is the only part that is parsed
+  and re-dumped,
+* the top-level "generated" field.
+
+This relies on the layout produced by yaml.dump (block style, sorted keys), which is
+how the index has always been written. An IncrementalUpdateError is raised whenever
+the input doesn't match this layout, in which case callers are expected to fall back
+to a full load / dump of the index.
+"""
+
+import re
+
+import yaml
+
+try:
+    from yaml import CDumper as Dumper
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Dumper, Loader
+
+ENTRIES_KEY = b"entries:"
+GENERATED_KEY = b"generated:"
+
+# Chart entries are the keys of the "entries" mapping, indented with two spaces.
+# Their value is either a block sequence on the following lines or an empty flow
+# sequence.
+_entry_key_pattern = re.compile(rb"^  ([^\s'\"#&*!|>%@`-][^:]*):( \[\])?\r?\n?$")
+
+
+class IncrementalUpdateError(Exception):
+    """Raised when the index cannot be patched in place"""
+
+    pass
+
+
+def iter_lines(chunks):
+    """Split a stream of bytes chunks into lines, keeping the line terminators.
+
+    Args:
+        chunks (iterable[bytes]): chunks of data, e.g. from a file or an HTTP response
+
+    Yields:
+        bytes: each line of the stream
+    """
+    pending = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if pending:
+        yield pending
+
+
+def dump_entry_block(entry_name, chart_versions):
+    """Dump the index block of a chart entry, as it would appear in the full index.
+
+    The block is dumped nested under "entries" so that indentation and line folding
+    are identical to the ones of a full dump of the index.
+
+    Args:
+        entry_name (str): Name of the chart entry
+        chart_versions (list[dict]): All index entries for this chart
+
+    Returns:
+        bytes: The block, starting with the "  <entry_name>:" line
+    """
+    out = yaml.dump({"entries": {entry_name: chart_versions}}, Dumper=Dumper)
+    header, _, block = out.partition("\n")
+    if header != "entries:":
+        raise IncrementalUpdateError(f"Unexpected dump of entry {entry_name}")
+    return block.encode()
+
+
+def dump_generated(now):
+    """Dump the top-level "generated" field of the index
+
+    Args:
+        now (str): Timestamp of the index generation
+
+    Returns:
+        bytes: The "generated: <now>" line
+    """
+    return yaml.dump({"generated": now}, Dumper=Dumper).encode()
+
+
+def load_entry_block(entry_name, block_lines):
+    """Parse the block of a single chart entry
+
+    Args:
+        entry_name (str): Name of the chart entry
+        block_lines (list[bytes]): Lines of the block, including the key line
+
+    Returns:
+        list[dict]: All index entries for this chart
+    """
+    try:
+        data = yaml.load(b"entries:\n" + b"".join(block_lines), Loader=Loader)
+        return data["entries"][entry_name] or []
+    except (yaml.YAMLError, KeyError, TypeError) as e:
+        raise IncrementalUpdateError(f"Failed to parse entry {entry_name}") from e
+
+
+def patch_index(lines, out, entry_name, update_entry, now):
+    """Copy the index from lines to out, updating a single chart entry.
+
+    Args:
+        lines (iterable[bytes]): Lines of the current index, with their terminators
+        out (file): Binary file object the new index is written to
+        entry_name (str): Name of the chart entry to update
+        update_entry (callable): Receives the list of current index entries for this
+                                 chart (empty if the chart is not in the index yet)
+                                 and returns the new list.
+        now (str): Timestamp of the index generation
+
+    Returns:
+        bytes: The new block of the chart entry
+
+    Raises:
+        IncrementalUpdateError: if the current index doesn't have the expected layout.
+                                Partial content may have been written to out.
+    """
+    in_entries = False
+    in_generated = False
+    entries_found = False
+    generated_found = False
+    captured = None
+    new_block = None
+
+    def write_block(current_versions):
+        nonlocal new_block
+        new_block = dump_entry_block(entry_name, update_entry(current_versions))
+        out.write(new_block)
+
+    for line in lines:
+        top_level = line[:1] not in (b" ", b"\t", b"\r", b"\n")
+
+        if in_entries and not top_level:
+            if line[2:3] in (b" ", b"-", b"#", b"\r", b"\n", b""):
+                # Content or comment of the current chart entry
+                if captured is not None:
+                    captured.append(line)
+                else:
+                    out.write(line)
+                continue
+
+            match = _entry_key_pattern.match(line)
+            if not match:
+                raise IncrementalUpdateError(f"Unexpected line in entries: {line!r}")
+
+            if captured is not None:
+                write_block(load_entry_block(entry_name, captured))
+                captured = None
+
+            key = match.group(1).decode()
+            if key == entry_name:
+                if new_block is not None:
+                    raise IncrementalUpdateError(f"Duplicate entry {entry_name}")
+                captured = [line]
+                continue
+
+            if key > entry_name and new_block is None:
+                write_block([])
+
+            out.write(line)
+            continue
+
+        if in_entries:
+            # Leaving the entries mapping.
+            if captured is not None:
+                write_block(load_entry_block(entry_name, captured))
+                captured = None
+            if new_block is None:
+                write_block([])
+            in_entries = False
+
+        if in_generated:
+            if not top_level:
+                raise IncrementalUpdateError("Unexpected multiline generated field")
+            in_generated = False
+
+        if top_level and line.startswith(ENTRIES_KEY):
+            value = line[len(ENTRIES_KEY) :].strip()
+            if entries_found:
+                raise IncrementalUpdateError("Duplicate entries field")
+            entries_found = True
+            if value == b"":
+                in_entries = True
+                out.write(line)
+            elif value == b"{}":
+                out.write(ENTRIES_KEY + b"\n")
+                write_block([])
+            else:
+                raise IncrementalUpdateError(f"Unexpected entries field: {line!r}")
+            continue
+
+        if top_level and line.startswith(GENERATED_KEY):
+            generated_found = True
+            in_generated = True
+            out.write(dump_generated(now))
+            continue
+
+        out.write(line)
+
+    if in_entries:
+        if captured is not None:
+            write_block(load_entry_block(entry_name, captured))
+        if new_block is None:
+            write_block([])
+
+    if not entries_found:
+        raise IncrementalUpdateError("No entries field found in index")
+    if not generated_found:
+        raise IncrementalUpdateError("No generated field found in index")
+
+    return new_block
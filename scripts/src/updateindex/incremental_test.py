@@ -0,0 +1,156 @@
+import io
+
+import pytest
+import yaml
+
+from updateindex import incremental
+
+now = "2024-06-01T10:00:00.000000+00:00"
+
+
+def make_chart_version(name, version):
+    return {
+        "annotations": {
+            "charts.openshift.io/provider": "Acme",
+            "charts.openshift.io/providerType": "partner",
+        },
+        "apiVersion": "v2",
+        "description": f"A very long description of the {name} chart that is long enough to be folded by the dumper",
+        "digest": "0" * 64,
+        "name": name,
+        "urls": [f"https://example.com/{name}-{version}.tgz"],
+        "version": version,
+    }
+
+
+def make_index(names):
+    return {
+        "apiVersion": "v1",
+        "entries": {
+            name: [make_chart_version(name, v) for v in ("1.0.0", "1.1.0")]
+            for name in names
+        },
+        "generated": "2024-01-01T00:00:00.000000+00:00",
+    }
+
+
+def full_update(index_data, entry_name, update_entry):
+    """Reference implementation: full load / update / dump round trip"""
+    data = yaml.safe_load(yaml.dump(index_data))
+    data["generated"] = now
+    data["entries"][entry_name] = update_entry(data["entries"].get(entry_name, []))
+    return data
+
+
+def add_version(current_versions):
+    versions = [v for v in current_versions if v["version"] != "2.0.0"]
+    versions.append(make_chart_version("new", "2.0.0"))
+    return versions
+
+
+def patch(index_text, entry_name, update_entry):
+    out = io.BytesIO()
+    lines = incremental.iter_lines([index_text.encode()])
+    incremental.patch_index(lines, out, entry_name, update_entry, now)
+    return out.getvalue().decode()
+
+
+@pytest.mark.parametrize(
+    "entry_name",
+    [
+        "aaa-first",  # new entry, before all the existing ones
+        "charlie",  # existing entry
+        "delta",  # new entry, in the middle
+        "zulu",  # existing entry, the last one
+        "zzz-last",  # new entry, after all the existing ones
+    ],
+)
+def test_patch_index(entry_name):
+    index_data = make_index(["alpha", "charlie", "echo", "zulu"])
+    index_text = yaml.dump(index_data)
+
+    patched = patch(index_text, entry_name, add_version)
+
+    expected = full_update(index_data, entry_name, add_version)
+    assert yaml.safe_load(patched) == expected
+    assert patched == yaml.dump(expected)
+
+
+def test_patch_index_only_touches_entry():
+    index_data = make_index(["alpha", "charlie", "echo"])
+    index_text = yaml.dump(index_data)
+    # Hand-edited content outside of the updated entry is kept as-is
+    index_text = index_text.replace("  alpha:\n", "  alpha:\n  # a comment\n")
+
+    patched = patch(index_text, "charlie", add_version)
+
+    assert "  alpha:\n  # a comment\n" in patched
+    assert patched.startswith(index_text[: index_text.index("  charlie:")])
+    assert patched.count("2.0.0") == 2
+
+
+def test_patch_empty_index():
+    index_text = "apiVersion: v1\nentries: {}\ngenerated: '2024-01-01'\n"
+
+    patched = patch(index_text, "new", add_version)
+
+    assert yaml.safe_load(patched) == {
+        "apiVersion": "v1",
+        "entries": {"new": [make_chart_version("new", "2.0.0")]},
+        "generated": now,
+    }
+
+
+@pytest.mark.parametrize(
+    "index_text",
+    [
+        "apiVersion: v1\ngenerated: '2024-01-01'\n",
+        "apiVersion: v1\nentries:\n  new: []\n",
+        'apiVersion: v1\nentries: {"new": []}\ngenerated: "2024-01-01"\n',
+        "apiVersion: v1\nentries:\n  'quoted': []\ngenerated: '2024-01-01'\n",
+    ],
+)
+def test_patch_unexpected_layout(index_text):
+    with pytest.raises(incremental.IncrementalUpdateError):
+        patch(index_text, "new", add_version)
+
+
+def test_iter_lines():
+    chunks = [b"first\nsec", b"ond\n", b"", b"\nlast"]
+    assert list(incremental.iter_lines(chunks)) == [
+        b"first\n",
+        b"second\n",
+        b"\n",
+        b"last",
+    ]
+
+
+def test_update_index_file_fallback_digests_once(tmp_path, monkeypatch):
+    from updateindex import updateindex
+
+    digests = []
+    monkeypatch.setattr(
+        updateindex,
+        "set_package_digest",
+        lambda chart_entry, chart_url: digests.append(chart_url),
+    )
+    monkeypatch.setenv("CHART_ENTRY_NAME", "new")
+    current_index = tmp_path / "current.yaml"
+    # The entry is patched before the missing generated field is found, the whole
+    # index is then rewritten
+    current_index.write_text("apiVersion: v1\nentries:\n  new: []\n")
+    index_file = tmp_path / "index.yaml"
+    chart_entry = make_chart_version("new", "1.0.0")
+
+    updateindex.update_index_file(
+        str(current_index),
+        str(index_file),
+        "1.0.0",
+        "https://example.com/new-1.0.0.tgz",
+        chart_entry,
+        False,
+    )
+
+    assert digests == ["https://example.com/new-1.0.0.tgz"]
+    (entry,) = yaml.safe_load(index_file.read_text())["entries"]["new"]
+    assert entry["urls"] == ["https://example.com/new-1.0.0.tgz"]
@@ -1,15 +1,12 @@
-"""This files downloads and updates the Helm repository index data
-"""
+"""This files downloads and updates the Helm repository index data"""
 
 import argparse
 import base64
-import hashlib
 import json
 import os
 import sys
 from datetime import datetime, timezone
 
-import requests
 import yaml
 from environs import Env
 
@@ -19,6 +16,11 @@ try:
 except ImportError:
     from yaml import Dumper, Loader
 
+sys.path.append("../")
+from chartartifact import digest
+from indexfile import cache
+from updateindex import incremental
+
 
 def _decode_chart_entry(chart_entry_encoded):
     """Decode the base64 encoded index entry to add.
@@ -36,8 +38,16 @@ def _decode_chart_entry(chart_entry_encoded):
     return json.loads(chart_entry_str)
 
 
-def download_index(index_file, repository, branch):
-    """Download the index file to disk and retrieve its content.
+def _get_chart_entry_name():
+    entry_name = os.environ.get("CHART_ENTRY_NAME")
+    if not entry_name:
+        print("[ERROR] Internal error: missing chart entry name")
+        sys.exit(1)
+    return entry_name
+
+
+def download_index_file(index_file, repository, branch):
+    """Retrieve the current index file, without loading it in memory.
 
     Args:
         index_file (str): Path to the index file to update
@@ -45,21 +55,51 @@ def download_index(index_file, repository, branch):
         branch (str): Git branch that hosts the Helm repository index
 
     Returns:
-        dict: The current content of the index
+        str: Path to a local copy of the current index, or None if the index doesn't
+             exist yet. This copy belongs to the index cache and must not be modified.
     """
     print(f"Downloading {index_file}")
-    r = requests.get(
+    return cache.fetch_index_file(
         f"https://raw.githubusercontent.com/{repository}/{branch}/{index_file}"
     )
-    now = datetime.now(timezone.utc).astimezone().isoformat()
 
-    if r.status_code == 200:
-        data = yaml.load(r.text, Loader=Loader)
-        data["generated"] = now
-    else:
-        data = {"apiVersion": "v1", "generated": now, "entries": {}}
 
-    return data
+def prepare_chart_entry(chart_entry, chart_url, web_catalog_only, now):
+    """Set the URL, digest and submission timestamp of the new index entry
+
+    Args:
+        chart_entry (dict): Index entry to add
+        chart_url (str): URL of the Chart
+        web_catalog_only (bool): Set to True if the provider has chosen the Web Catalog
+                                 Only option.
+        now (str): Timestamp of the submission
+
+    Returns:
+        dict: chart_entry, updated in place
+    """
+    chart_entry["urls"] = [chart_url]
+    if not web_catalog_only:
+        set_package_digest(chart_entry, chart_url)
+    chart_entry["annotations"]["charts.openshift.io/submissionTimestamp"] = now
+    return chart_entry
+
+
+def merge_chart_entry(current_versions, version, chart_entry):
+    """Compute the new list of index entries for this chart
+
+    Any existing entry for the same version is replaced by the new one.
+
+    Args:
+        current_versions (list[dict]): Current index entries for this chart
+        version (str): The version of the chart (ex: 1.4.0)
+        chart_entry (dict): Index entry to add, see prepare_chart_entry
+
+    Returns:
+        list[dict]: The new index entries for this chart
+    """
+    crtentries = [v for v in current_versions if v["version"] != version]
+    crtentries.append(chart_entry)
+    return crtentries
 
 
 def update_index(
@@ -83,23 +123,67 @@ def update_index(
     now = datetime.now(timezone.utc).astimezone().isoformat()
 
     print("[INFO] Updating the chart entry with new version")
-    crtentries = []
-    entry_name = os.environ.get("CHART_ENTRY_NAME")
-    if not entry_name:
-        print("[ERROR] Internal error: missing chart entry name")
-        sys.exit(1)
-    d = index_data["entries"].get(entry_name, [])
-    for v in d:
-        if v["version"] == version:
-            continue
-        crtentries.append(v)
+    entry_name = _get_chart_entry_name()
+    chart_entry = prepare_chart_entry(chart_entry, chart_url, web_catalog_only, now)
+    index_data["entries"][entry_name] = merge_chart_entry(
+        index_data["entries"].get(entry_name, []), version, chart_entry
+    )
 
-    chart_entry["urls"] = [chart_url]
-    if not web_catalog_only:
-        set_package_digest(chart_entry, chart_url)
-    chart_entry["annotations"]["charts.openshift.io/submissionTimestamp"] = now
-    crtentries.append(chart_entry)
-    index_data["entries"][entry_name] = crtentries
+
+def update_index_file(
+    current_index_path,
+    index_file,
+    version,
+    chart_url,
+    chart_entry,
+    web_catalog_only,
+):
+    """Write the new index to index_file, patching only the entry of this chart.
+
+    The rest of the current index is copied through unchanged (see the incremental
+    module). If the current index doesn't have the expected layout, this falls back
+    to a full load and dump of the index.
+
+    Args:
+        current_index_path (str): Path to the current content of the index
+        index_file (str): Path to the index file to update
+        version (str): The version of the chart (ex: 1.4.0)
+        chart_url (str): URL of the Chart
+        chart_entry (dict): Index entry to add
+        web_catalog_only (bool): Set to True if the provider has chosen the Web Catalog
+                                 Only option.
+
+    """
+    now = datetime.now(timezone.utc).astimezone().isoformat()
+    entry_name = _get_chart_entry_name()
+
+    # Computed once: the digest check downloads the chart package
+    chart_entry = prepare_chart_entry(chart_entry, chart_url, web_catalog_only, now)
+
+    def update_entry(current_versions):
+        return merge_chart_entry(current_versions, version, chart_entry)
+
+    print("[INFO] Updating the chart entry with new version")
+    tmp_index_file = f"{index_file}.tmp"
+    try:
+        with open(current_index_path, "rb") as src, open(tmp_index_file, "wb") as out:
+            new_block = incremental.patch_index(
+                incremental.iter_lines(src), out, entry_name, update_entry, now
+            )
+    except incremental.IncrementalUpdateError as e:
+        print(f"[WARNING] Incremental update not possible, rewriting whole index: {e}")
+        os.remove(tmp_index_file)
+        with open(current_index_path) as fd:
+            index_data = yaml.load(fd, Loader=Loader)
+        index_data["generated"] = now
+        index_data["entries"][entry_name] = update_entry(
+            index_data["entries"].get(entry_name, [])
+        )
+        write_index_file(index_data, index_file)
+        return
+
+    os.replace(tmp_index_file, index_file)
+    print(f"{index_file} updated entry:\n", new_block.decode())
 
 
 def set_package_digest(chart_entry, chart_url):
@@ -116,16 +200,15 @@ def set_package_digest(chart_entry, chart_url):
     """
     print("[INFO] set package digests.")
 
-    head = requests.head(chart_url, allow_redirects=True)
     print(f"[DEBUG]: tgz url : {chart_url}")
-    print(f"[DEBUG]: response code from head request: {head.status_code}")
 
     target_digest = ""
-    if head.status_code == 200:
-        response = requests.get(chart_url, allow_redirects=True)
-        print(f"[DEBUG]: response code get request: {response.status_code}")
-        target_digest = hashlib.sha256(response.content).hexdigest()
-        print(f"[DEBUG]: calculated digest : {target_digest}")
+    package_digest = digest.digest_url(chart_url)
+    if package_digest:
+        target_digest = package_digest.digest
+        print(
+            f"[DEBUG]: calculated digest : {target_digest}, size: {package_digest.size}, time: {package_digest.elapsed:.2f}s"
+        )
 
     pkg_digest = ""
     if "digest" in chart_entry:
@@ -157,10 +240,14 @@ def write_index_file(index_data, index_file):
 
     """
     out = yaml.dump(index_data, Dumper=Dumper)
-    print(f"{index_file} content:\n", out)
     with open(index_file, "w") as fd:
         fd.write(out)
 
+    entry_name = os.environ.get("CHART_ENTRY_NAME")
+    if entry_name in index_data["entries"]:
+        entry = {entry_name: index_data["entries"][entry_name]}
+        print(f"{index_file} updated entry:\n", yaml.dump(entry, Dumper=Dumper))
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -219,12 +306,27 @@ def main():
     env = Env()
     web_catalog_only = env.bool("WEB_CATALOG_ONLY", False)
 
-    index_data = download_index(args.index_file, args.repository, args.index_branch)
-    update_index(
-        index_data,
+    current_index_path = download_index_file(
+        args.index_file, args.repository, args.index_branch
+    )
+    if not current_index_path:
+        now = datetime.now(timezone.utc).astimezone().isoformat()
+        index_data = {"apiVersion": "v1", "generated": now, "entries": {}}
+        update_index(
+            index_data,
+            args.version,
+            args.chart_url,
+            chart_entry,
+            web_catalog_only,
+        )
+        write_index_file(index_data, args.index_file)
+        return
+
+    update_index_file(
+        current_index_path,
+        args.index_file,
         args.version,
         args.chart_url,
         chart_entry,
         web_catalog_only,
     )
-    write_index_file(index_data, args.index_file)
@@ -1,17 +1,11 @@
 import argparse
-import os
 import re
 import sys
 
-import yaml
-
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
 from tools import gitutils
 
 sys.path.append("../")
+from owners import authz
 from pullrequest import prartifact
 
 
@@ -68,17 +62,15 @@ def check_if_ci_only_is_modified(api_url):
 
 def verify_user(username):
     print(f"[INFO] Verify user. {username}")
-    owners_path = "OWNERS"
-    if not os.path.exists(owners_path):
-        print(f"[ERROR] {owners_path} file does not exist.")
-    else:
-        data = open(owners_path).read()
-        out = yaml.load(data, Loader=Loader)
-        if username in out["approvers"]:
-            print(f"[INFO] {username} authorized")
-            return True
-        else:
-            print(f"[ERROR] {username} cannot run tests")
+    try:
+        approvers = authz.get_approvers("OWNERS")
+    except authz.AuthzIndexError as e:
+        print(f"[ERROR] {e}")
+        return False
+    if username in approvers:
+        print(f"[INFO] {username} authorized")
+        return True
+    print(f"[ERROR] {username} cannot run tests")
     return False
 
 
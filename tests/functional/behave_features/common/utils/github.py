@@ -2,12 +2,15 @@
 """Utility class for setting up and manipulating GitHub operations."""
 
 import json
-import requests
 import logging
+import sys
 from retrying import retry
 
 from common.utils.setttings import *
 
+sys.path.append("../../../../../scripts/src")
+from tools import github_client
+
 
 @retry(stop_max_delay=30_000, wait_fixed=1000)
 def get_run_id(secrets, workflow_name: str, pr_number: str = None):
@@ -92,7 +95,7 @@ def github_api_get(endpoint, bot_token, headers={}):
             "Accept": "application/vnd.github.v3+json",
             "Authorization": f"Bearer {bot_token}",
         }
-    r = requests.get(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
+    r = github_client.get_client().get(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
 
     return r
 
@@ -103,7 +106,7 @@ def github_api_delete(endpoint, bot_token, headers={}):
             "Accept": "application/vnd.github.v3+json",
             "Authorization": f"Bearer {bot_token}",
         }
-    r = requests.delete(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
+    r = github_client.get_client().delete(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers)
 
     return r
 
@@ -114,7 +117,7 @@ def github_api_post(endpoint, bot_token, headers={}, json={}):
             "Accept": "application/vnd.github.v3+json",
             "Authorization": f"Bearer {bot_token}",
         }
-    r = requests.post(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers, json=json)
+    r = github_client.get_client().post(f"{GITHUB_BASE_URL}/{endpoint}", headers=headers, json=json)
 
     return r
 
@@ -1,17 +1,17 @@
 import logging
-import semantic_version
 import sys
 
 sys.path.append("../../../../../scripts/src")
 from chartrepomanager import indexannotations
 from indexfile import index
+from tools import versions
 
 
 def check_index_entries(ocpVersion):
     all_chart_list = index.get_latest_charts()
     failed_chart_list = []
 
-    OCP_VERSION = semantic_version.Version.coerce(ocpVersion)
+    OCP_VERSION = versions.coerce_version(ocpVersion)
 
     for chart in all_chart_list:
         if (
@@ -19,7 +19,7 @@ def check_index_entries(ocpVersion):
             and chart["supportedOCP"] != "N/A"
             and chart["supportedOCP"] != ""
         ):
-            if OCP_VERSION in semantic_version.NpmSpec(chart["supportedOCP"]):
+            if versions.version_in_range(ocpVersion, chart["supportedOCP"]):
                 logging.info(
                     f'PASS: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["supportedOCP"]} includes: {OCP_VERSION}'
                 )
@@ -32,8 +32,18 @@ def check_index_entries(ocpVersion):
                 )
                 failed_chart_list.append(chart)
         elif "kubeVersion" in chart and chart["kubeVersion"] != "":
-            supportedOCPVersion = indexannotations.getOCPVersions(chart["kubeVersion"])
-            if OCP_VERSION in semantic_version.NpmSpec(supportedOCPVersion):
+            try:
+                supportedOCPVersion = indexannotations.getOCPVersions(
+                    chart["kubeVersion"]
+                )
+            except ValueError as err:
+                chart[
+                    "message"
+                ] = f'chart {chart["name"]} {chart["version"]} kubeVersion {chart["kubeVersion"]} has no supported OCP version: {err}'
+                logging.info(f'   ERROR: {chart["message"]}')
+                failed_chart_list.append(chart)
+                continue
+            if versions.version_in_range(ocpVersion, supportedOCPVersion):
                 logging.info(
                     f'PASS: Chart {chart["name"]} {chart["version"]} kubeVersion  {chart["kubeVersion"]} (OCP: {supportedOCPVersion}) includes OCP version: {OCP_VERSION}'
                 )